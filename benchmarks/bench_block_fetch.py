@@ -0,0 +1,126 @@
+"""
+fetch_page_plain_text 블록 트리 조회 벤치마크 (가짜 Notion 블록 API, 요청당 지연 주입)
+
+    python -m benchmarks.bench_block_fetch --blocks 3000 --depth 6 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from src.embedding_cache import EmbeddingCache  # noqa: E402
+from src.notion_client_wrap import NotionClientWrap  # noqa: E402
+from src.notion_mirror import NotionTaskMirror  # noqa: E402
+from src.rate_limiter import RateLimiter  # noqa: E402
+
+
+def build_tree(n_blocks: int, depth: int, fanout: int):
+    """
+    parent id -> 자식 블록 목록. 너비 우선으로 부모마다 fanout 개씩, 최대 depth 레벨까지 n_blocks 개 생성
+    """
+    tree = {"root": []}
+    queue = [("root", 0)]
+    count = 0
+    while queue and count < n_blocks:
+        parent, level = queue.pop(0)
+        for _ in range(fanout):
+            if count >= n_blocks:
+                break
+            bid = f"b{count}"
+            block = {
+                "id": bid,
+                "type": "paragraph",
+                "has_children": False,
+                "paragraph": {"rich_text": [{"plain_text": f"line {count}"}]},
+            }
+            tree[parent].append(block)
+            tree[bid] = []
+            if level + 1 < depth:
+                queue.append((bid, level + 1))
+            count += 1
+    for blocks in tree.values():
+        for b in blocks:
+            b["has_children"] = bool(tree[b["id"]])
+    return tree
+
+
+class FakeBlocks:
+    def __init__(self, tree, latency):
+        self.tree = tree
+        self.latency = latency
+        self.calls = 0
+
+    def list(self, block_id, start_cursor=None, page_size=100):
+        self.calls += 1
+        time.sleep(self.latency)
+        blocks = self.tree.get(block_id, [])
+        start = int(start_cursor or 0)
+        end = start + page_size
+        more = end < len(blocks)
+        return {"results": blocks[start:end], "has_more": more, "next_cursor": str(end) if more else None}
+
+
+def _sequential_walk(blocks_api, wrap, page_id):
+    # 기존 구현: 순차 재귀, pagination 무시
+    texts = []
+
+    def walk(block_id):
+        for b in blocks_api.list(block_id)["results"]:
+            t = wrap._block_to_text(b)
+            if t:
+                texts.append(t)
+            if b.get("has_children"):
+                walk(b["id"])
+
+    walk(page_id)
+    return "\n".join(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Block tree fetch benchmark")
+    parser.add_argument("--blocks", type=int, default=3000)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--fanout", type=int, default=8, help="부모당 자식 수 (100 초과면 pagination 발생)")
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 지연(초)")
+    parser.add_argument("--rate", type=float, default=0, help="초당 요청 제한 (0 = 제한 없음)")
+    parser.add_argument("--deep-chain", type=int, default=5000, help="스택 한도 확인용 단일 체인 깊이")
+    args = parser.parse_args()
+
+    wrap = NotionClientWrap("bench", embedding_cache=EmbeddingCache(":memory:"), mirror=NotionTaskMirror(":memory:"))
+    wrap.rate_limiter = RateLimiter(rate=args.rate)
+
+    tree = build_tree(args.blocks, args.depth, args.fanout)
+    blocks_api = FakeBlocks(tree, args.latency)
+    wrap.client = SimpleNamespace(blocks=SimpleNamespace(children=blocks_api))
+
+    t0 = time.perf_counter()
+    text = wrap.fetch_page_plain_text("root")
+    elapsed = time.perf_counter() - t0
+    print(f"bfs        blocks={args.blocks} lines={len(text.splitlines())} calls={blocks_api.calls} "
+          f"wall={elapsed:.2f}s")
+
+    blocks_api.calls = 0
+    t0 = time.perf_counter()
+    old = _sequential_walk(blocks_api, wrap, "root")
+    elapsed = time.perf_counter() - t0
+    print(f"sequential blocks={args.blocks} lines={len(old.splitlines())} calls={blocks_api.calls} "
+          f"wall={elapsed:.2f}s")
+
+    # 재귀 한도를 넘는 깊이의 체인
+    chain = {}
+    for i in range(args.deep_chain):
+        chain[f"c{i}" if i else "root"] = [{
+            "id": f"c{i + 1}", "type": "paragraph", "has_children": i + 1 < args.deep_chain,
+            "paragraph": {"rich_text": [{"plain_text": f"depth {i + 1}"}]},
+        }]
+    wrap.client = SimpleNamespace(blocks=SimpleNamespace(children=FakeBlocks(chain, 0)))
+    text = wrap.fetch_page_plain_text("root")
+    print(f"deep chain depth={args.deep_chain} (recursionlimit={sys.getrecursionlimit()}) "
+          f"lines={len(text.splitlines())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+CLI 모듈 import 시간 벤치마크 (매번 새 인터프리터에서 측정, API 키 없이 실행)
+
+    python -m benchmarks.bench_import --repeat 5 --max-ms 400
+
+- create_note 경로(src.notion_client_wrap)가 numpy / openai 를 끌어오지 않는지도 확인
+- --max-ms 를 넘거나 금지 모듈이 로드되면 exit code 1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 모듈 -> import 후 sys.modules 에 없어야 하는 모듈
+TARGETS = {
+    "src.notion_client_wrap": ["numpy", "openai"],
+    "create_note": ["numpy", "openai", "anthropic"],
+    "main": [],
+}
+
+_PROBE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - t) * 1000
+loaded = [m for m in {forbidden!r} if m in sys.modules]
+print(f"{{elapsed:.1f}} {{','.join(loaded)}}")
+"""
+
+
+def measure(module: str, forbidden, repeat: int):
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY")}
+    env["PYTHONPATH"] = ROOT
+    env["LOG_LEVEL"] = "WARNING"
+    timings, loaded = [], set()
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, forbidden=forbidden)],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{out.stderr}")
+        ms, _, mods = out.stdout.strip().rpartition("\n")[2].partition(" ")
+        timings.append(float(ms))
+        loaded.update(m for m in mods.split(",") if m)
+    return statistics.median(timings), sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=0, help="create_note import 중앙값 상한 (0 이면 검사 안 함)")
+    args = parser.parse_args()
+
+    failed = False
+    for module, forbidden in TARGETS.items():
+        median_ms, loaded = measure(module, forbidden, args.repeat)
+        status = "ok"
+        if loaded:
+            status, failed = f"unexpected imports: {', '.join(loaded)}", True
+        elif args.max_ms and module == "create_note" and median_ms > args.max_ms:
+            status, failed = f"slower than {args.max_ms:.0f}ms", True
+        print(f"{module:<26} median={median_ms:7.1f}ms  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+임베딩 매칭 지연시간 벤치마크 (API 호출 없음, 랜덤 벡터)
+- upsert_tasks 와 같은 경로: 기존 task 를 VectorStore 에 넣고 top-k 검색 + assign_matches 로 1:1 배정
+
+    python -m benchmarks.bench_matching --sizes 1000 10000 50000 --queries 30
+    python -m benchmarks.bench_matching --hashing   # 로컬 hashing 임베딩으로 이름 인코딩 + 매칭
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.embedding_backend import HashingEmbeddingBackend
+from src.notion_client_wrap import NotionClientWrap
+from src.vector_store import VectorStore
+
+
+def _naive_match(queries, existing, threshold):
+    # 기존 upsert_tasks 의 (신규 × 기존) 이중 루프
+    out = []
+    for q in queries:
+        best, best_score = None, 0
+        for et in existing:
+            a, b = np.array(q), np.array(et["embedding"])
+            sim = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+            if sim > best_score:
+                best, best_score = et, sim
+        out.append((best, best_score) if best and best_score >= threshold else None)
+    return out
+
+
+def _build_store(path, existing, dim):
+    # 기존 task 를 저장소에 넣음 (upsert_tasks 의 _index_existing_pages 처럼 key -> {page_id, name})
+    store = VectorStore(path, dim=dim)
+    keys = [et["page_id"] for et in existing]
+    store.add(keys, [et["embedding"] for et in existing])
+    return store, {et["page_id"]: {"page_id": et["page_id"], "name": et["name"]} for et in existing}
+
+
+def _match(store, titles, queries, threshold):
+    # upsert_tasks 의 임베딩 단계 그대로 (저장소 top-k 검색 + assign_matches)
+    matches = [None] * len(queries)
+    NotionClientWrap._embedding_matches(matches, list(range(len(queries))), queries, store, titles, threshold)
+    return matches
+
+
+def run(sizes, n_queries, dim, naive_limit, seed=0):
+    rng = np.random.default_rng(seed)
+    for n in sizes:
+        vecs = rng.standard_normal((n, dim), dtype=np.float32)
+        existing = [{"page_id": str(i), "name": f"task {i}", "embedding": vecs[i].tolist()} for i in range(n)]
+        # 절반은 기존 task 의 근사 복제, 절반은 무관한 신규
+        picks = rng.choice(n, n_queries // 2, replace=False)
+        near = vecs[picks] + 0.05 * rng.standard_normal((len(picks), dim), dtype=np.float32)
+        fresh = rng.standard_normal((n_queries - len(picks), dim), dtype=np.float32)
+        queries = np.vstack([near, fresh]).tolist()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            store, titles = _build_store(tmp, existing, dim)
+            t_build = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            matches = _match(store, titles, queries, 0.9)
+            t_match = time.perf_counter() - t0
+        hit = sum(1 for m in matches if m)
+
+        line = (f"n={n:>6} dim={dim} queries={n_queries} "
+                f"build={t_build * 1000:8.1f}ms match={t_match * 1000:8.1f}ms matched={hit}")
+        if n <= naive_limit:
+            t0 = time.perf_counter()
+            _naive_match(queries, existing, 0.9)
+            line += f" naive={(time.perf_counter() - t0) * 1000:9.1f}ms"
+        print(line)
+
+
+def run_hashing(sizes, n_queries, seed=0):
+    from benchmarks.fake_services import task_name
+
+    rng = np.random.default_rng(seed)
+    backend = HashingEmbeddingBackend()
+    for n in sizes:
+        names = [task_name(i) for i in range(n)]
+        t0 = time.perf_counter()
+        vecs = backend.embed(names)
+        t_existing = time.perf_counter() - t0
+        existing = [{"page_id": str(i), "name": names[i], "embedding": vecs[i]} for i in range(n)]
+        # 절반은 기존 이름의 띄어쓰기 / 대소문자 변형, 절반은 무관한 신규
+        picks = rng.choice(n, n_queries // 2, replace=False)
+        queries = [names[i].replace(" ", "  ").upper() for i in picks]
+        queries += [f"신규 업무 {i} 검토" for i in range(n_queries - len(queries))]
+
+        t0 = time.perf_counter()
+        query_vecs = backend.embed(queries)
+        t_encode = time.perf_counter() - t0
+        with tempfile.TemporaryDirectory() as tmp:
+            store, titles = _build_store(tmp, existing, len(vecs[0]))
+            t0 = time.perf_counter()
+            matches = _match(store, titles, query_vecs, backend.match_threshold)
+            t_match = time.perf_counter() - t0
+        correct = sum(1 for i, m in zip(picks, matches) if m and m[0]["name"] == names[i])
+        print(f"n={n:>6} {backend.name} queries={n_queries} embed_existing={t_existing * 1000:8.1f}ms "
+              f"encode={t_encode * 1000:6.2f}ms match={t_match * 1000:6.2f}ms "
+              f"matched={sum(1 for m in matches if m)} correct={correct}/{len(picks)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding match (vector store + assign_matches) latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--dim", type=int, default=1536, help="text-embedding-3-small 차원")
+    parser.add_argument("--naive-limit", type=int, default=1000, help="이 크기 이하에서만 기존 루프와 비교")
+    parser.add_argument("--hashing", action="store_true", help="랜덤 벡터 대신 HashingEmbeddingBackend 로 이름 인코딩")
+    args = parser.parse_args()
+    if args.hashing:
+        run_hashing(args.sizes, args.queries)
+    else:
+        run(args.sizes, args.queries, args.dim, args.naive_limit)
+
+
+if __name__ == "__main__":
+    main()
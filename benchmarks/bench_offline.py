@@ -0,0 +1,253 @@
+"""
+오프라인 end-to-end 벤치마크 (Notion / OpenAI / Anthropic 은 benchmarks.fake_services 로컬 서버)
+
+    python -m benchmarks.bench_offline --sizes 100 5000 50000 --scenarios fetch upsert note pipeline batch watch \\
+        --latency-ms 10 --output bench_results.jsonl
+
+- 시나리오마다 새 자식 프로세스에서 실행 (peak RSS 가 시나리오끼리 섞이지 않도록), 서버는 부모 프로세스 스레드
+    fetch     fetch_page_plain_text: 회의록 페이지 블록 트리(depth × fanout) 전체 조회
+    upsert    upsert_tasks: 합성 DB(size 행)에 exact / 이름 살짝 바뀐 / 신규 task 섞어서 업서트
+    note      create_note: DB 한 번 조회 + 업무영역별 회의록 초안 생성
+    pipeline  run_pipeline: 회의록 페이지 조회 -> Claude 추출 -> 업서트
+    batch     run_pipeline(batch=True): batch 제출 -> polling 도중 중단 -> 다시 실행해서 같은 batch 를
+              이어서 polling -> 결과 -> 업서트 (batch 가 두 번 제출되면 실패)
+    watch     --watch 한 주기: search 로 회의록 페이지 찾기 -> run_pipeline -> 체크포인트 commit -> 다시 poll
+              (두 번째 poll 에 같은 페이지가 또 나오면 실패)
+- 실행 결과에 failed / write_failed_pages 가 있으면 error 로 기록 (종료 코드 1)
+- 결과는 시나리오당 JSON 한 줄 (wall time, endpoint 별 호출 수, peak RSS, 실행 결과 요약)
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["fetch", "upsert", "note", "pipeline", "batch", "watch"]
+DATABASE_ID = "bench-db"
+
+
+def _admin(url: str, action: str, payload: dict = None) -> dict:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(f"{url}/_admin/{action}", data=data, method="POST" if data else "GET",
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as resp:
+        return json.loads(resp.read())
+
+
+def _rss_mb() -> float:
+    # Linux ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+# ---------- 자식 프로세스: 시나리오 실행 ----------
+def _make_wrap(url: str):
+    from notion_client import Client
+    from openai import OpenAI
+    from src.notion_client_wrap import NotionClientWrap
+
+    return NotionClientWrap(
+        "bench",
+        client=Client(auth="bench", base_url=f"{url}/notion"),
+        oai_client=OpenAI(api_key="bench", base_url=f"{url}/openai/v1", max_retries=0),
+    )
+
+
+def _bench_tasks(size: int, n: int):
+    from benchmarks.fake_services import fake_tasks, task_name
+
+    # 1/2 은 DB 에 있는 이름 그대로, 1/4 은 이름 뒤에 한 단어 추가, 나머지는 신규
+    names = []
+    for i in range(n):
+        idx = (i * 7919) % max(1, size)
+        if i % 4 in (0, 1):
+            names.append(task_name(idx))
+        elif i % 4 == 2:
+            names.append(f"{task_name(idx)} 마무리")
+        else:
+            names.append(f"새 업무 {i}")
+    return fake_tasks("# 실제 회의록\n" + "\n".join(f"# {name}" for name in names))
+
+
+def run_child(spec: dict) -> dict:
+    url, scenario, size = spec["url"], spec["scenario"], spec["size"]
+    wrap = _make_wrap(url)
+    page_ids = spec["meeting_page_ids"]
+    baseline = _rss_mb()
+    started = time.perf_counter()
+
+    if scenario == "fetch":
+        texts = [wrap.fetch_page_plain_text(page_id) for page_id in page_ids]
+        result = {"pages": len(texts), "chars": sum(len(t) for t in texts)}
+    elif scenario == "upsert":
+        upserted = wrap.upsert_tasks(DATABASE_ID, _bench_tasks(size, spec["upsert_tasks"]))
+        result = {k: v for k, v in upserted.items() if k != "results"}
+    elif scenario == "note":
+        import create_note
+
+        grouped = create_note.fetch_tasks_grouped_by_field(wrap, DATABASE_ID)
+        with tempfile.TemporaryDirectory() as out_dir:
+            files = [create_note.write_meeting_note(tasks, out_dir) for tasks in grouped.values()]
+        result = {"fields": len(files), "tasks": sum(len(t) for t in grouped.values())}
+    elif scenario == "pipeline":
+        result = _summary_counts(_run_pipeline(url, wrap, page_ids))
+    elif scenario == "watch":
+        from benchmarks.fake_services import MEETING_PARENT_ID
+        from src.page_watcher import MeetingPageWatcher
+
+        watcher = MeetingPageWatcher(wrap, parent_id=MEETING_PARENT_ID, exclude_database_id=DATABASE_ID)
+        ready = watcher.poll()
+        summary = _run_pipeline(url, wrap, [e["page_id"] for e in ready])
+        watcher.commit(ready, set(summary["failed"]) | set(summary["write_failed_pages"]))
+        repoll = watcher.poll()
+        if len(ready) != len(page_ids) or repoll:
+            raise RuntimeError(f"watch cycle: ready={len(ready)}/{len(page_ids)} repoll={len(repoll)}")
+        result = {"ready": len(ready), "repoll": len(repoll), **_summary_counts(summary)}
+    else:
+        import src.batch_runner as batch_runner
+
+        # 제출 직후 첫 polling 에서 타임아웃이 나게 해서 중단된 실행을 만듦
+        timeout, batch_runner.BATCH_TIMEOUT_SEC = batch_runner.BATCH_TIMEOUT_SEC, -1
+        try:
+            _run_pipeline(url, wrap, page_ids, batch=True)
+            interrupted = None
+        except TimeoutError as e:
+            interrupted = str(e)
+        finally:
+            batch_runner.BATCH_TIMEOUT_SEC = timeout
+        summary = _run_pipeline(url, wrap, page_ids, batch=True)
+        submitted = _admin(url, "stats")["calls"].get("anthropic.batches.create", 0)
+        if interrupted is None or submitted != 1:
+            raise RuntimeError(f"batch resume not exercised: interrupted={interrupted!r} submitted={submitted}")
+        result = {"interrupted": interrupted, "batches_submitted": submitted, **_summary_counts(summary)}
+
+    return {
+        "wall_sec": round(time.perf_counter() - started, 3),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "result": result,
+    }
+
+
+def _run_pipeline(url: str, wrap, page_ids, batch: bool = False) -> dict:
+    import main
+    from src.claude_client import ClaudeClient
+    from src.extraction_cache import ExtractionCache
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write("\n".join(page_id.replace("-", "") for page_id in page_ids))
+    try:
+        return main.run_pipeline(
+            f.name, use_cache=False, batch=batch, notion=wrap,
+            claude=ClaudeClient(api_key="bench", base_url=f"{url}/anthropic"),
+            cache=ExtractionCache(":memory:"),
+        )
+    finally:
+        os.unlink(f.name)
+
+
+def _summary_counts(summary: dict) -> dict:
+    return {k: (len(v) if isinstance(v, list) else v) for k, v in summary.items()}
+
+
+# ---------- 부모 프로세스 ----------
+def run(args) -> list:
+    from benchmarks.fake_services import FakeServer
+
+    server = FakeServer().start()
+    records = []
+    try:
+        for size in args.sizes:
+            for scenario in args.scenarios:
+                config = {
+                    "n_tasks": size, "n_pages": args.pages, "tree_depth": args.depth, "tree_fanout": args.fanout,
+                    "tasks_per_page": args.tasks_per_page, "latency_ms": args.latency_ms,
+                    "claude_latency_ms": args.claude_latency_ms, "notion_rate": args.notion_rate,
+                    "embed_dim": args.embed_dim,
+                }
+                page_ids = _admin(server.url, "reset", config)["meeting_page_ids"]
+                spec = {"url": server.url, "scenario": scenario, "size": size, "meeting_page_ids": page_ids,
+                        "upsert_tasks": args.upsert_tasks}
+                records.append(_run_scenario(server.url, spec, config, args))
+                print(json.dumps(records[-1], ensure_ascii=False), flush=True)
+    finally:
+        server.shutdown()
+    return records
+
+
+def _run_scenario(url: str, spec: dict, config: dict, args) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(p for p in (ROOT, os.environ.get("PYTHONPATH")) if p),
+            "OPENAI_API_KEY": "bench", "ANTHROPIC_API_KEY": "bench",
+            "NOTION_API_KEY": "bench", "NOTION_DB_ID": DATABASE_ID,
+            "NOTION_RATE_LIMIT": str(args.notion_rate), "LOG_LEVEL": args.log_level,
+            "BATCH_POLL_INITIAL_SEC": "0.05", "BATCH_POLL_MAX_SEC": "0.2",
+        }
+        # 캐시/미러(.cache/) 는 시나리오마다 빈 디렉터리에서 시작
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.bench_offline", "--child", json.dumps(spec)],
+                              cwd=work_dir, env=env, capture_output=True, text=True)
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "scenario": spec["scenario"],
+        "size": spec["size"],
+        "config": config,
+        "calls": _admin(url, "stats")["calls"],
+    }
+    if proc.returncode != 0:
+        record["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        return record
+    record.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    result = record.get("result") or {}
+    if result.get("failed") or result.get("write_failed_pages"):
+        record["error"] = f"failed={result.get('failed')} write_failed_pages={result.get('write_failed_pages')}"
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark against local fake services")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 5000, 50000], help="합성 DB 행 수")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--pages", type=int, default=4, help="회의록 페이지 수")
+    parser.add_argument("--depth", type=int, default=4, help="블록 트리 깊이")
+    parser.add_argument("--fanout", type=int, default=3, help="블록당 자식 수")
+    parser.add_argument("--tasks-per-page", type=int, default=8)
+    parser.add_argument("--upsert-tasks", type=int, default=40, help="upsert 시나리오의 task 수")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Notion / OpenAI 요청당 지연")
+    parser.add_argument("--claude-latency-ms", type=float, default=200.0)
+    parser.add_argument("--notion-rate", type=float, default=0.0, help="초당 요청 수 (서버 429 기준 = 클라이언트 limiter)")
+    parser.add_argument("--embed-dim", type=int, default=1536)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="결과를 JSON lines 로 이어 쓸 파일")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(json.loads(args.child)), ensure_ascii=False))
+        return
+
+    records = run(args)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    sys.exit(1 if any("error" in r for r in records) else 0)
+
+
+if __name__ == "__main__":
+    main()
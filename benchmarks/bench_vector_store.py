@@ -0,0 +1,103 @@
+"""
+VectorStore 벤치마크: 정확한 float32 코사인 대비 recall@k, 메모리, 쿼리 지연시간 (API 호출 없음)
+
+    python -m benchmarks.bench_vector_store --sizes 10000 50000 --queries 100 --probes 4 8 16
+
+- 데이터: 군집 구조가 있는 랜덤 벡터 (실제 task 이름 임베딩처럼 주제별로 뭉쳐 있음)
+- 쿼리: 기존 벡터에 노이즈를 섞은 것 (이름만 조금 바뀐 task)
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.task_matcher import normalize_rows
+from src.vector_store import VectorStore
+
+
+def make_data(n: int, n_queries: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 50), dim), dtype=np.float32)
+    vecs = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.standard_normal((n, dim), dtype=np.float32)
+    picks = rng.choice(n, size=n_queries, replace=False)
+    queries = vecs[picks] + 0.3 * rng.standard_normal((n_queries, dim), dtype=np.float32)
+    return normalize_rows(vecs), normalize_rows(queries)
+
+
+def exact_topk(vecs: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vecs.T
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def recall(results, truth: np.ndarray) -> float:
+    hit = sum(len({int(key) for key, _ in res} & set(row.tolist())) for res, row in zip(results, truth))
+    return hit / truth.size
+
+
+def recall_at_1(results, best: np.ndarray) -> float:
+    # upsert 매칭은 top-1 만 쓰므로 따로 봄
+    return float(np.mean([bool(res) and int(res[0][0]) == b for res, b in zip(results, best)]))
+
+
+def list_of_floats_bytes(n: int, dim: int) -> int:
+    # 벡터 저장소 전에 쓰던 existing_tasks 의 embedding: list 객체(8B 포인터 × dim + 56B) + float 객체(24B) × dim
+    return n * (56 + dim * 8 + dim * 24)
+
+
+def timed(fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return out, best
+
+
+def run(sizes, n_queries: int, dim: int, k: int, probes):
+    print(f"{'rows':>7} {'config':<16} {'recall@1':>9} {'recall@' + str(k):>9} {'ms/query':>9} {'MB':>8}")
+    for n in sizes:
+        vecs, queries = make_data(n, n_queries, dim)
+        truth = exact_topk(vecs, queries, k)
+        best = np.argmax(queries @ vecs.T, axis=1)
+        _, exact_sec = timed(lambda: exact_topk(vecs, queries, k))
+        print(f"{n:>7} {'float32 lists':<16} {1.0:>9.3f} {1.0:>9.3f} {'-':>9} {list_of_floats_bytes(n, dim) / 1e6:>8.1f}")
+        print(f"{n:>7} {'float32 exact':<16} {1.0:>9.3f} {1.0:>9.3f} {exact_sec * 1000 / n_queries:>9.3f} "
+              f"{vecs.nbytes / 1e6:>8.1f}")
+
+        for dtype in ("float16", "int8"):
+            with tempfile.TemporaryDirectory() as tmp:
+                store = VectorStore(tmp, dim=dim, dtype=dtype)
+                store.add([str(i) for i in range(n)], vecs)
+                res, sec = timed(lambda: store.search(queries, k=k, n_probe=0))
+                print(f"{n:>7} {dtype + ' flat':<16} {recall_at_1(res, best):>9.3f} {recall(res, truth):>9.3f} "
+                      f"{sec * 1000 / n_queries:>9.3f} {store.nbytes() / 1e6:>8.1f}")
+                if dtype != "int8":
+                    continue
+                t = time.perf_counter()
+                store.build_index()
+                build_sec = time.perf_counter() - t
+                for n_probe in probes:
+                    # 쿼리 하나씩 (upsert 한 번에 들어오는 task 수가 적은 경우)
+                    res, sec = timed(lambda: [store.search(q, k=k, n_probe=n_probe)[0] for q in queries])
+                    print(f"{n:>7} {f'int8 ivf p={n_probe}':<16} {recall_at_1(res, best):>9.3f} {recall(res, truth):>9.3f} "
+                          f"{sec * 1000 / n_queries:>9.3f} {store.nbytes() / 1e6:>8.1f}")
+                print(f"{n:>7} {'(ivf build)':<16} {len(store.centroids)} lists in {build_sec:.2f}s")
+                store.close()
+        sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStore recall / memory / latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=1536, help="text-embedding-3-small 차원")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.dim, args.k, args.probes)
+
+
+if __name__ == "__main__":
+    main()
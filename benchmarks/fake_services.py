@@ -0,0 +1,547 @@
+"""
+Notion / OpenAI / Anthropic 로컬 대역(stand-in) HTTP 서버 (벤치마크 전용, 외부 네트워크 없음)
+
+- 한 서버가 경로 prefix 로 세 서비스를 흉내냄
+    /notion/v1/...      databases.retrieve / databases.query / pages.* / blocks.children.list / search
+    /openai/v1/...      embeddings (float / base64)
+    /anthropic/v1/...   messages (stream=true 면 SSE), messages/batches create / retrieve / results(JSONL)
+- 요청마다 latency_ms 만큼 지연, notion_rate > 0 이면 초과 요청에 429 + Retry-After
+- message batch 는 retrieve 를 batch_polls 번 받을 때까지 in_progress, 그 뒤 ended
+- 합성 DB(n_tasks 행)와 회의록 페이지 블록 트리(depth × fanout)를 reset 때 생성
+- 회의록 페이지는 MEETING_PARENT_ID 아래 "회의록 N" 페이지, reset 시각 meeting_edited_ago_sec 전에 편집된 것으로 보임
+  (--watch 의 search polling 대상)
+- /_admin/reset (POST, config JSON), /_admin/stats (GET, endpoint 별 호출 수),
+  /_admin/touch (POST {"page_id"}, 회의록 페이지 last_edited_time 을 지금으로)
+"""
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+FIELDS = ["AI", "BE", "FE", "기획", "디자인"]
+SCHEMA = {
+    "name": {"id": "title", "type": "title"},
+    "field": {"id": "fld", "type": "select"},
+    "process": {"id": "prc", "type": "select"},
+    "function": {"id": "fnc", "type": "select"},
+    "start": {"id": "sta", "type": "date"},
+    "end": {"id": "end", "type": "date"},
+    "description": {"id": "dsc", "type": "rich_text"},
+    "priority": {"id": "pri", "type": "select"},
+    "progress": {"id": "prg", "type": "number"},
+}
+_ID_TO_NAME = {v["id"]: k for k, v in SCHEMA.items()}
+MEETING_PARENT_ID = "0000cafe-0000-4000-8000-00000000cafe"
+_WORDS = ["배포", "자동화", "로그인", "검색", "랭킹", "모델", "대시보드", "알림", "결제", "리팩터링", "성능", "개선"]
+
+DEFAULT_CONFIG = {
+    "n_tasks": 100,          # 합성 DB 행 수
+    "n_pages": 4,            # 회의록 페이지 수
+    "tree_depth": 4,         # 회의록 블록 트리 깊이
+    "tree_fanout": 3,        # 블록당 자식 수
+    "tasks_per_page": 8,     # 회의록 페이지당 task(heading) 수
+    "dup_ratio": 0.5,        # 회의록 task 중 DB 에 이미 있는 이름 비율
+    "latency_ms": 10.0,      # 요청당 지연
+    "claude_latency_ms": 200.0,
+    "notion_rate": 0.0,      # 초당 허용 요청 수 (0 이면 제한 없음)
+    "embed_dim": 1536,
+    "batch_polls": 1,        # message batch 가 ended 되기 전까지 in_progress 로 응답하는 retrieve 수
+    "meeting_edited_ago_sec": 600,  # 회의록 페이지 last_edited_time (reset 시각 기준)
+    "database_id": "bench-db",      # 합성 task 행의 parent DB
+}
+
+
+def now_iso(ago_sec: float = 0) -> str:
+    dt = datetime.now(timezone.utc) - timedelta(seconds=ago_sec)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def task_name(i: int) -> str:
+    return f"{_WORDS[i % len(_WORDS)]} {_WORDS[(i // len(_WORDS)) % len(_WORDS)]} 과제 {i:05d}"
+
+
+def fake_embedding(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:4], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def _rich(text: str) -> List[Dict[str, Any]]:
+    return [{"type": "text", "text": {"content": text}, "plain_text": text}]
+
+
+def _prop_value(name: str, value) -> Dict[str, Any]:
+    t = SCHEMA[name]["type"]
+    if t in ("title", "rich_text"):
+        body = _rich(value) if value else []
+    elif t == "select":
+        body = {"name": value} if value else None
+    elif t == "date":
+        body = {"start": value} if value else None
+    else:
+        body = value
+    return {"id": SCHEMA[name]["id"], "type": t, t: body}
+
+
+class FakeState:
+    """
+    서버 전체가 공유하는 합성 데이터 + 호출 통계 (lock 하나로 보호)
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.lock = threading.Lock()
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.calls: Dict[str, int] = {}
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.order: List[str] = []
+        self._seq = 0
+        self._tokens = float(self.config["notion_rate"])
+        self._updated = time.monotonic()
+        for i in range(self.config["n_tasks"]):
+            self._create(self.config["database_id"], {
+                "name": task_name(i), "field": FIELDS[i % len(FIELDS)], "process": "진행중", "function": "개선",
+                "start": "2025-09-01", "end": "2025-09-30", "description": f"설명 {i}", "priority": "보통",
+                "progress": (i * 7) % 100,
+            }, edited="2025-09-01T00:00:00.000Z")
+        edited = now_iso(self.config["meeting_edited_ago_sec"])
+        self.meeting_pages = {
+            page_id: {"object": "page", "id": page_id, "archived": False, "in_trash": False,
+                      "parent": {"type": "page_id", "page_id": MEETING_PARENT_ID},
+                      "created_time": edited, "last_edited_time": edited,
+                      "properties": {"title": {"id": "title", "type": "title", "title": _rich(f"회의록 {i + 1}")}}}
+            for i, page_id in enumerate(self.meeting_page_ids())
+        }
+
+    # ---------- 공통 ----------
+    def count(self, endpoint: str) -> None:
+        with self.lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def allow_notion(self) -> bool:
+        rate = self.config["notion_rate"]
+        if rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    # ---------- Notion: DB ----------
+    def _new_id(self) -> str:
+        self._seq += 1
+        return f"{self._seq:08x}-0000-4000-8000-{self._seq:012x}"
+
+    def _create(self, database_id: str, values: Dict[str, Any], edited: str = None) -> Dict[str, Any]:
+        page_id = self._new_id()
+        page = {
+            "object": "page", "id": page_id, "archived": False, "in_trash": False,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "created_time": edited or now_iso(), "last_edited_time": edited or now_iso(),
+            "properties": {name: _prop_value(name, values.get(name)) for name in SCHEMA},
+        }
+        self.pages[page_id] = page
+        self.order.append(page_id)
+        return page
+
+    def create_page(self, database_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            page = self._create(database_id, {})
+            self._apply(page, properties)
+            return page
+
+    def update_page(self, page_id: str, properties: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            page = self.pages.get(page_id)
+            if page is None:
+                return None
+            self._apply(page, properties)
+            page["last_edited_time"] = now_iso()
+            return page
+
+    @staticmethod
+    def _apply(page: Dict[str, Any], properties: Dict[str, Any]) -> None:
+        for key, payload in properties.items():
+            name = _ID_TO_NAME.get(key, key)
+            if name not in SCHEMA:
+                continue
+            t = SCHEMA[name]["type"]
+            body = payload.get(t)
+            if t in ("title", "rich_text"):
+                body = _rich("".join((rt.get("text") or {}).get("content", "") for rt in body or []))
+            page["properties"][name] = {"id": SCHEMA[name]["id"], "type": t, t: body}
+
+    def query(self, body: Dict[str, Any], filter_properties: List[str]) -> Dict[str, Any]:
+        flt = body.get("filter") or {}
+        start = int(body.get("start_cursor") or 0)
+        size = min(100, int(body.get("page_size") or 100))
+        with self.lock:
+            rows = [self.pages[pid] for pid in self.order]
+        if "select" in flt:
+            name = _ID_TO_NAME.get(flt.get("property"), flt.get("property"))
+            want = flt["select"].get("equals")
+            rows = [p for p in rows if (p["properties"][name]["select"] or {}).get("name") == want]
+        if flt.get("timestamp") == "last_edited_time":
+            since = flt["last_edited_time"].get("on_or_after")
+            rows = [p for p in rows if p["last_edited_time"] >= since]
+        chunk = rows[start:start + size]
+        if filter_properties:
+            keep = set(filter_properties)
+            chunk = [{**p, "properties": {k: v for k, v in p["properties"].items() if v["id"] in keep}}
+                     for p in chunk]
+        has_more = start + size < len(rows)
+        return {"object": "list", "results": chunk, "has_more": has_more,
+                "next_cursor": str(start + size) if has_more else None}
+
+    def search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        /v1/search: task 행 + 회의록 페이지를 last_edited_time 기준으로 정렬 (query 는 제목 부분 일치)
+        """
+        start = int(body.get("start_cursor") or 0)
+        size = min(100, int(body.get("page_size") or 100))
+        text = body.get("query") or ""
+        with self.lock:
+            rows = [self.pages[pid] for pid in self.order] + list(self.meeting_pages.values())
+        if text:
+            rows = [p for p in rows if text in _page_title(p)]
+        descending = (body.get("sort") or {}).get("direction", "descending") == "descending"
+        rows.sort(key=lambda p: p["last_edited_time"], reverse=descending)
+        chunk = rows[start:start + size]
+        has_more = start + size < len(rows)
+        return {"object": "list", "results": chunk, "has_more": has_more,
+                "next_cursor": str(start + size) if has_more else None}
+
+    def touch(self, page_id: str) -> bool:
+        with self.lock:
+            page = self.meeting_pages.get(page_id)
+            if page is None:
+                return False
+            page["last_edited_time"] = now_iso()
+            return True
+
+    # ---------- Notion: 회의록 블록 트리 ----------
+    def meeting_page_ids(self) -> List[str]:
+        return [f"{i + 1:08x}-1111-4000-8000-{i + 1:012x}" for i in range(self.config["n_pages"])]
+
+    def children(self, block_id: str) -> List[Dict[str, Any]]:
+        """
+        블록 id 에 경로를 담아서 트리를 저장하지 않고 그때그때 생성
+        - 페이지 직속 자식: task heading (tasks_per_page 개) + 하위 메모 블록
+        - 그 아래는 depth 까지 fanout 개씩 문단
+        """
+        cfg = self.config
+        page_id, _, path = block_id.partition("~")
+        depth = len(path.split(".")) if path else 0
+        page_ids = self.meeting_page_ids()
+        if depth >= cfg["tree_depth"] or page_id not in page_ids:
+            return []
+        page_no = page_ids.index(page_id)
+        blocks = []
+        count = cfg["tasks_per_page"] if depth == 0 else cfg["tree_fanout"]
+        for i in range(count):
+            child_id = f"{page_id}~{path + '.' if path else ''}{i}"
+            if depth == 0:
+                # dup_ratio 만큼은 DB 에 있는 이름을 그대로 씀 (exact 매칭 대상)
+                n_dup = int(cfg["tasks_per_page"] * cfg["dup_ratio"])
+                idx = page_no * cfg["tasks_per_page"] + i
+                name = task_name(idx % max(1, cfg["n_tasks"])) if i < n_dup else f"신규 과제 {page_no}-{i}"
+                block = {"type": "heading_2", "heading_2": {"rich_text": _rich(name)}}
+            else:
+                block = {"type": "paragraph", "paragraph": {"rich_text": _rich(f"메모 {child_id[-12:]} 진행 상황 공유")}}
+            blocks.append({"object": "block", "id": child_id, "has_children": depth + 1 < cfg["tree_depth"], **block})
+        return blocks
+
+
+    # ---------- Anthropic: message batch ----------
+    def create_batch(self, requests: List[Dict[str, Any]]) -> str:
+        with self.lock:
+            batch_id = f"msgbatch_{len(self.batches) + 1:08x}"
+            self.batches[batch_id] = {"requests": requests, "polls": 0, "created_at": now_iso()}
+            return batch_id
+
+    def poll_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        retrieve 한 번 (polls 증가). 없는 batch 면 None
+        """
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            batch["polls"] += 1
+            if batch["polls"] > self.config["batch_polls"] and "ended_at" not in batch:
+                batch["ended_at"] = now_iso()
+            return batch
+
+
+def _page_title(page: Dict[str, Any]) -> str:
+    for prop in page["properties"].values():
+        if prop.get("type") == "title":
+            return "".join(t.get("plain_text", "") for t in prop.get("title") or [])
+    return ""
+
+
+# ---------- Anthropic 응답 ----------
+_HEADING_RE = re.compile(r"^# (.+)$", re.MULTILINE)
+
+
+def fake_tasks(prompt: str) -> List[Dict[str, Any]]:
+    """
+    프롬프트의 실제 회의록 부분에서 heading 하나당 task 하나
+    """
+    text = prompt.split("# 실제 회의록", 1)[-1]
+    names = [m.strip() for m in _HEADING_RE.findall(text)]
+    return [{
+        "name": name, "field": FIELDS[i % len(FIELDS)], "process": "진행중", "function": "개선",
+        "start": "2025-09-01", "end": "2025-09-30", "description": f"{name} 진행 상황", "priority": "보통",
+        "progress": 50,
+    } for i, name in enumerate(names)]
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def anthropic_stream(body: Dict[str, Any], text: str) -> str:
+    usage = {"input_tokens": len(json.dumps(body, ensure_ascii=False)) // 2, "output_tokens": 1,
+             "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+    out = [_sse("message_start", {"type": "message_start", "message": {
+        "id": "msg_fake", "type": "message", "role": "assistant", "model": body.get("model"), "content": [],
+        "stop_reason": None, "stop_sequence": None, "usage": usage}})]
+    out.append(_sse("content_block_start", {"type": "content_block_start", "index": 0,
+                                            "content_block": {"type": "text", "text": ""}}))
+    for i in range(0, len(text), 48):
+        out.append(_sse("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": text[i:i + 48]}}))
+    out.append(_sse("content_block_stop", {"type": "content_block_stop", "index": 0}))
+    out.append(_sse("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": len(text) // 2}}))
+    out.append(_sse("message_stop", {"type": "message_stop"}))
+    return "".join(out)
+
+
+def anthropic_message(body: Dict[str, Any], text: str) -> Dict[str, Any]:
+    return {"id": "msg_fake", "type": "message", "role": "assistant", "model": body.get("model"),
+            "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": len(json.dumps(body, ensure_ascii=False)) // 2, "output_tokens": len(text) // 2}}
+
+
+def _prompt_text(params: Dict[str, Any]) -> str:
+    return "".join(
+        m["content"] if isinstance(m["content"], str) else "".join(c.get("text", "") for c in m["content"])
+        for m in params.get("messages", [])
+    )
+
+
+def batch_object(batch_id: str, batch: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    ended = "ended_at" in batch
+    n = len(batch["requests"])
+    return {
+        "id": batch_id, "type": "message_batch", "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {"processing": 0 if ended else n, "succeeded": n if ended else 0,
+                           "errored": 0, "canceled": 0, "expired": 0},
+        "created_at": batch["created_at"], "ended_at": batch.get("ended_at"), "expires_at": batch["created_at"],
+        "archived_at": None, "cancel_initiated_at": None,
+        "results_url": f"{base_url}/anthropic/v1/messages/batches/{batch_id}/results" if ended else None,
+    }
+
+
+def batch_results(batch: Dict[str, Any]) -> str:
+    lines = []
+    for req in batch["requests"]:
+        params = req["params"]
+        text = json.dumps(fake_tasks(_prompt_text(params)), ensure_ascii=False)
+        lines.append(json.dumps({"custom_id": req["custom_id"],
+                                 "result": {"type": "succeeded", "message": anthropic_message(params, text)}},
+                                ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+# ---------- HTTP ----------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _send(self, status: int, payload, content_type: str = "application/json", headers: Dict[str, str] = None):
+        data = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def _route(self, method: str) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        body = self._body() if method in ("POST", "PATCH") else {}
+        if parts[:1] == ["_admin"]:
+            return self._admin(parts[1], body)
+        state = self.server.state
+        service = parts[0]
+        if service == "notion":
+            if not state.allow_notion():
+                state.count("notion.429")
+                return self._send(429, {"object": "error", "status": 429, "code": "rate_limited",
+                                        "message": "Rate limited"}, headers={"Retry-After": "1"})
+            time.sleep(state.config["latency_ms"] / 1000)
+            return self._notion(method, parts[2:], body, parse_qs(url.query))
+        if service == "openai":
+            time.sleep(state.config["latency_ms"] / 1000)
+            return self._openai(parts[2:], body)
+        if service == "anthropic":
+            time.sleep(state.config["claude_latency_ms"] / 1000)
+            return self._anthropic(method, parts[2:], body)
+        self._send(404, {"message": f"unknown path {url.path}"})
+
+    def _admin(self, action: str, body: Dict[str, Any]) -> None:
+        if action == "reset":
+            self.server.state = FakeState(body)
+            return self._send(200, {"ok": True, "meeting_page_ids": self.server.state.meeting_page_ids()})
+        if action == "touch":
+            return self._send(200, {"ok": self.server.state.touch(body.get("page_id"))})
+        self._send(200, {"calls": self.server.state.calls, "config": self.server.state.config})
+
+    def _notion(self, method: str, parts: List[str], body: Dict[str, Any], query: Dict[str, List[str]]) -> None:
+        state = self.server.state
+        not_found = {"object": "error", "status": 404, "code": "object_not_found", "message": "Not found"}
+        if parts[0] == "databases" and len(parts) == 2 and method == "GET":
+            state.count("notion.databases.retrieve")
+            return self._send(200, {"object": "database", "id": parts[1], "properties": SCHEMA})
+        if parts[0] == "databases" and parts[-1] == "query":
+            state.count("notion.databases.query")
+            return self._send(200, state.query(body, query.get("filter_properties", [])))
+        if parts[0] == "pages" and len(parts) == 1 and method == "POST":
+            state.count("notion.pages.create")
+            parent = body.get("parent") or {}
+            return self._send(200, state.create_page(parent.get("database_id", ""), body.get("properties") or {}))
+        if parts[0] == "pages" and method == "PATCH":
+            state.count("notion.pages.update")
+            page = state.update_page(parts[1], body.get("properties") or {})
+            return self._send(200, page) if page else self._send(404, not_found)
+        if parts[0] == "pages" and method == "GET":
+            state.count("notion.pages.retrieve")
+            page = state.pages.get(parts[1]) or state.meeting_pages.get(parts[1]) or {
+                "object": "page", "id": parts[1], "properties": {}, "last_edited_time": "2025-09-01T00:00:00.000Z"}
+            return self._send(200, page)
+        if parts == ["search"] and method == "POST":
+            state.count("notion.search")
+            return self._send(200, state.search(body))
+        if parts[0] == "blocks" and parts[-1] == "children":
+            state.count("notion.blocks.children.list")
+            blocks = state.children(parts[1])
+            start = int((query.get("start_cursor") or ["0"])[0])
+            size = min(100, int((query.get("page_size") or ["100"])[0]))
+            has_more = start + size < len(blocks)
+            return self._send(200, {"object": "list", "results": blocks[start:start + size], "has_more": has_more,
+                                    "next_cursor": str(start + size) if has_more else None})
+        self._send(404, not_found)
+
+    def _openai(self, parts: List[str], body: Dict[str, Any]) -> None:
+        state = self.server.state
+        if parts != ["embeddings"]:
+            return self._send(404, {"error": {"message": "unknown endpoint"}})
+        state.count("openai.embeddings")
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        dim = state.config["embed_dim"]
+        data = []
+        for i, text in enumerate(inputs):
+            vec = fake_embedding(text, dim)
+            emb = base64.b64encode(vec.tobytes()).decode() if body.get("encoding_format") == "base64" else vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        tokens = sum(len(t) for t in inputs) // 2
+        self._send(200, {"object": "list", "data": data, "model": body.get("model"),
+                         "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _anthropic(self, method: str, parts: List[str], body: Dict[str, Any]) -> None:
+        state = self.server.state
+        not_found = {"type": "error", "error": {"type": "not_found_error", "message": "unknown"}}
+        if parts[:2] == ["messages", "batches"]:
+            return self._batches(method, parts[2:], body)
+        if parts != ["messages"]:
+            return self._send(404, not_found)
+        state.count("anthropic.messages")
+        text = json.dumps(fake_tasks(_prompt_text(body)), ensure_ascii=False)
+        if body.get("stream"):
+            return self._send(200, anthropic_stream(body, text), content_type="text/event-stream")
+        self._send(200, anthropic_message(body, text))
+
+    def _batches(self, method: str, parts: List[str], body: Dict[str, Any]) -> None:
+        state = self.server.state
+        not_found = {"type": "error", "error": {"type": "not_found_error", "message": "batch not found"}}
+        if not parts and method == "POST":
+            state.count("anthropic.batches.create")
+            batch_id = state.create_batch(body.get("requests") or [])
+            return self._send(200, batch_object(batch_id, state.batches[batch_id], self.server.url))
+        batch_id = parts[0] if parts else ""
+        if len(parts) == 1 and method == "GET":
+            state.count("anthropic.batches.retrieve")
+            batch = state.poll_batch(batch_id)
+            return self._send(200, batch_object(batch_id, batch, self.server.url)) if batch else self._send(404, not_found)
+        if parts[1:] == ["results"] and method == "GET":
+            state.count("anthropic.batches.results")
+            batch = state.batches.get(batch_id)
+            if batch is None or "ended_at" not in batch:
+                return self._send(404, not_found)
+            return self._send(200, batch_results(batch), content_type="application/binary")
+        self._send(404, not_found)
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: Dict[str, Any] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.state = FakeState(config or {})
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        threading.Thread(target=self.serve_forever, name="fake-services", daemon=True).start()
+        return self
+
+
+def serve(config: Dict[str, Any] = None) -> Tuple[FakeServer, str]:
+    server = FakeServer(config).start()
+    return server, server.url
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the fake Notion/OpenAI/Anthropic server")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    srv = FakeServer(port=args.port)
+    print(f"Serving fake services on {srv.url}")
+    srv.serve_forever()
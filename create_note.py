@@ -1,6 +1,7 @@
 # meeting_note.py
 import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from dotenv import load_dotenv
 from src.notion_client_wrap import NotionClientWrap
@@ -10,14 +11,27 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("insty")
 
 
-def fetch_tasks_by_field(notion_token: str, database_id: str, field_name: str):
+# 회의록 초안에 쓰는 속성만 받음
+NOTE_PROPERTIES = ["name", "field", "process", "priority", "start", "end", "progress", "description"]
+
+
+def fetch_tasks_by_field(notion: NotionClientWrap, database_id: str, field_name: str):
     """
-    Notion DB에서 업무영역(field_name) 기준으로 task를 가져옴
+    Notion DB에서 업무영역(field_name) 기준으로 task를 가져옴 (필터는 Notion 서버에서 적용)
     """
-    notion = NotionClientWrap(notion_token)
-    all_tasks = notion.query_database(database_id)
-    filtered = [t for t in all_tasks if t.get("field") == field_name]
-    return filtered
+    return notion.query_database(database_id, field=field_name, properties=NOTE_PROPERTIES)
+
+
+def fetch_tasks_grouped_by_field(notion: NotionClientWrap, database_id: str):
+    """
+    DB 를 한 번만 조회해서 업무영역별로 묶음 (field 가 비어있는 task 는 제외)
+    returns: field -> task 목록
+    """
+    grouped = {}
+    for t in notion.query_database(database_id, properties=NOTE_PROPERTIES):
+        if t.get("field"):
+            grouped.setdefault(t["field"], []).append(t)
+    return grouped
 
 
 def generate_meeting_note(tasks: list):
@@ -27,8 +41,12 @@ def generate_meeting_note(tasks: list):
     today = date.today().isoformat()
     note_lines = [f"### {tasks[0]['field']} 팀 주간 회의록 초안 ({today})\n"]
 
+    # 진행률 기준으로 한 번에 나눔 (progress 가 비어있으면 0 으로 취급)
+    updated_tasks, new_tasks = [], []
+    for t in tasks:
+        (updated_tasks if (t.get("progress") or 0) > 0 else new_tasks).append(t)
+
     # 업데이트 된 업무
-    updated_tasks = [t for t in tasks if t.get("진행률", 0) > 0]
     note_lines.append("####  업데이트 된 업무\n> \n")
     for t in updated_tasks:
         note_lines.append(f"- **{t.get('name')}**")
@@ -40,7 +58,6 @@ def generate_meeting_note(tasks: list):
         note_lines.append(f"  - 업데이트 사항:\n    - {t.get('description','')}\n")
 
     # 신규 업무 (진행률 0 혹은 새로운 task)
-    new_tasks = [t for t in tasks if t.get("진행률", 0) == 0]
     if new_tasks:
         note_lines.append("---\n")
         note_lines.append("####  신규 업무\n> 이번 주 새로 생성된 업무 항목\n")
@@ -59,9 +76,21 @@ def generate_meeting_note(tasks: list):
     return "\n".join(note_lines)
 
 
+def write_meeting_note(tasks: list, out_dir: str = ".") -> str:
+    field = tasks[0]["field"]
+    output_file = os.path.join(out_dir, f"meeting_note_{field.replace(os.sep, '_')}.md")
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(generate_meeting_note(tasks))
+    logger.info(f"Meeting note generated: {output_file} ({len(tasks)} tasks)")
+    return output_file
+
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--field", required=True, help="업무영역 (예: AI, 기획, 개발)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--field", help="업무영역 (예: AI, 기획, 개발)")
+    target.add_argument("--all-fields", action="store_true", help="DB 한 번 조회로 모든 업무영역의 회의록 초안 생성")
+    parser.add_argument("--out-dir", default=".", help="회의록 초안을 저장할 디렉터리")
     args = parser.parse_args()
 
     load_dotenv()
@@ -69,17 +98,23 @@ def main():
     database_id = os.getenv("NOTION_DB_ID")
     if not notion_token or not database_id:
         raise RuntimeError("NOTION_API_KEY, NOTION_DB_ID must be set in .env")
+    os.makedirs(args.out_dir, exist_ok=True)
+    notion = NotionClientWrap(notion_token)
 
-    tasks = fetch_tasks_by_field(notion_token, database_id, args.field)
+    if args.all_fields:
+        grouped = fetch_tasks_grouped_by_field(notion, database_id)
+        if not grouped:
+            logger.warning("No tasks found in database")
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(grouped))) as pool:
+            list(pool.map(lambda tasks: write_meeting_note(tasks, args.out_dir), grouped.values()))
+        return
+
+    tasks = fetch_tasks_by_field(notion, database_id, args.field)
     if not tasks:
         logger.warning(f"No tasks found for field '{args.field}'")
         return
-
-    note_md = generate_meeting_note(tasks)
-    output_file = f"meeting_note_{args.field}.md"
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(note_md)
-    logger.info(f"Meeting note generated: {output_file}")
+    write_meeting_note(tasks, args.out_dir)
 
 
 if __name__ == "__main__":
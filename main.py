@@ -1,17 +1,38 @@
+import asyncio
 import os
 import re
+import time
 import argparse
 from datetime import datetime
 from dotenv import load_dotenv
 
 from src.logger import get_logger
 from src.utils import read_file, extract_notion_page_id
-from src.claude_client import ClaudeClient
+from src.claude_client import ClaudeClient, CLAUDE_MODEL
 from src.notion_client_wrap import NotionClientWrap
+from src.extraction_cache import ExtractionCache
+from src.prompt_builder import PROMPT_VERSION
+from src.pipeline import run_stages, arun_stages
+from src.batch_runner import BatchExtractionRunner
+from src.http_pool import AsyncHTTPPool
+from src.async_clients import AsyncNotionClientWrap, AsyncClaudeClient
+from src.metrics import metrics, METRICS_PATH, METRICS_PROM_PATH
+from src.run_journal import RunJournal, run_key
+from src.page_watcher import MeetingPageWatcher
+from src.normalizer import normalize_tasks
+from src.consolidator import TaskConsolidator
+
+PIPELINE_FETCH_WORKERS = max(1, int(os.getenv("PIPELINE_FETCH_WORKERS", "4")))
+PIPELINE_EXTRACT_WORKERS = max(1, int(os.getenv("PIPELINE_EXTRACT_WORKERS", "3")))
 
 logger = get_logger("insty")
 
 def extract_page_ids_from_text(file_path: str) -> list[str]:
+    with metrics.span("parse_page_ids"):
+        return _parse_page_ids(file_path)
+
+
+def _parse_page_ids(file_path: str) -> list[str]:
 
     with open(file_path, "r", encoding="utf-8") as f:
         text = f.read().strip()
@@ -31,15 +52,24 @@ def extract_page_ids_from_text(file_path: str) -> list[str]:
     return page_ids
 
 
-def run_pipeline(meetingnote_path: str):
+def run_pipeline(meetingnote_path: str = None, use_cache: bool = True, batch: bool = False,
+                 notion: NotionClientWrap = None, claude: ClaudeClient = None, cache: ExtractionCache = None,
+                 journal: RunJournal = None, resume: bool = True, page_ids: list[str] = None):
+    """
+    notion / claude / cache / journal 을 넘기면 그대로 사용 (--watch 나 벤치마크처럼 여러 번 돌릴 때), 아니면 .env 설정으로 생성
+    resume: 같은 입력으로 중단된 실행이 journal 에 있으면 기록된 추출 결과와 남은 mutation 부터 이어감
+    page_ids: 주면 meetingnote 파일 대신 이 페이지들을 처리
+    """
     load_dotenv()
 
     notion_token = os.getenv("NOTION_API_KEY")
     notion_db_id = os.getenv("NOTION_DB_ID")
-    if not notion_token or not notion_db_id:
+    if not notion_db_id or (notion is None and not notion_token):
         raise RuntimeError("NOTION_API_KEY, NOTION_DB_ID must be set in .env")
 
-    page_ids = extract_page_ids_from_text(meetingnote_path)
+    metrics.reset()
+    if page_ids is None:
+        page_ids = extract_page_ids_from_text(meetingnote_path)
 
     # # 1) meetingnote.txt에서 노션 페이지 ID 파싱
     # raw = read_file(meetingnote_path)
@@ -47,36 +77,404 @@ def run_pipeline(meetingnote_path: str):
     # logger.info(f"Parsed Notion page id: {page_id}")
 
     # 2) 노션 페이지의 순수 텍스트 수집
+    notion = notion or NotionClientWrap(notion_token)
+    claude = claude or ClaudeClient()
+    stages = _PageStages(notion_db_id, page_ids, cache or ExtractionCache(), journal or RunJournal(), use_cache, resume)
+
+    def fetch_stage(item: dict):
+        stages.begin(item)
+        item["last_edited"] = notion.get_page_last_edited(item["page_id"])
+        if not stages.restore_extraction(item):
+            stages.fetched(item, notion.fetch_page_plain_text(item["page_id"]))
+
+    def extract_stage(item: dict):
+        # 3) Claude로 업무 항목 추출
+        if not stages.lookup_text_cache(item):
+            stages.extracted(item, claude.extract_tasks(item["text"], stages.meeting_date_str))
+
+    def consolidate_stage(extracted: list[dict]):
+        # 4) 모든 페이지 추출이 끝난 뒤: DB select 옵션 기준으로 값 정리 + 페이지 간 중복 task 병합
+        schema = notion.get_db_schema(notion_db_id)
+        consolidator = stages.prepare_consolidation(extracted, schema)
+        embeddings = None
+        try:
+            # 제목(정확 / n-gram)으로 기존 DB 페이지가 정해지는 묶음은 먼저 정리하고 남은 것만 임베딩
+            if consolidator.multi_page:
+                notion.sync_mirror(notion_db_id, schema["title"])
+                _resolve_consolidation(consolidator, notion.mirror.titles(notion_db_id))
+            names = consolidator.names_to_embed()
+            if names:
+                embeddings = dict(zip(names, notion.get_embeddings(names)))
+        except Exception as e:
+            logger.warning(f"Consolidation lookup failed, merging by name only: {e}")
+        _apply_consolidation(extracted, consolidator, embeddings)
+
+    def upsert_stage(item: dict):
+        # 5) Notion DB 업서트 (있으면 update, 없으면 create) - 같은 DB 라 한 번에 한 페이지씩
+        if stages.has_tasks(item):
+            stages.upserted(item, notion.upsert_tasks(notion_db_id, item["tasks"], journal=stages.page_journal(item)))
+
+    started = time.perf_counter()
+    items = [{"page_id": page_id} for page_id in page_ids]
+    if not batch:
+        # 추출까지는 페이지별로 겹쳐 실행하고, 병합을 위해 업서트 전에 전부 모음
+        extracted = run_stages(
+            items,
+            [
+                ("fetch", fetch_stage, PIPELINE_FETCH_WORKERS),
+                ("extract", extract_stage, PIPELINE_EXTRACT_WORKERS),
+            ],
+        )
+        consolidate_stage(extracted)
+        results = run_stages(extracted, [("upsert", upsert_stage, 1)])
+        return stages.finish(results, time.perf_counter() - started)
+
+    # --batch: 전부 가져온 뒤 캐시에 없는 페이지만 Message Batch 하나로 제출하고, 결과로 업서트
+    fetched = run_stages(items, [("fetch", fetch_stage, PIPELINE_FETCH_WORKERS)])
+    pending = [it for it in fetched if not it.get("error") and not it.get("done") and not stages.lookup_text_cache(it)]
+    if pending:
+        batch_results = BatchExtractionRunner(claude).run(
+            [{"page_id": it["page_id"], "text": it["text"], "meeting_date": stages.meeting_date_str} for it in pending]
+        )
+        for item in pending:
+            tasks = batch_results.get(item["page_id"])
+            if tasks is None:
+                item["error"] = "extract: batch request failed"
+                continue
+            stages.extracted(item, tasks, "batch")
+
+    consolidate_stage(fetched)
+    results = run_stages(fetched, [("upsert", upsert_stage, 1)])
+    return stages.finish(results, time.perf_counter() - started)
+
+
+async def run_pipeline_async(meetingnote_path: str, use_cache: bool = True, resume: bool = True):
+    """
+    run_pipeline 과 같은 흐름을 이벤트 루프 하나에서 실행 (Notion/OpenAI/Anthropic 연결은 공유 pool 사용)
+    - 단계 본문은 _PageStages 를 run_pipeline 과 공유하고, 스레드 대신 arun_stages 코루틴으로 실행
+    - 전부 추출한 뒤 페이지 간 중복 task 병합, 업서트는 한 번에 하나씩
+    """
+    load_dotenv()
+
+    notion_token = os.getenv("NOTION_API_KEY")
+    notion_db_id = os.getenv("NOTION_DB_ID")
+    if not notion_token or not notion_db_id:
+        raise RuntimeError("NOTION_API_KEY, NOTION_DB_ID must be set in .env")
+
+    metrics.reset()
+    page_ids = extract_page_ids_from_text(meetingnote_path)
+    stages = _PageStages(notion_db_id, page_ids, ExtractionCache(), RunJournal(), use_cache, resume)
+
+    async with AsyncHTTPPool() as pool:
+        notion = AsyncNotionClientWrap(notion_token, pool)
+        claude = AsyncClaudeClient(pool)
+
+        async def fetch_stage(item: dict):
+            stages.begin(item)
+            item["last_edited"] = await notion.get_page_last_edited(item["page_id"])
+            if not stages.restore_extraction(item):
+                stages.fetched(item, await notion.fetch_page_plain_text(item["page_id"]))
+
+        async def extract_stage(item: dict):
+            if not stages.lookup_text_cache(item):
+                stages.extracted(item, await claude.extract_tasks(item["text"], stages.meeting_date_str))
+
+        async def consolidate_stage(extracted: list[dict]):
+            schema = await notion.get_db_schema(notion_db_id)
+            consolidator = stages.prepare_consolidation(extracted, schema)
+            embeddings = None
+            try:
+                if consolidator.multi_page:
+                    await notion.sync_mirror(notion_db_id, schema["title"])
+                    _resolve_consolidation(consolidator, notion.mirror.titles(notion_db_id))
+                names = consolidator.names_to_embed()
+                if names:
+                    embeddings = dict(zip(names, await notion.get_embeddings(names)))
+            except Exception as e:
+                logger.warning(f"Consolidation lookup failed, merging by name only: {e}")
+            _apply_consolidation(extracted, consolidator, embeddings)
+
+        async def upsert_stage(item: dict):
+            if stages.has_tasks(item):
+                stages.upserted(item, await notion.upsert_tasks(notion_db_id, item["tasks"],
+                                                                journal=stages.page_journal(item)))
+
+        started = time.perf_counter()
+        items = [{"page_id": page_id} for page_id in page_ids]
+        extracted = await arun_stages(
+            items,
+            [
+                ("fetch", fetch_stage, PIPELINE_FETCH_WORKERS),
+                ("extract", extract_stage, PIPELINE_EXTRACT_WORKERS),
+            ],
+        )
+        await consolidate_stage(extracted)
+        results = await arun_stages(extracted, [("upsert", upsert_stage, 1)])
+        return stages.finish(results, time.perf_counter() - started)
+
+
+class _PageStages:
+    """
+    run_pipeline / run_pipeline_async 가 공유하는 페이지 단계 본문 (I/O 없는 부분)
+    - Notion / Claude 호출은 각 드라이버가 하고 (동기 호출 또는 await), 결과를 여기로 넘김
+    - 추출 캐시 / run journal 기록, item 상태 갱신, 로그는 모두 여기서
+    """
+
+    def __init__(self, database_id: str, page_ids: list[str], cache: ExtractionCache, journal: RunJournal,
+                 use_cache: bool, resume: bool):
+        self.cache = cache
+        self.journal = journal
+        self.use_cache = use_cache
+        journal.start(_run_key(database_id, page_ids), resume=resume)
+        self.meeting_date = datetime.now()
+        self.meeting_date_str = self.meeting_date.strftime("%Y-%m-%d")
+
+    def begin(self, item: dict) -> None:
+        logger.info(f"Processing Notion page: {item['page_id']}")
+
+    def restore_extraction(self, item: dict) -> bool:
+        """
+        item["last_edited"] 기준으로 journal / 편집 시각 캐시에서 추출 결과를 찾으면 True (블록 조회와 Claude 호출 생략)
+        """
+        page_id = item["page_id"]
+        # 이어가는 실행이고 그 사이 편집되지 않았으면 이전에 기록한 추출 결과 그대로 사용
+        item["tasks"] = self.journal.extraction(page_id, item["last_edited"])
+        if item["tasks"] is not None:
+            logger.info(f"[{page_id}] Extraction restored from run journal: {len(item['tasks'])} tasks")
+            return True
+        # 편집 시각이 그대로면 블록 조회와 Claude 호출 모두 생략
+        if self.use_cache:
+            item["tasks"] = self.cache.get_by_edit(page_id, item["last_edited"], PROMPT_VERSION, CLAUDE_MODEL)
+            if item["tasks"] is not None:
+                logger.info(f"[{page_id}] Extraction cache hit (unchanged page): {len(item['tasks'])} tasks")
+                return True
+        return False
+
+    def fetched(self, item: dict, text: str) -> None:
+        item["text"] = text
+        logger.info(f"[{item['page_id']}] Fetched meeting text length: {len(text)}")
+
+    def lookup_text_cache(self, item: dict) -> bool:
+        """
+        추출 결과가 이미 있거나 (fetch 에서 복원) 같은 텍스트의 캐시가 있으면 정리하고 True, Claude 호출이 필요하면 False
+        """
+        page_id = item["page_id"]
+        if item.get("tasks") is None and self.use_cache:
+            item["tasks"] = self.cache.get_by_text(page_id, item["text"], PROMPT_VERSION, CLAUDE_MODEL,
+                                                   item["last_edited"])
+            if item["tasks"] is not None:
+                logger.info(f"[{page_id}] Extraction cache hit (same text): {len(item['tasks'])} tasks")
+        if item.get("tasks") is None:
+            return False
+        self._finish_extraction(item, item["tasks"], fresh=False)
+        return True
+
+    def extracted(self, item: dict, tasks: list, source: str = None) -> None:
+        logger.info(f"[{item['page_id']}] Extracted tasks{f' ({source})' if source else ''}: {len(tasks)}")
+        self._finish_extraction(item, tasks, fresh=True)
+
+    def _finish_extraction(self, item: dict, tasks: list, fresh: bool) -> None:
+        page_id = item["page_id"]
+        item["tasks"] = tasks
+        # 파싱 실패와 구분이 안 되므로 빈 결과는 캐시하지 않음
+        if fresh and tasks:
+            self.cache.put(page_id, item["last_edited"], item["text"], PROMPT_VERSION, CLAUDE_MODEL, tasks)
+        self.journal.record_extraction(page_id, tasks, item["last_edited"])
+        item.pop("text", None)
+        if not tasks:
+            logger.warning(f"[{page_id}] No tasks extracted. Skip.")
+            item["done"] = True
+
+    def prepare_consolidation(self, items: list[dict], schema: dict) -> TaskConsolidator:
+        return _prepare_consolidation(items, self.meeting_date, schema)
+
+    def has_tasks(self, item: dict) -> bool:
+        if not item["tasks"]:
+            logger.info(f"[{item['page_id']}] All tasks merged into other pages. Skip upsert.")
+            return False
+        return True
+
+    def page_journal(self, item: dict):
+        return self.journal.page(item["page_id"])
+
+    def upserted(self, item: dict, upserted: dict) -> None:
+        item.update(created=upserted["created"], updated=upserted["updated"], unchanged=upserted["unchanged"],
+                    write_failed=upserted["failed"], match_tiers=upserted["tiers"])
+        logger.info(
+            f"[{item['page_id']}] Upsert complete. created={upserted['created']} updated={upserted['updated']} "
+            f"unchanged={upserted['unchanged']} failed={upserted['failed']}"
+        )
+
+    def finish(self, results: list[dict], elapsed: float) -> dict:
+        return _finish_run(self.journal, _summarize(results, elapsed))
+
+
+def watch(parent_id: str = None, title_pattern: str = None, use_cache: bool = True,
+          metrics_out: str = METRICS_PATH, prom_path: str = METRICS_PROM_PATH):
+    """
+    최근 편집된 회의록 페이지를 계속 polling 해서 추출 -> 업서트 (Ctrl+C 로 종료)
+    - 클라이언트 / 캐시 / 미러 / journal 은 한 번만 만들고 재사용
+    - 체크포인트는 MeetingPageWatcher 의 state 파일에 저장돼서 재시작해도 이어감
+    - 실패한 페이지는 다음 주기에 다시 시도, 같은 편집본이 WATCH_MAX_ATTEMPTS 번 실패하면 포기 (다시 편집되면 재시도)
+    """
+    load_dotenv()
+
+    notion_token = os.getenv("NOTION_API_KEY")
+    notion_db_id = os.getenv("NOTION_DB_ID")
+    if not notion_token or not notion_db_id:
+        raise RuntimeError("NOTION_API_KEY, NOTION_DB_ID must be set in .env")
+
     notion = NotionClientWrap(notion_token)
     claude = ClaudeClient()
-    for page_id in page_ids:
-        logger.info(f"Processing Notion page: {page_id}")
-        try:
+    cache = ExtractionCache()
+    journal = RunJournal()
+    watcher = MeetingPageWatcher(notion, parent_id=parent_id, title_pattern=title_pattern,
+                                 exclude_database_id=notion_db_id)
+    logger.info(f"Watching meeting pages (parent={parent_id} title={title_pattern})")
 
-            meeting_text = notion.fetch_page_plain_text(page_id)
-            logger.info(f"Fetched meeting text length: {len(meeting_text)}")
+    try:
+        while True:
+            try:
+                ready = watcher.poll()
+                failed = set()
+                if ready:
+                    summary = run_pipeline(use_cache=use_cache, notion=notion, claude=claude, cache=cache,
+                                           journal=journal, page_ids=[e["page_id"] for e in ready])
+                    failed = set(summary["failed"]) | set(summary["write_failed_pages"])
+                    export_metrics(summary, metrics_out, prom_path)
+                watcher.commit(ready, failed)
+            except Exception as e:
+                logger.error(f"Watch cycle failed: {e}")
+                watcher.backoff()
+            time.sleep(watcher.interval)
+    except KeyboardInterrupt:
+        logger.info("Watch stopped")
 
-            # 3) Claude로 업무 항목 추출
-            meeting_date_str = datetime.now().strftime("%Y-%m-%d")
 
-            tasks = claude.extract_tasks(meeting_text, meeting_date_str)
-            logger.info(f"Extracted tasks: {len(tasks)}")
+def _prepare_consolidation(items: list[dict], meeting_date: datetime, schema: dict) -> TaskConsolidator:
+    # 잘못된 select 값 / 날짜는 Notion 400 대신 여기서 고치거나 버리고, 정리된 값으로 병합 준비
+    live = [it for it in items if not it.get("error") and not it.get("done")]
+    with metrics.span("normalize"):
+        for it in live:
+            it["tasks"] = normalize_tasks(it["tasks"], meeting_date, schema["options"])
+    return TaskConsolidator(live)
+
+
+def _resolve_consolidation(consolidator: TaskConsolidator, existing_titles: list[dict]) -> None:
+    with metrics.span("consolidate"):
+        consolidator.resolve_titles(existing_titles)
+
+
+def _apply_consolidation(items: list[dict], consolidator: TaskConsolidator, embeddings: dict = None) -> None:
+    with metrics.span("consolidate"):
+        merged = consolidator.consolidate(embeddings)
+    seen = set()
+    for it in items:
+        # meeting.txt 에 같은 페이지가 두 번 있으면 뒤쪽은 비움
+        if it["page_id"] in merged:
+            it["tasks"] = merged[it["page_id"]] if it["page_id"] not in seen else []
+            seen.add(it["page_id"])
+
+
+def _run_key(database_id: str, page_ids: list[str]) -> str:
+    # 같은 DB / 같은 회의록 페이지 묶음 / 같은 프롬프트·모델이면 같은 실행으로 보고 이어감
+    return run_key(database_id, *sorted(page_ids), PROMPT_VERSION, CLAUDE_MODEL)
+
+
+def _finish_run(journal: RunJournal, summary: dict) -> dict:
+    journal.finish(ok=not summary["failed"] and not summary["write_failed"])
+    return summary
+
+
+def _summarize(results: list[dict], elapsed: float) -> dict:
+    summary = {
+        "pages": len(results),
+        "failed": [r["page_id"] for r in results if r.get("error")],
+        "empty": [r["page_id"] for r in results if r.get("done") and not r.get("error")],
+        "created": sum(r.get("created", 0) for r in results),
+        "updated": sum(r.get("updated", 0) for r in results),
+        "unchanged": sum(r.get("unchanged", 0) for r in results),
+        "write_failed": sum(r.get("write_failed", 0) for r in results),
+        # 쓰기가 하나라도 실패한 페이지 (watch 가 완료 처리하지 않고 다시 시도하도록)
+        "write_failed_pages": [r["page_id"] for r in results if r.get("write_failed")],
+        "match_tiers": {},
+        "elapsed_sec": round(elapsed, 2),
+    }
+    # 어느 단계(exact / ngram / embedding)에서 기존 task 를 찾았는지, new 는 신규 생성 대상
+    for r in results:
+        for tier, n in (r.get("match_tiers") or {}).items():
+            summary["match_tiers"][tier] = summary["match_tiers"].get(tier, 0) + n
+    for r in results:
+        status = "failed" if r.get("error") else "empty" if r.get("done") else "ok"
+        logger.info(
+            f"  {r['page_id']}: {status} tasks={len(r.get('tasks') or [])} "
+            f"created={r.get('created', 0)} updated={r.get('updated', 0)} unchanged={r.get('unchanged', 0)} write_failed={r.get('write_failed', 0)}"
+            + (f" error={r['error']}" if r.get("error") else "")
+        )
+    if summary["match_tiers"]:
+        logger.info("Match tiers: " + " ".join(f"{k}={v}" for k, v in summary["match_tiers"].items()))
+    logger.info(
+        f"Run summary: pages={summary['pages']} failed={len(summary['failed'])} empty={len(summary['empty'])} "
+        f"created={summary['created']} updated={summary['updated']} unchanged={summary['unchanged']} write_failed={summary['write_failed']} elapsed={summary['elapsed_sec']}s"
+    )
+    return summary
+
+
+def export_metrics(summary: dict, jsonl_path: str = METRICS_PATH, prom_path: str = METRICS_PROM_PATH) -> None:
+    """
+    실행 요약 + 단계별 시간 / 호출 수 / 토큰 사용량을 JSON lines 로 남기고, prom_path 가 있으면 textfile 도 갱신
+    """
+    snap = metrics.snapshot()
+    if snap["spans"]:
+        logger.info("Stage timings: " + " ".join(f"{k}={v['total_sec']}s/{v['count']}" for k, v in snap["spans"].items()))
+    if jsonl_path:
+        metrics.write_jsonl(summary, jsonl_path)
+    if prom_path:
+        metrics.write_prometheus(prom_path, summary)
 
-            if not tasks:
-                logger.warning("No tasks extracted. Stop.")
-                return
 
-    # 4) Notion DB 업서트 (있으면 update, 없으면 create)
-            upserted = notion.upsert_tasks(notion_db_id, tasks)
-            logger.info(f"Upsert complete. created={upserted['created']} updated={upserted['updated']}")
-        except Exception as e:
-            logger.error(f"Error processing page {page_id}: {e}")
 def main():
     parser = argparse.ArgumentParser(description="Meeting notes → Claude → Notion DB upsert pipeline")
-    parser.add_argument("meetingnote_txt", type=str, help="Path to meetingnote.txt")
+    parser.add_argument("meetingnote_txt", type=str, nargs="?", help="Path to meetingnote.txt (--watch 에선 생략)")
+    parser.add_argument("--no-cache", action="store_true", help="추출 캐시를 무시하고 모든 페이지를 다시 추출")
+    parser.add_argument("--batch", action="store_true", help="Message Batches API 로 한 번에 추출 (대량 백필용, 중단 시 재개)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="asyncio + 공유 HTTP 연결 pool 로 실행 (--batch 와 함께 쓸 수 없음)")
+    parser.add_argument("--watch", action="store_true",
+                        help="최근 편집된 회의록 페이지를 계속 polling 해서 처리 (--parent / --title-pattern 필요)")
+    parser.add_argument("--parent", default=os.getenv("WATCH_PARENT_ID"),
+                        help="--watch: 회의록 페이지들의 상위 페이지 / DB id 또는 URL")
+    parser.add_argument("--title-pattern", default=os.getenv("WATCH_TITLE_PATTERN"),
+                        help="--watch: 회의록 제목 정규식 (예: '회의록|Meeting')")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="중단된 실행이 journal 에 있어도 이어가지 않고 처음부터 다시 실행")
+    parser.add_argument("--metrics-out", default=METRICS_PATH,
+                        help="실행 지표를 이어 쓸 JSON lines 파일 (빈 문자열이면 쓰지 않음)")
+    parser.add_argument("--prom-textfile", default=METRICS_PROM_PATH,
+                        help="Prometheus textfile collector 용 .prom 파일 경로")
     args = parser.parse_args()
 
-    run_pipeline(args.meetingnote_txt)
+    if args.watch:
+        if args.use_async or args.batch:
+            parser.error("--watch cannot be combined with --async or --batch")
+        if not args.parent and not args.title_pattern:
+            parser.error("--watch needs --parent or --title-pattern")
+        parent = extract_notion_page_id(args.parent) if args.parent else None
+        watch(parent, args.title_pattern, use_cache=not args.no_cache,
+              metrics_out=args.metrics_out, prom_path=args.prom_textfile)
+        return
+    if not args.meetingnote_txt:
+        parser.error("meetingnote_txt is required unless --watch is given")
+
+    if args.use_async:
+        if args.batch:
+            parser.error("--async cannot be combined with --batch")
+        summary = asyncio.run(run_pipeline_async(args.meetingnote_txt, use_cache=not args.no_cache,
+                                                 resume=not args.no_resume))
+    else:
+        summary = run_pipeline(args.meetingnote_txt, use_cache=not args.no_cache, batch=args.batch,
+                               resume=not args.no_resume)
+    export_metrics(summary, args.metrics_out, args.prom_textfile)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,260 @@
+import asyncio
+import time
+from functools import cached_property
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import backoff
+from anthropic import AsyncAnthropic, APIStatusError
+from notion_client import AsyncClient
+
+from .chunker import split_meeting_text
+from .claude_client import ClaudeClient, ANTHROPIC_API_KEY, CLAUDE_CHUNK_CONCURRENCY, _count_retry
+from .embedding_cache import EmbeddingCache
+from .extractor import IncrementalTaskParser, merge_tasks
+from .http_pool import AsyncHTTPPool
+from .logger import get_logger
+from .metrics import metrics
+from .embedding_backend import EmbeddingBackend, openai_api_key
+from .notion_client_wrap import NotionClientWrap, NOTION_FETCH_CONCURRENCY, VECTOR_FILL_CHUNK
+from .notion_mirror import NotionTaskMirror, created_floor
+from .notion_retry import acall_with_retry
+from .rate_limiter import AsyncRateLimiter
+from .run_journal import PageJournal
+from .write_executor import AsyncNotionWriteExecutor
+
+logger = get_logger("insty")
+
+
+class AsyncNotionClientWrap(NotionClientWrap):
+    """
+    NotionClientWrap 의 asyncio 버전. Notion / OpenAI 호출은 pool 의 keep-alive 연결을 공유
+    - 매칭, diff, 텍스트 조립 등 I/O 없는 부분은 NotionClientWrap 것을 그대로 사용
+    - Notion / OpenAI 를 호출하는 메서드는 전부 여기서 async 로 다시 정의 (상속된 sync 버전을 부르면 안 됨)
+    - 미러/임베딩 캐시(SQLite)는 로컬이라 동기 호출
+    """
+
+    rate_limiter_cls = AsyncRateLimiter
+    write_executor_cls = AsyncNotionWriteExecutor
+    upsert_lock_cls = asyncio.Lock
+
+    def __init__(self, token: str, pool: AsyncHTTPPool, embedding_cache: EmbeddingCache = None,
+                 mirror: NotionTaskMirror = None, embedder: EmbeddingBackend = None, vector_store_path: str = None):
+        self.pool = pool
+        super().__init__(token, embedding_cache=embedding_cache, mirror=mirror,
+                         client=AsyncClient(auth=token, client=pool.client("notion")), embedder=embedder,
+                         vector_store_path=vector_store_path)
+
+    @cached_property
+    def oai_client(self):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=openai_api_key(), http_client=self.pool.client("openai"))
+
+    async def get_embedding(self, text: str) -> list[float]:
+        return (await self.get_embeddings([text]))[0]
+
+    async def get_embeddings(self, texts: List[str], memo: bool = True) -> List[List[float]]:
+        unique = list(dict.fromkeys(t for t in texts if t))
+        vectors, missing = self._memo_lookup(unique)
+        if missing:
+            # OpenAI backend 는 배치끼리 동시에 요청
+            with metrics.span("embedding"):
+                vectors.update(zip(missing, await self.embedder.aembed(missing)))
+            if memo:
+                self._memo_store(vectors, missing)
+            logger.info(f"Embedded {len(missing)} unique texts with {self.embedder.name} (requested={len(texts)})")
+        return [vectors[t] if t else [] for t in texts]
+
+    async def upsert_tasks(self, database_id: str, tasks: List[Dict[str, Any]],
+                           threshold: Optional[float] = None, journal: PageJournal = None) -> Dict[str, Any]:
+        async with self._upsert_lock:
+            if journal is not None and journal.planned() is not None:
+                return await self._replay_journal(database_id, journal)
+            return await self._upsert_tasks(database_id, tasks, threshold, journal)
+
+    async def _upsert_tasks(self, database_id: str, tasks: List[Dict[str, Any]],
+                            threshold: Optional[float], journal: PageJournal = None) -> Dict[str, Any]:
+        title_prop_name, name_to_id = await self._get_db_schema(database_id)
+
+        await self.sync_mirror(database_id, title_prop_name)
+        existing_pages = self.mirror.pages(database_id)
+
+        matches, remaining = self._lexical_matches(existing_pages, title_prop_name, tasks)
+        if remaining:
+            (store, titles), new_embs = await asyncio.gather(
+                self._index_existing_pages(database_id, existing_pages, title_prop_name),
+                self.get_embeddings([tasks[i].get("name") for i in remaining]),
+            )
+            self._embedding_matches(matches, remaining, new_embs, store, titles, self._match_threshold(threshold))
+
+        mutations, unchanged = self._plan_mutations(database_id, tasks, matches, name_to_id, existing_pages)
+        tiers = self._tier_counts(tasks, matches)
+        if journal is not None:
+            journal.plan(mutations, unchanged, tiers)
+        find_existing = self._created_page_lookup(database_id, title_prop_name, created_floor(time.time()),
+                                                  {page["id"] for page in existing_pages})
+        results = await self.write_executor.run(mutations, on_result=journal.mark if journal is not None else None,
+                                                find_existing=find_existing)
+        self.mirror.upsert_pages(database_id, [r["page"] for r in results if r["ok"]], title_prop_name)
+        return self._summarize_writes(results, unchanged, tiers)
+
+    async def _replay_journal(self, database_id: str, journal: PageJournal) -> Dict[str, Any]:
+        title_prop_name, _ = await self._get_db_schema(database_id)
+        pending = journal.pending()
+        since, exclude = created_floor(journal.planned().get("planned_at", 0)), journal.done_page_ids()
+        existing = await self._landed_creates(database_id, title_prop_name, self._creates(pending), since, exclude)
+        mutations = self._pending_mutations(pending, existing, journal)
+        results = await self.write_executor.run(mutations, on_result=journal.mark,
+                                                find_existing=self._created_page_lookup(database_id, title_prop_name,
+                                                                                        since, exclude))
+        self.mirror.upsert_pages(database_id, [r["page"] for r in results if r["ok"]], title_prop_name)
+        return self._replay_summary(results, journal)
+
+    async def _index_existing_pages(self, database_id: str, existing_pages: List[Dict[str, Any]], title_prop_name: str):
+        store, titles, missing = self._reconcile_vectors(database_id, existing_pages, title_prop_name)
+        for start in range(0, len(missing), VECTOR_FILL_CHUNK):
+            entries, cached, misses = self._lookup_existing_embeddings(missing[start:start + VECTOR_FILL_CHUNK], titles)
+            miss_embs = await self.get_embeddings([title_val for _, _, title_val in misses], memo=False)
+            store = self._store_vectors(database_id, store, entries, cached, misses, miss_embs)
+        return self._finish_index(store, titles, missing)
+
+    # ---------- DB 미러 ----------
+    async def _query_all(self, database_id: str, **kwargs) -> List[Dict[str, Any]]:
+        results, cursor = [], None
+        while True:
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            resp = await acall_with_retry(self.rate_limiter, "notion.databases.query", self.client.databases.query,
+                                          database_id=database_id, page_size=100, **kwargs)
+            results.extend(resp.get("results", []))
+            if not resp.get("has_more"):
+                return results
+            cursor = resp.get("next_cursor")
+
+    async def sync_mirror(self, database_id: str, title_prop_name: str = None) -> None:
+        if title_prop_name is None:
+            title_prop_name, _ = await self._get_db_schema(database_id)
+        cursor = self.mirror.sync_cursor(database_id)
+        pages = await self._query_all(database_id, **self._sync_query(cursor))
+        self._apply_sync(database_id, title_prop_name, cursor, pages)
+
+    async def query_database(self, database_id: str, field: str = None,
+                             properties: List[str] = None) -> List[Dict[str, Any]]:
+        name_to_id = (await self._get_db_schema(database_id))[1] if properties else {}
+        pages = await self._query_all(database_id, **self._query_kwargs(field, properties, name_to_id))
+        return [self._page_to_task(page) for page in pages]
+
+    async def search_pages_edited_since(self, since: str) -> List[Dict[str, Any]]:
+        results, cursor = [], None
+        while True:
+            resp = await acall_with_retry(self.rate_limiter, "notion.search", self.client.search,
+                                          **self._search_kwargs(cursor))
+            if self._collect_edited_since(results, resp, since):
+                return results
+            cursor = resp.get("next_cursor")
+
+    # ---------- 블록 조회 ----------
+    async def get_page_last_edited(self, page_id: str) -> str:
+        page = await acall_with_retry(self.rate_limiter, "notion.pages.retrieve", self.client.pages.retrieve,
+                                      page_id=page_id)
+        return page.get("last_edited_time", "")
+
+    async def fetch_page_plain_text(self, page_id: str) -> str:
+        with metrics.span("block_fetch"):
+            return self._assemble_text(await self._fetch_block_tree(page_id), page_id)
+
+    async def _fetch_block_tree(self, root_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        children: Dict[str, List[Dict[str, Any]]] = {}
+        sem = asyncio.Semaphore(NOTION_FETCH_CONCURRENCY)
+
+        async def visit(block_id: str):
+            async with sem:
+                blocks = await self._list_children(block_id)
+            children[block_id] = blocks
+            await asyncio.gather(*(visit(b["id"]) for b in blocks if b.get("has_children")))
+
+        await visit(root_id)
+        return children
+
+    async def _list_children(self, block_id: str) -> List[Dict[str, Any]]:
+        results, cursor = [], None
+        while True:
+            kwargs = {"page_size": 100}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            resp = await acall_with_retry(self.rate_limiter, "notion.blocks.children.list",
+                                          self.client.blocks.children.list, block_id, **kwargs)
+            results.extend(resp.get("results", []))
+            if not resp.get("has_more"):
+                return results
+            cursor = resp.get("next_cursor")
+
+    # ---------- DB 업서트 ----------
+    async def _get_db_schema(self, database_id: str):
+        schema = await self.get_db_schema(database_id)
+        return schema["title"], schema["name_to_id"]
+
+    async def get_db_schema(self, database_id: str) -> Dict[str, Any]:
+        schema = self._cached_schema(database_id)
+        if schema is None:
+            db = await acall_with_retry(self.rate_limiter, "notion.databases.retrieve", self.client.databases.retrieve,
+                                        database_id=database_id)
+            schema = self._store_schema(database_id, db)
+        return schema
+
+    def _created_page_lookup(self, database_id: str, title_property_name: str, since: str, exclude: Set[str]):
+        async def find(m: Dict[str, Any], claimed: Set[str]) -> Optional[Dict[str, Any]]:
+            return (await self._landed_creates(database_id, title_property_name, [m], since, exclude | claimed))[0]
+        return find
+
+    async def _landed_creates(self, database_id: str, title_property_name: str, creates: List[Dict[str, Any]],
+                              since: str, exclude: Set[str]) -> List[Optional[Dict[str, Any]]]:
+        await self.sync_mirror(database_id, title_property_name)
+        return self._match_landed(database_id, creates, since, exclude)
+
+
+class AsyncClaudeClient(ClaudeClient):
+    """
+    ClaudeClient 의 asyncio 버전 (청크는 세마포어로 동시 수 제한, pool 의 anthropic 연결 공유)
+    """
+
+    def __init__(self, pool: AsyncHTTPPool, api_key: str = ANTHROPIC_API_KEY, base_url: str = None):
+        if not api_key:
+            raise RuntimeError("ANTHROPIC_API_KEY must be set in .env")
+        self.client = AsyncAnthropic(api_key=api_key, base_url=base_url, http_client=pool.client("anthropic"))
+
+    async def extract_tasks(self, meeting_text: str, meeting_date_str: str) -> List[Dict[str, Any]]:
+        with metrics.span("llm_extract"):
+            chunks = split_meeting_text(meeting_text)
+            if len(chunks) == 1:
+                return await self._extract_chunk(chunks[0], meeting_date_str)
+
+            logger.info(f"Meeting text split into {len(chunks)} chunks")
+            sem = asyncio.Semaphore(max(1, CLAUDE_CHUNK_CONCURRENCY))
+
+            async def guarded(chunk: str):
+                async with sem:
+                    return await self._extract_chunk(chunk, meeting_date_str)
+
+            results = await asyncio.gather(*(guarded(chunk) for chunk in chunks))
+            tasks = merge_tasks(results)
+        logger.info(f"Merged {sum(len(r) for r in results)} chunk tasks into {len(tasks)}")
+        return tasks
+
+    @backoff.on_exception(backoff.expo, (APIStatusError, TimeoutError), max_time=90, on_backoff=_count_retry)
+    async def _extract_chunk(self, meeting_text: str, meeting_date_str: str) -> List[Dict[str, Any]]:
+        return [task async for task in self.stream_tasks(meeting_text, meeting_date_str)]
+
+    async def stream_tasks(self, meeting_text: str, meeting_date_str: str) -> AsyncIterator[Dict[str, Any]]:
+        parser = IncrementalTaskParser()
+        head, head_len, count = [], 0, 0
+        metrics.request("anthropic.messages")
+        async with self.client.messages.stream(**self.build_request_params(meeting_text, meeting_date_str)) as stream:
+            async for text in stream.text_stream:
+                if head_len < 2000:
+                    head.append(text)
+                    head_len += len(text)
+                for task in parser.feed(text):
+                    count += 1
+                    yield task
+            resp = await stream.get_final_message()
+        self._log_stream_end(resp, parser, "".join(head), count)
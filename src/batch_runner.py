@@ -0,0 +1,155 @@
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from .chunker import split_meeting_text
+from .claude_client import ClaudeClient, CLAUDE_MODEL
+from .extractor import IncrementalTaskParser, merge_tasks
+from .logger import get_logger
+from .metrics import metrics
+from .prompt_builder import PROMPT_VERSION
+
+logger = get_logger("insty")
+
+BATCH_STATE_PATH = os.getenv("BATCH_STATE_PATH", ".cache/batch_state.json")
+BATCH_POLL_INITIAL_SEC = float(os.getenv("BATCH_POLL_INITIAL_SEC", "10"))
+BATCH_POLL_MAX_SEC = float(os.getenv("BATCH_POLL_MAX_SEC", "300"))
+BATCH_TIMEOUT_SEC = float(os.getenv("BATCH_TIMEOUT_SEC", str(24 * 3600)))
+
+
+class BatchExtractionRunner:
+    """
+    여러 회의록 페이지의 추출 요청을 Message Batches API 한 번으로 제출.
+    - batch id 와 custom_id -> (page_id, chunk) 매핑을 state 파일에 저장
+    - 같은 페이지 묶음으로 다시 실행하면 새로 제출하지 않고 기존 batch 를 이어서 polling
+    - 결과는 page_id -> task 목록 (청크 결과는 merge_tasks 로 병합)
+    """
+
+    def __init__(self, claude: ClaudeClient, state_path: str = BATCH_STATE_PATH,
+                 poll_initial: float = BATCH_POLL_INITIAL_SEC, poll_max: float = BATCH_POLL_MAX_SEC):
+        self.claude = claude
+        self.state_path = state_path
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+
+    # ---------- state 파일 ----------
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_path, "rb") as f:
+                return orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, self.state_path)
+
+    def _clear_state(self) -> None:
+        try:
+            os.remove(self.state_path)
+        except FileNotFoundError:
+            pass
+
+    # ---------- 제출 / polling ----------
+    def _resumable(self, state: Optional[Dict[str, Any]], page_ids: List[str]) -> bool:
+        return bool(
+            state
+            and state.get("batch_id")
+            and sorted(state.get("page_ids", [])) == sorted(page_ids)
+            and state.get("prompt_version") == PROMPT_VERSION
+            and state.get("model") == CLAUDE_MODEL
+        )
+
+    def _submit(self, pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        requests, custom_ids = [], {}
+        for p_idx, page in enumerate(pages):
+            for c_idx, chunk in enumerate(split_meeting_text(page["text"])):
+                custom_id = f"p{p_idx}-c{c_idx}"
+                custom_ids[custom_id] = {"page_id": page["page_id"], "chunk": c_idx}
+                requests.append({
+                    "custom_id": custom_id,
+                    "params": self.claude.build_request_params(chunk, page["meeting_date"]),
+                })
+
+        metrics.request("anthropic.batches.create")
+        batch = self.claude.client.messages.batches.create(requests=requests)
+        state = {
+            "batch_id": batch.id,
+            "page_ids": [p["page_id"] for p in pages],
+            "custom_ids": custom_ids,
+            "prompt_version": PROMPT_VERSION,
+            "model": CLAUDE_MODEL,
+            "submitted_at": time.time(),
+        }
+        self._save_state(state)
+        logger.info(f"Submitted message batch {batch.id}: {len(pages)} pages, {len(requests)} requests")
+        return state
+
+    def _wait(self, batch_id: str, submitted_at: float) -> None:
+        delay = self.poll_initial
+        while True:
+            metrics.request("anthropic.batches.retrieve")
+            batch = self.claude.client.messages.batches.retrieve(batch_id)
+            if batch.processing_status == "ended":
+                counts = batch.request_counts
+                logger.info(
+                    f"Batch {batch_id} ended: succeeded={counts.succeeded} errored={counts.errored} "
+                    f"expired={counts.expired} canceled={counts.canceled}"
+                )
+                return
+            if time.time() - submitted_at > BATCH_TIMEOUT_SEC:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {BATCH_TIMEOUT_SEC}s")
+            logger.info(f"Batch {batch_id} {batch.processing_status}; next poll in {delay:.0f}s")
+            time.sleep(delay)
+            delay = min(self.poll_max, delay * 1.5)
+
+    def run(self, pages: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        pages: [{"page_id", "text", "meeting_date"}, ...]
+        returns: page_id -> task 목록 (실패한 청크가 있는 페이지는 빠짐)
+        """
+        if not pages:
+            return {}
+        with metrics.span("llm_extract"):
+            return self._run(pages)
+
+    def _run(self, pages: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        state = self._load_state()
+        if self._resumable(state, [p["page_id"] for p in pages]):
+            logger.info(f"Resuming message batch {state['batch_id']}")
+        else:
+            if state and state.get("batch_id"):
+                logger.warning(f"Discarding batch state for {state['batch_id']} (different pages/prompt)")
+            state = self._submit(pages)
+
+        self._wait(state["batch_id"], state.get("submitted_at", time.time()))
+
+        chunk_tasks: Dict[str, Dict[int, List[Dict[str, Any]]]] = {}
+        metrics.request("anthropic.batches.results")
+        for entry in self.claude.client.messages.batches.results(state["batch_id"]):
+            target = state["custom_ids"].get(entry.custom_id)
+            if not target:
+                continue
+            if entry.result.type != "succeeded":
+                logger.error(f"Batch request {entry.custom_id} ({target['page_id']}) {entry.result.type}")
+                continue
+            message = entry.result.message
+            self.claude.log_usage(message.usage)
+            text = "".join(part.text for part in message.content if hasattr(part, "text"))
+            chunk_tasks.setdefault(target["page_id"], {})[target["chunk"]] = IncrementalTaskParser().feed(text)
+
+        self._clear_state()
+        expected: Dict[str, int] = {}
+        for target in state["custom_ids"].values():
+            expected[target["page_id"]] = expected.get(target["page_id"], 0) + 1
+        # 청크가 하나라도 실패한 페이지는 일부 task 만 남으므로 결과에서 제외 (다음 실행에서 다시 추출)
+        return {
+            page_id: merge_tasks([chunks[i] for i in sorted(chunks)])
+            for page_id, chunks in chunk_tasks.items()
+            if len(chunks) == expected[page_id]
+        }
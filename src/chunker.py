@@ -0,0 +1,73 @@
+import os
+from typing import List
+
+from .utils import estimate_tokens
+
+# 청크당 입력 토큰 예산 (고정 지시문 제외, 회의록 본문만)
+CLAUDE_CHUNK_TOKENS = int(os.getenv("CLAUDE_CHUNK_TOKENS", "6000"))
+
+
+def _sections(text: str) -> List[str]:
+    """
+    _block_to_text 가 heading 앞에 붙이는 '# ' 줄을 기준으로 섹션 분리
+    """
+    sections, current = [], []
+    for line in text.split("\n"):
+        if line.startswith("# ") and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def _split_oversized(section: str, max_tokens: int) -> List[str]:
+    """
+    예산보다 큰 섹션은 줄 단위로, 한 줄도 크면 글자 단위로 자름
+    """
+    pieces, current, current_tokens = [], [], 0
+    for line in section.split("\n"):
+        while estimate_tokens(line) > max_tokens:
+            # 토큰 추정이 바이트 기반이라 글자 수 기준으로 보수적으로 자름
+            cut = max(1, max_tokens // 2)
+            if current:
+                pieces.append("\n".join(current))
+                current, current_tokens = [], 0
+            pieces.append(line[:cut])
+            line = line[cut:]
+        tokens = estimate_tokens(line) + 1
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_meeting_text(text: str, max_tokens: int = CLAUDE_CHUNK_TOKENS) -> List[str]:
+    """
+    회의록을 heading 경계에서 토큰 예산 이하의 청크로 분할 (섹션 순서 유지)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    chunks, current, current_tokens = [], [], 0
+    for section in _sections(text):
+        tokens = estimate_tokens(section) + 1
+        if tokens > max_tokens:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_oversized(section, max_tokens))
+            continue
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(section)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return [c for c in chunks if c.strip()]
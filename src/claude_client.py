@@ -1,39 +1,116 @@
 import os
 import backoff
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator
 from anthropic import Anthropic, APIStatusError
-from .prompt_builder import build_user_prompt
-from .extractor import parse_task_json
+from .prompt_builder import build_user_prompt, build_system_blocks
+from .extractor import IncrementalTaskParser, merge_tasks
+from .chunker import split_meeting_text
+from .utils import estimate_tokens
 from .logger import get_logger
+from .metrics import metrics
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-7-sonnet-20250219")
+CLAUDE_MIN_OUTPUT_TOKENS = int(os.getenv("CLAUDE_MIN_OUTPUT_TOKENS", "1024"))
+CLAUDE_MAX_OUTPUT_TOKENS = int(os.getenv("CLAUDE_MAX_OUTPUT_TOKENS", "8192"))
+CLAUDE_CHUNK_CONCURRENCY = int(os.getenv("CLAUDE_CHUNK_CONCURRENCY", "4"))
 
 SYSTEM_PROMPT = "You extract actionable tasks from meeting notes and respond ONLY with JSON."
 
 logger = get_logger("insty")
 
 
+def _count_retry(details) -> None:
+    # backoff on_backoff 훅: 재시도 / 429 횟수 집계
+    metrics.incr("retries", service="anthropic")
+    if getattr(details.get("exception"), "status_code", None) == 429:
+        metrics.incr("rate_limited", service="anthropic")
+
+
 class ClaudeClient:
-    def __init__(self, api_key: str = ANTHROPIC_API_KEY):
+    def __init__(self, api_key: str = ANTHROPIC_API_KEY, base_url: str = None):
         if not api_key:
             raise RuntimeError("ANTHROPIC_API_KEY must be set in .env")
-        self.client = Anthropic(api_key=api_key)
+        # base_url 은 로컬 대역(stand-in) 서버로 돌릴 때만 지정 (기본은 ANTHROPIC_BASE_URL 또는 공식 endpoint)
+        self.client = Anthropic(api_key=api_key, base_url=base_url)
 
-    @backoff.on_exception(backoff.expo, (APIStatusError, TimeoutError), max_time=90)
     def extract_tasks(self, meeting_text: str, meeting_date_str: str) -> List[Dict[str, Any]]:
-        user_prompt = build_user_prompt(meeting_text, meeting_date_str)
-        resp = self.client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=2000,
-            temperature=0.2,
-            system=SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}],
-        )
-        text = "".join(part.text for part in resp.content if hasattr(part, "text"))
-        # 🔹 여기서 로그 찍기
-        logger.info(f"Claude raw response:\n{text[:2000]}")  # 앞 2000자만
-        from .extractor import parse_task_json
-        tasks = parse_task_json(text)
-
-        logger.info(f"Extracted {len(tasks)} tasks from Claude response")
-        return parse_task_json(text)
+        """
+        긴 회의록은 heading 경계로 나눠서 청크별로 동시에 추출한 뒤 중복 task 를 합침
+        """
+        with metrics.span("llm_extract"):
+            chunks = split_meeting_text(meeting_text)
+            if len(chunks) == 1:
+                return self._extract_chunk(chunks[0], meeting_date_str)
+
+            logger.info(f"Meeting text split into {len(chunks)} chunks")
+            with ThreadPoolExecutor(max_workers=max(1, min(CLAUDE_CHUNK_CONCURRENCY, len(chunks)))) as pool:
+                results = list(pool.map(lambda chunk: self._extract_chunk(chunk, meeting_date_str), chunks))
+            tasks = merge_tasks(results)
+        logger.info(f"Merged {sum(len(r) for r in results)} chunk tasks into {len(tasks)}")
+        return tasks
+
+    @staticmethod
+    def _output_budget(text: str) -> int:
+        # 출력(JSON 배열)은 보통 입력 본문의 절반을 넘지 않음
+        return max(CLAUDE_MIN_OUTPUT_TOKENS, min(CLAUDE_MAX_OUTPUT_TOKENS, 512 + estimate_tokens(text) // 2))
+
+    @backoff.on_exception(backoff.expo, (APIStatusError, TimeoutError), max_time=90, on_backoff=_count_retry)
+    def _extract_chunk(self, meeting_text: str, meeting_date_str: str) -> List[Dict[str, Any]]:
+        # 재시도 시 중복이 생기지 않도록 청크 단위로는 다 모아서 반환
+        return list(self.stream_tasks(meeting_text, meeting_date_str))
+
+    def build_request_params(self, meeting_text: str, meeting_date_str: str) -> Dict[str, Any]:
+        """
+        messages.create / stream / batches 에 공통으로 쓰는 요청 파라미터
+        """
+        return {
+            "model": CLAUDE_MODEL,
+            "max_tokens": self._output_budget(meeting_text),
+            "temperature": 0.2,
+            "system": build_system_blocks(SYSTEM_PROMPT),
+            "messages": [{"role": "user", "content": build_user_prompt(meeting_text, meeting_date_str)}],
+        }
+
+    def stream_tasks(self, meeting_text: str, meeting_date_str: str) -> Iterator[Dict[str, Any]]:
+        """
+        스트리밍으로 요청하고, task 객체가 닫히는 즉시 하나씩 yield (재시도 없음)
+        """
+        parser = IncrementalTaskParser()
+        head, head_len, count = [], 0, 0
+        metrics.request("anthropic.messages")
+        with self.client.messages.stream(**self.build_request_params(meeting_text, meeting_date_str)) as stream:
+            for text in stream.text_stream:
+                if head_len < 2000:
+                    head.append(text)
+                    head_len += len(text)
+                for task in parser.feed(text):
+                    count += 1
+                    yield task
+            resp = stream.get_final_message()
+        self._log_stream_end(resp, parser, "".join(head), count)
+
+    def _log_stream_end(self, resp, parser: IncrementalTaskParser, head: str, count: int) -> None:
+        self.log_usage(resp.usage)
+        if resp.stop_reason == "max_tokens" or parser.pending:
+            logger.warning("Claude response was cut off (max_tokens or unclosed object); trailing tasks may be missing")
+        # 원문은 디버깅할 때만 (앞 2000자)
+        logger.debug(f"Claude raw response:\n{head[:2000]}")
+        if parser.skipped:
+            logger.warning(f"Skipped {parser.skipped} malformed task objects")
+        logger.info(f"Extracted {count} tasks from Claude response")
+
+    @staticmethod
+    def log_usage(usage) -> None:
+        """
+        응답 usage 를 토큰 metrics 와 로그에 남김 (스트리밍 응답, Message Batch 결과 공통)
+        """
+        # 고정 지시문 prefix 가 캐시되면 두 번째 요청부터 cache_read 로 잡힘
+        counts = {
+            "input": getattr(usage, "input_tokens", 0) or 0,
+            "output": getattr(usage, "output_tokens", 0) or 0,
+            "cache_read": getattr(usage, "cache_read_input_tokens", 0) or 0,
+            "cache_creation": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        }
+        metrics.tokens("anthropic", **counts)
+        logger.info("Claude usage: " + " ".join(f"{k}={v}" for k, v in counts.items()))
@@ -0,0 +1,213 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lexical_matcher import LexicalMatcher, LEXICAL_NGRAM_MARGIN, LEXICAL_NGRAM_THRESHOLD, char_ngrams, dice
+from .logger import get_logger
+from .utils import normalize_task_name
+
+logger = get_logger("insty")
+
+# 서로 다른 회의록에서 나온 task 를 같은 업무로 볼 임베딩 유사도 (DB 매칭 기준보다 엄격하게)
+CONSOLIDATE_THRESHOLD = float(os.getenv("CONSOLIDATE_THRESHOLD", "0.93"))
+
+_PRIORITY_RANK = {"높음": 0, "보통": 1, "낮음": 2}
+
+
+def _earliest(values: List[str]) -> Optional[str]:
+    values = [v for v in values if v]
+    return min(values) if values else None
+
+
+def _latest(values: List[str]) -> Optional[str]:
+    values = [v for v in values if v]
+    return max(values) if values else None
+
+
+class TaskConsolidator:
+    """
+    한 실행에서 여러 회의록 페이지가 추출한 task 를 업서트 전에 합치는 단계.
+    - 1차: normalize_task_name 이 같은 task 끼리 묶음. 같은 페이지 안의 중복도 합침
+      (추출 단계 merge_tasks 와 같은 기준이고, 둘 다 같은 기존 페이지로 업서트될 이름이라 나눠 둘 이유가 없음)
+    - 2차(resolve_titles): 묶음 대표 이름끼리 음절 bigram 유사도로 합치고 (서로 1등 + 점수 차 조건),
+      DB 미러에서 정규화한 제목이 정확히 같은 기존 페이지가 하나로 정해지는 묶음끼리 합침.
+      그렇게 정해진 묶음은 임베딩하지 않음 (ngram 으로만 닮은 기존 페이지는 강제로 합치지 않음)
+    - 3차: 남은 묶음의 대표 이름 임베딩 유사도가 기준치 이상이면 합침
+    - 2차부터는 같은 페이지의 task 가 들어 있는 묶음끼리 합치지 않음
+    - 합친 task 는 처음 나온 페이지에 한 번만 남기고 필드는 결정적으로 병합
+      (progress/process 는 가장 최근 편집된 페이지 값, start 는 가장 이른 날짜, end 는 가장 늦은 날짜,
+       priority 는 가장 높은 것, 나머지는 페이지 순서상 처음 나온 값)
+    pages: [{"page_id", "tasks", "last_edited"(선택)}, ...] (meeting.txt 순서)
+    """
+
+    def __init__(self, pages: List[Dict[str, Any]], threshold: float = CONSOLIDATE_THRESHOLD):
+        self.pages = pages
+        self.threshold = threshold
+        # entry: (페이지 순서, 페이지 안 순서, task)
+        self.entries = [(p_idx, t_idx, task) for p_idx, page in enumerate(pages)
+                        for t_idx, task in enumerate(page.get("tasks") or []) if task.get("name")]
+        self._parent = list(range(len(self.entries)))
+        # 이름이 같은 task 는 페이지를 가리지 않고 묶음 (같은 페이지 검사는 2차부터)
+        first_by_name: Dict[str, int] = {}
+        for idx, (_, _, task) in enumerate(self.entries):
+            key = normalize_task_name(task["name"])
+            if key in first_by_name:
+                self._union(first_by_name[key], idx)
+            else:
+                first_by_name[key] = idx
+        # 기존 DB 페이지가 제목으로 정해진 entry (그 묶음은 임베딩 대상에서 빠짐)
+        self._resolved = set()
+        self.merged = 0
+
+    def _find(self, i: int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def _union(self, a: int, b: int) -> None:
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            # 항상 먼저 나온 entry 가 대표
+            self._parent[max(ra, rb)] = min(ra, rb)
+
+    def _clusters(self) -> Dict[int, List[int]]:
+        clusters: Dict[int, List[int]] = {}
+        for idx in range(len(self.entries)):
+            clusters.setdefault(self._find(idx), []).append(idx)
+        return clusters
+
+    @property
+    def multi_page(self) -> bool:
+        # task 가 있는 페이지가 2개 이상일 때만 페이지 간 병합이 의미 있음
+        return len({p_idx for p_idx, _, _ in self.entries}) >= 2
+
+    def resolve_titles(self, existing: List[Dict[str, str]]) -> None:
+        """
+        임베딩 전에 제목만으로 묶음 정리
+        existing: DB 미러 제목 [{"page_id", "name"}] (NotionTaskMirror.titles)
+        """
+        self._merge_lexical()
+        matcher = LexicalMatcher(existing)
+        page_of: Dict[str, Optional[str]] = {}
+        roots_by_page: Dict[str, List[int]] = {}
+        for root, members in sorted(self._clusters().items()):
+            for m in members:
+                key = normalize_task_name(self.entries[m][2]["name"])
+                if key not in page_of:
+                    # exact 만 (ngram 은 "X" / "X 마무리" 가 같은 페이지로 모일 수 있어서 _merge_lexical 에 맡김)
+                    match = matcher.exact(self.entries[m][2]["name"])
+                    page_of[key] = match[0]["page_id"] if match else None
+                if page_of[key] is not None:
+                    self._resolved.update(members)
+                    roots_by_page.setdefault(page_of[key], []).append(root)
+                    break
+        # 같은 기존 페이지로 업서트될 묶음은 하나로 (안 합치면 하나는 update, 나머지는 신규 생성이 됨)
+        self._merge_pairs([(1.0, roots[0], other) for roots in roots_by_page.values() for other in roots[1:]])
+        resolved = len({self._find(m) for m in self._resolved})
+        if resolved:
+            logger.info(f"Resolved {resolved} of {len(self._clusters())} task groups by title before embedding")
+
+    def names_to_embed(self) -> List[str]:
+        """
+        임베딩 비교가 필요한 묶음 대표 이름: 제목으로 정해지지 않은 묶음 (서로 다른 페이지에서 2개 이상일 때만)
+        """
+        # 제목으로 정해진 묶음끼리만 합쳤으니 대표 entry 로 판단 가능
+        clusters = {root: members for root, members in sorted(self._clusters().items()) if root not in self._resolved}
+        if len({self.entries[m][0] for members in clusters.values() for m in members}) < 2:
+            return []
+        return [self.entries[root][2]["name"] for root in clusters]
+
+    def consolidate(self, embeddings: Optional[Dict[str, List[float]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        embeddings: names_to_embed() 이름 -> 벡터 (없으면 이름 기준으로만 합침)
+        returns: page_id -> 그 페이지에서 업서트할 task 목록
+        """
+        if embeddings:
+            self._merge_similar(embeddings)
+
+        out: Dict[str, List[Dict[str, Any]]] = {page["page_id"]: [] for page in self.pages}
+        for root, members in sorted(self._clusters().items()):
+            p_idx = self.entries[root][0]
+            out[self.pages[p_idx]["page_id"]].append(self._merge_fields(members))
+        self.merged = len(self.entries) - sum(len(v) for v in out.values())
+        if self.merged:
+            logger.info(f"Consolidated {len(self.entries)} tasks from {len(self.pages)} pages into "
+                        f"{len(self.entries) - self.merged} ({self.merged} duplicates merged)")
+        return out
+
+    def _merge_similar(self, embeddings: Dict[str, List[float]]) -> None:
+        import numpy as np
+        from .task_matcher import normalize_rows
+
+        roots = [r for r in sorted(self._clusters()) if embeddings.get(self.entries[r][2]["name"])]
+        if len(roots) < 2:
+            return
+        mat = normalize_rows([embeddings[self.entries[r][2]["name"]] for r in roots])
+        scores = mat @ mat.T
+        rows, cols = np.nonzero(np.triu(scores >= self.threshold, 1))
+        self._merge_pairs([(score, roots[i], roots[j])
+                           for score, i, j in zip(scores[rows, cols].tolist(), rows.tolist(), cols.tolist())])
+
+    def _merge_lexical(self) -> None:
+        """
+        묶음 대표 이름끼리 음절 bigram Dice (LexicalMatcher 의 ngram 과 같은 기준치 / 점수 차)
+        - 서로가 1등이고 2등 후보와 차이가 충분한 쌍만 합침 ("1단계" / "2단계" 처럼 한 글자만 다른 이름 보호)
+        """
+        roots = sorted(self._clusters())
+        grams = [char_ngrams(normalize_task_name(self.entries[r][2]["name"])) for r in roots]
+        postings: Dict[str, List[int]] = {}
+        scored: Dict[int, List[Tuple[float, int]]] = {}
+        for i, gs in enumerate(grams):
+            overlaps: Dict[int, int] = {}
+            for g in gs:
+                for j in postings.get(g, ()):
+                    overlaps[j] = overlaps.get(j, 0) + 1
+                postings.setdefault(g, []).append(i)
+            for j, n in overlaps.items():
+                score = dice(grams[j], gs, n)
+                scored.setdefault(i, []).append((score, j))
+                scored.setdefault(j, []).append((score, i))
+
+        best: Dict[int, Tuple[float, int]] = {}
+        for i, cands in scored.items():
+            cands.sort(reverse=True)
+            if cands[0][0] < LEXICAL_NGRAM_THRESHOLD:
+                continue
+            if len(cands) == 1 or cands[0][0] - cands[1][0] >= LEXICAL_NGRAM_MARGIN:
+                best[i] = cands[0]
+        self._merge_pairs([(score, roots[i], roots[j]) for i, (score, j) in best.items()
+                           if i < j and best.get(j, (0, None))[1] == i])
+
+    def _merge_pairs(self, pairs: List[Tuple[float, int, int]]) -> None:
+        # 유사도 높은 쌍부터 합침 (같은 점수는 앞쪽 묶음 우선), 같은 페이지 task 가 들어 있는 묶음끼리는 건너뜀
+        pages_of = {r: {self.entries[m][0] for m in members} for r, members in self._clusters().items()}
+        for _, a, b in sorted(pairs, key=lambda c: (-c[0], c[1], c[2])):
+            ra, rb = self._find(a), self._find(b)
+            if ra == rb or pages_of[ra] & pages_of[rb]:
+                continue
+            self._union(ra, rb)
+            pages_of[self._find(ra)] = pages_of[ra] | pages_of[rb]
+
+    def _merge_fields(self, members: List[int]) -> Dict[str, Any]:
+        tasks = [self.entries[m][2] for m in members]
+        if len(tasks) == 1:
+            return tasks[0]
+        merged = dict(tasks[0])
+        for task in tasks[1:]:
+            for k, v in task.items():
+                if merged.get(k) in (None, "") and v not in (None, ""):
+                    merged[k] = v
+
+        # 가장 최근 편집된 페이지(같으면 뒤쪽 페이지)의 진행 상태
+        latest = max(members, key=lambda m: (self.pages[self.entries[m][0]].get("last_edited") or "", m))
+        for k in ("progress", "process"):
+            if self.entries[latest][2].get(k) not in (None, ""):
+                merged[k] = self.entries[latest][2][k]
+        for k, pick in (("start", _earliest), ("end", _latest)):
+            value = pick([t.get(k) for t in tasks])
+            if value:
+                merged[k] = value
+        priorities = [t.get("priority") for t in tasks if t.get("priority") in _PRIORITY_RANK]
+        if priorities:
+            merged["priority"] = min(priorities, key=_PRIORITY_RANK.get)
+        return merged
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from .logger import get_logger
+from .metrics import metrics
+from .utils import estimate_tokens, normalize_task_name
+
+logger = get_logger("insty")
+
+# "openai" (기본, API 호출) | "hashing" (로컬 CPU, API 키 불필요)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").strip().lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# embeddings.create 요청당 한도 (입력 2048개, 약 300k 토큰)보다 여유 있게
+EMBED_BATCH_MAX_ITEMS = int(os.getenv("EMBED_BATCH_MAX_ITEMS", "2048"))
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "200000"))
+# hashing backend: 문자 n-gram 범위와 벡터 차원 (task 이름은 짧아서 512 칸이면 충돌이 드묾, 클수록 tolist 비용 증가)
+HASH_EMBED_DIM = int(os.getenv("HASH_EMBED_DIM", "512"))
+HASH_EMBED_NGRAM_MIN = int(os.getenv("HASH_EMBED_NGRAM_MIN", "2"))
+HASH_EMBED_NGRAM_MAX = int(os.getenv("HASH_EMBED_NGRAM_MAX", "3"))
+# n-gram -> 벡터 칸 메모 개수 (task 이름은 같은 n-gram 이 많이 반복됨)
+HASH_EMBED_SLOT_CACHE = int(os.getenv("HASH_EMBED_SLOT_CACHE", "200000"))
+# n-gram 겹침 기반이라 OpenAI 임베딩보다 같은 업무의 유사도가 낮게 나옴
+HASH_EMBED_MATCH_THRESHOLD = float(os.getenv("HASH_EMBED_MATCH_THRESHOLD", "0.75"))
+
+
+def openai_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY must be set in .env (or use EMBEDDING_BACKEND=hashing)")
+    return api_key
+
+
+class EmbeddingBackend(ABC):
+    """
+    문자열 묶음 -> 벡터 묶음. 입력은 중복 없는 비어 있지 않은 문자열 (중복 제거 / 메모는 NotionClientWrap 이 함)
+    - name: 임베딩 캐시 key 에 들어가는 이름 (backend 나 설정이 바뀌면 예전 벡터를 쓰지 않도록)
+    - match_threshold: 기존 task 와 같은 업무로 볼 유사도 (None 이면 TASK_MATCH_THRESHOLD)
+    """
+
+    name = ""
+    match_threshold = None
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        ...
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        return self.embed(texts)
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """
+    OpenAI embeddings API. client 가 OpenAI 면 embed(), AsyncOpenAI 면 aembed() 사용
+    """
+
+    def __init__(self, client, model: str = EMBEDDING_MODEL):
+        self.client = client
+        self.model = model
+        self.name = model
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = {}
+        for batch in self.batches(texts):
+            metrics.request("openai.embeddings")
+            self._collect(vectors, batch, self.client.embeddings.create(model=self.model, input=batch))
+        return [vectors[t] for t in texts]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        batches = list(self.batches(texts))
+        # 배치끼리는 독립이라 동시에 요청
+        for _ in batches:
+            metrics.request("openai.embeddings")
+        responses = await asyncio.gather(*(
+            self.client.embeddings.create(model=self.model, input=batch) for batch in batches
+        ))
+        vectors = {}
+        for batch, resp in zip(batches, responses):
+            self._collect(vectors, batch, resp)
+        return [vectors[t] for t in texts]
+
+    @staticmethod
+    def _collect(vectors, batch: List[str], resp) -> None:
+        usage = getattr(resp, "usage", None)
+        metrics.tokens("openai", input=getattr(usage, "prompt_tokens", 0) or 0)
+        for item in resp.data:
+            vectors[batch[item.index]] = item.embedding
+
+    @staticmethod
+    def batches(texts: List[str]):
+        batch, batch_tokens = [], 0
+        for text in texts:
+            tokens = estimate_tokens(text)
+            if batch and (len(batch) >= EMBED_BATCH_MAX_ITEMS or batch_tokens + tokens > EMBED_BATCH_MAX_TOKENS):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    로컬 문자 n-gram hashing 임베딩 (네트워크 / 모델 파일 없음).
+    - normalize_task_name 결과의 문자 n-gram 을 crc32 로 dim 칸에 부호 붙여 더한 뒤 L2 정규화
+    - 묶음 전체를 np.bincount 한 번으로 (n, dim) 행렬에 채움
+    - 의미가 아니라 표기 유사도라 "로그인 API 개발" / "로그인 api 구현" 은 가깝고 동의어는 못 잡음
+    """
+
+    def __init__(self, dim: int = HASH_EMBED_DIM, ngram_min: int = HASH_EMBED_NGRAM_MIN,
+                 ngram_max: int = HASH_EMBED_NGRAM_MAX, match_threshold: float = HASH_EMBED_MATCH_THRESHOLD):
+        if dim <= 0 or not 0 < ngram_min <= ngram_max:
+            raise ValueError(f"invalid hashing embedding config: dim={dim} ngram={ngram_min}-{ngram_max}")
+        self.dim = dim
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+        self.match_threshold = match_threshold
+        self.name = f"hashing-char{ngram_min}{ngram_max}-d{dim}"
+        self._slots: Dict[str, int] = {}
+
+    def _grams(self, text: str) -> List[str]:
+        s = f"^{normalize_task_name(text)}$"
+        return [s[i:i + n] for n in range(self.ngram_min, self.ngram_max + 1) for i in range(len(s) - n + 1)]
+
+    def _slot(self, gram: str) -> int:
+        # 부호는 slot 에 포함: +(index + 1) / -(index + 1)
+        slot = self._slots.get(gram)
+        if slot is None:
+            h = zlib.crc32(gram.encode("utf-8"))
+            slot = self._slots[gram] = (h % self.dim + 1) * (1 if h & 0x80000000 else -1)
+        return slot
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        import numpy as np
+        from .task_matcher import normalize_rows
+
+        if len(self._slots) > HASH_EMBED_SLOT_CACHE:
+            self._slots.clear()
+        rows, slots = [], []
+        for row, text in enumerate(texts):
+            grams = self._grams(text)
+            rows.extend([row] * len(grams))
+            slots.extend(self._slot(g) for g in grams)
+        slots = np.asarray(slots, dtype=np.int64)
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.abs(slots) - 1
+        mat = np.bincount(flat, weights=np.sign(slots), minlength=len(texts) * self.dim)
+        return normalize_rows(mat.reshape(len(texts), self.dim)).tolist()
+
+
+def make_embedding_backend(client_factory, backend: str = EMBEDDING_BACKEND) -> EmbeddingBackend:
+    """
+    client_factory: OpenAI backend 일 때만 호출 (hashing 이면 openai 클라이언트 / API 키 불필요)
+    """
+    if backend == "hashing":
+        return HashingEmbeddingBackend()
+    if backend == "openai":
+        return OpenAIEmbeddingBackend(client_factory())
+    raise ValueError(f"unknown EMBEDDING_BACKEND: {backend!r} (expected 'openai' or 'hashing')")
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Tuple
+
+from .logger import get_logger
+
+logger = get_logger("insty")
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+# SQLite 바인딩 변수 한도(구버전 999)보다 작게 유지
+_IN_CHUNK = 500
+
+
+def title_hash(title: str) -> str:
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()
+
+
+def _pack(embedding: List[float]) -> bytes:
+    return array("f", embedding).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    arr = array("f")
+    arr.frombytes(blob)
+    return arr.tolist()
+
+
+class EmbeddingCache:
+    """
+    기존 DB task 제목의 임베딩을 디스크(SQLite)에 보관하는 캐시.
+    - key: (page_id, model), 제목 해시가 같을 때만 hit (이름이 바뀐 페이지만 재임베딩)
+    - last_edited_time 은 함께 저장해서 갱신 여부 추적용으로 사용
+    - max_entries 를 넘으면 가장 오래 접근되지 않은 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                page_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                title_hash TEXT NOT NULL,
+                last_edited_time TEXT,
+                embedding BLOB NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (page_id, model)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(accessed_at)")
+        self._conn.commit()
+
+    def get_many(self, entries: List[Tuple[str, str, str]], model: str) -> Dict[str, List[float]]:
+        """
+        entries: [(page_id, last_edited_time, title), ...]
+        returns: page_id -> embedding (hit 인 항목만)
+        """
+        wanted = {page_id: (edited, title_hash(title)) for page_id, edited, title in entries}
+        found: Dict[str, List[float]] = {}
+        touched = []
+        now = time.time()
+
+        with self._lock:
+            ids = list(wanted)
+            for i in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[i:i + _IN_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT page_id, title_hash, last_edited_time, embedding FROM embeddings "
+                    f"WHERE model = ? AND page_id IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                for page_id, cached_hash, cached_edited, blob in rows:
+                    edited, want_hash = wanted[page_id]
+                    # 제목이 바뀌었으면 miss (last_edited_time 만 바뀐 경우는 그대로 재사용)
+                    if cached_hash != want_hash:
+                        continue
+                    found[page_id] = _unpack(blob)
+                    touched.append((now, edited, page_id, model))
+
+            if touched:
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ?, last_edited_time = ? WHERE page_id = ? AND model = ?",
+                    touched,
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, rows: List[Tuple[str, str, str, List[float]]], model: str) -> None:
+        """
+        rows: [(page_id, last_edited_time, title, embedding), ...]
+        """
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(page_id, model, title_hash, last_edited_time, embedding, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (page_id, model, title_hash(title), edited, _pack(emb), now)
+                    for page_id, edited, title, emb in rows
+                    if emb
+                ],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+            (overflow,),
+        )
+        logger.info(f"Embedding cache evicted {overflow} entries (max={self.max_entries})")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
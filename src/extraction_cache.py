@@ -0,0 +1,119 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from .logger import get_logger
+
+logger = get_logger("insty")
+
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", ".cache/extractions.sqlite3")
+EXTRACTION_CACHE_TTL_DAYS = float(os.getenv("EXTRACTION_CACHE_TTL_DAYS", "30"))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "1000"))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    회의록 페이지별 Claude 추출 결과(task 목록) 캐시 (SQLite).
+    - get_by_edit: page_id + last_edited_time 이 같으면 블록 조회와 LLM 호출 모두 생략
+    - get_by_text: 본문 해시가 같으면 LLM 호출만 생략 (편집 시각만 바뀐 경우)
+    - 두 경우 모두 prompt_version, model 이 같아야 hit
+    - TTL 이 지난 항목은 무시/삭제하고, max_entries 를 넘으면 오래된 것부터 제거
+    """
+
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH, ttl_days: float = EXTRACTION_CACHE_TTL_DAYS,
+                 max_entries: int = EXTRACTION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                page_id TEXT PRIMARY KEY,
+                last_edited_time TEXT,
+                text_hash TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                tasks BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _get(self, where: str, params: tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT tasks FROM extractions WHERE {where} AND created_at >= ?",
+                (*params, time.time() - self.ttl),
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return orjson.loads(row[0])
+            self.misses += 1
+            return None
+
+    def get_by_edit(self, page_id: str, last_edited_time: str, prompt_version: str, model: str):
+        if not last_edited_time:
+            return None
+        return self._get(
+            "page_id = ? AND last_edited_time = ? AND prompt_version = ? AND model = ?",
+            (page_id, last_edited_time, prompt_version, model),
+        )
+
+    def get_by_text(self, page_id: str, text: str, prompt_version: str, model: str, last_edited_time: str = None):
+        tasks = self._get(
+            "page_id = ? AND text_hash = ? AND prompt_version = ? AND model = ?",
+            (page_id, text_hash(text), prompt_version, model),
+        )
+        if tasks is not None and last_edited_time:
+            # 다음 실행에선 블록 조회도 건너뛰도록 편집 시각 갱신
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE extractions SET last_edited_time = ? WHERE page_id = ?", (last_edited_time, page_id)
+                )
+                self._conn.commit()
+        return tasks
+
+    def put(self, page_id: str, last_edited_time: str, text: str, prompt_version: str, model: str,
+            tasks: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(page_id, last_edited_time, text_hash, prompt_version, model, tasks, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (page_id, last_edited_time, text_hash(text), prompt_version, model, orjson.dumps(tasks), now),
+            )
+            self._conn.execute("DELETE FROM extractions WHERE created_at < ?", (now - self.ttl,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM extractions WHERE rowid IN "
+                    "(SELECT rowid FROM extractions ORDER BY created_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,26 +1,111 @@
-import json
 import re
+from typing import Any, Dict, List
 
-def parse_task_json(s: str):
-    # 먼저 JSON 배열 탐색
-    match = re.search(r"\[.*\]", s, re.DOTALL)
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except Exception:
-            pass
-
-    # 배열이 없고, 개별 객체만 있는 경우
-    objects = re.findall(r"\{[^{}]+\}", s, re.DOTALL)
-    tasks = []
-    for obj in objects:
+import orjson
+
+from .utils import normalize_task_name
+
+# 객체 경계/문자열 상태에 영향을 주는 문자만 훑음
+_SPECIAL_RE = re.compile(r'[{}"\\]')
+
+
+class IncrementalTaskParser:
+    """
+    Claude 스트리밍 응답을 조각(chunk) 단위로 받아서, 최상위 JSON 객체가 닫힐 때마다 task 로 반환.
+    - 중괄호 깊이 / 문자열 / 이스케이프 상태를 유지하며 각 문자를 한 번만 봄 (선형 시간)
+    - 객체 바깥 텍스트(서문, 코드펜스, 배열 괄호, 쉼표)는 무시 → 배열이든 낱개 객체든 동일하게 처리
+    - 중첩 객체는 바깥 객체에 포함되고, JSON 으로 읽히지 않는 객체는 건너뜀
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.skipped = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        out = []
+        start = 0 if self._depth else None
+        # 이전 조각이 '\' 로 끝났으면 이번 조각의 첫 글자는 이스케이프된 문자
+        skip = 0 if self._escape else -1
+        self._escape = False
+
+        for m in _SPECIAL_RE.finditer(chunk):
+            i, ch = m.start(), m.group()
+            if i == skip:
+                continue
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth, start = 1, i
+                continue
+            if self._in_string:
+                if ch == "\\":
+                    if i + 1 == len(chunk):
+                        self._escape = True
+                    else:
+                        skip = i + 1
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buf.append(chunk[start:i + 1])
+                    self._emit("".join(self._buf), out)
+                    self._buf, start = [], None
+
+        if self._depth and start is not None:
+            self._buf.append(chunk[start:])
+        return out
+
+    def _emit(self, raw: str, out: List[Dict[str, Any]]) -> None:
         try:
-            tasks.append(json.loads(obj))
-        except Exception:
-            continue
+            obj = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            self.skipped += 1
+            return
+        if isinstance(obj, dict):
+            out.append(obj)
+
+    @property
+    def pending(self) -> bool:
+        """
+        닫히지 않은 객체가 남아 있는지 (응답이 잘린 경우)
+        """
+        return self._depth > 0
 
+
+def parse_task_json(s: str):
+    tasks = IncrementalTaskParser().feed(s)
     if tasks:
         return tasks
 
     print(" JSON 추출 실패")
     return []
+
+
+def merge_tasks(task_lists: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    청크별 추출 결과 병합. 이름(정규화 기준)이 같은 task 는 먼저 나온 것을 유지하고 빈 필드만 채움
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for tasks in task_lists:
+        for task in tasks:
+            if not isinstance(task, dict):
+                continue
+            key = normalize_task_name(task.get("name"))
+            if not key:
+                continue
+            if key not in merged:
+                merged[key] = dict(task)
+                continue
+            kept = merged[key]
+            for k, v in task.items():
+                if kept.get(k) in (None, "") and v not in (None, ""):
+                    kept[k] = v
+    return list(merged.values())
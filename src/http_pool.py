@@ -0,0 +1,50 @@
+import os
+from typing import Dict, Optional
+
+import httpx
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+
+
+class AsyncHTTPPool:
+    """
+    서비스(호스트)별로 keep-alive httpx.AsyncClient 를 하나씩 만들어 공유.
+    - notion_client 는 넘겨받은 client 의 base_url/헤더를 덮어쓰므로 서비스끼리 client 를 섞지 않음
+    - limits/timeout 은 모든 서비스에 공통 적용 (환경변수 HTTP_*)
+    - transports 로 서비스별 transport 를 주입할 수 있음 (로컬 대역 서버 / MockTransport)
+    """
+
+    def __init__(self, limits: Optional[httpx.Limits] = None, timeout: Optional[httpx.Timeout] = None,
+                 transports: Optional[Dict[str, httpx.AsyncBaseTransport]] = None):
+        self.limits = limits or httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.timeout = timeout or httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+        self.transports = transports or {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        if service not in self._clients:
+            self._clients[service] = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self.transports.get(service),
+            )
+        return self._clients[service]
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    async def __aenter__(self) -> "AsyncHTTPPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
@@ -0,0 +1,106 @@
+import os
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .utils import normalize_task_name
+
+LEXICAL_NGRAM_THRESHOLD = float(os.getenv("LEXICAL_NGRAM_THRESHOLD", "0.85"))
+# 1등과 2등 후보의 점수 차가 이보다 작으면 애매하다고 보고 임베딩 단계로 넘김
+LEXICAL_NGRAM_MARGIN = float(os.getenv("LEXICAL_NGRAM_MARGIN", "0.05"))
+
+Match = Tuple[Dict[str, Any], float, str]
+
+
+def char_ngrams(norm: str, n: int = 2) -> Set[str]:
+    """
+    정규화된 이름의 문자 n-gram. 띄어쓰기를 지운 음절 단위라 "배포 자동화"/"배포자동화를" 처럼
+    띄어쓰기·조사만 다른 한국어 제목도 대부분 gram 이 겹침. n 보다 짧으면 이름 전체를 gram 하나로
+    """
+    if len(norm) < n:
+        return {norm} if norm else set()
+    return {norm[i:i + n] for i in range(len(norm) - n + 1)}
+
+
+def dice(a: Set[str], b: Set[str], overlap: int = None) -> float:
+    if not a or not b:
+        return 0.0
+    if overlap is None:
+        overlap = len(a & b)
+    return 2 * overlap / (len(a) + len(b))
+
+
+class LexicalMatcher:
+    """
+    임베딩 전에 제목만으로 기존 task 를 찾는 단계.
+    - exact: normalize_task_name 결과가 같은 기존 페이지가 딱 하나일 때
+    - ngram: 음절 bigram Dice 유사도가 기준치 이상이고 2등 후보와 차이가 충분할 때
+    - 기존 페이지당 최대 1개 task 배정 (임베딩 단계의 assign_matches 와 같은 1:1 규칙), 못 정한 task 는 None
+    """
+
+    def __init__(self, existing: List[Dict[str, Any]], threshold: float = LEXICAL_NGRAM_THRESHOLD,
+                 margin: float = LEXICAL_NGRAM_MARGIN):
+        self.items = [et for et in existing if normalize_task_name(et.get("name"))]
+        self.threshold = threshold
+        self.margin = margin
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, et in enumerate(self.items):
+            norm = normalize_task_name(et["name"])
+            self._exact[norm].append(idx)
+            grams = char_ngrams(norm)
+            self._grams.append(grams)
+            for g in grams:
+                self._postings[g].append(idx)
+
+    def match(self, names: List[str], taken: Optional[Set[str]] = None) -> List[Optional[Match]]:
+        """
+        taken: 이미 다른 task 에 배정된 기존 page_id (여기서 배정한 것도 추가됨)
+        returns: 입력 순서대로 (기존 task, 점수, "exact" | "ngram") 또는 None
+        """
+        taken = set() if taken is None else taken
+        results: List[Optional[Match]] = [None] * len(names)
+        norms = [normalize_task_name(n) for n in names]
+
+        for qi, norm in enumerate(norms):
+            hits = self._exact.get(norm) if norm else None
+            if hits and len(hits) == 1 and self.items[hits[0]]["page_id"] not in taken:
+                results[qi] = (self.items[hits[0]], 1.0, "exact")
+                taken.add(self.items[hits[0]]["page_id"])
+
+        candidates = []
+        for qi, norm in enumerate(norms):
+            if results[qi] is not None or not norm:
+                continue
+            best = self._best_ngram(norm)
+            if best:
+                candidates.append((best[1], qi, best[0]))
+        # 점수 높은 순으로 1:1 배정
+        for score, qi, idx in sorted(candidates, key=lambda c: (-c[0], c[1])):
+            page_id = self.items[idx]["page_id"]
+            if page_id in taken:
+                continue
+            results[qi] = (self.items[idx], score, "ngram")
+            taken.add(page_id)
+        return results
+
+    def exact(self, name: str) -> Optional[Match]:
+        """
+        1:1 배정 없이 이름 하나의 exact 매칭만 (정규화한 제목이 같은 기존 페이지가 딱 하나일 때)
+        """
+        norm = normalize_task_name(name)
+        hits = self._exact.get(norm) if norm else None
+        return (self.items[hits[0]], 1.0, "exact") if hits and len(hits) == 1 else None
+
+    def _best_ngram(self, norm: str) -> Optional[Tuple[int, float]]:
+        grams = char_ngrams(norm)
+        overlaps = Counter(idx for g in grams for idx in self._postings.get(g, ()))
+        if not overlaps:
+            return None
+        scored = sorted(((dice(grams, self._grams[idx], n), idx) for idx, n in overlaps.items()), reverse=True)
+        best_score, best_idx = scored[0]
+        if best_score < self.threshold:
+            return None
+        if len(scored) > 1 and best_score - scored[1][0] < self.margin:
+            return None
+        return best_idx, best_score
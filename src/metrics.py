@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Tuple
+
+import orjson
+
+METRICS_PATH = os.getenv("METRICS_PATH", ".cache/metrics.jsonl")
+# node_exporter textfile collector 경로 (비어있으면 쓰지 않음)
+METRICS_PROM_PATH = os.getenv("METRICS_PROM_PATH", "")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Metrics:
+    """
+    실행 한 번 동안의 단계별 소요 시간(span)과 카운터를 모으는 스레드 안전 집계기.
+    - span: 단계 이름별 횟수 / 누적 초 / 최대 초 (동시에 도는 단계는 누적 시간이 wall time 보다 클 수 있음)
+    - counter: 이름 + label 별 누적 값 (endpoint 별 요청 수, 재시도, 429, 토큰 사용량)
+    - write_jsonl / write_prometheus 로 실행 요약을 내보냄
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans: Dict[str, Dict[str, float]] = {}
+            self.counters: Dict[str, Dict[Labels, float]] = {}
+            self.started = time.time()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                s = self.spans.setdefault(name, {"count": 0, "total_sec": 0.0, "max_sec": 0.0})
+                s["count"] += 1
+                s["total_sec"] += elapsed
+                s["max_sec"] = max(s["max_sec"], elapsed)
+
+    def incr(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def request(self, endpoint: str) -> None:
+        self.incr("requests", endpoint=endpoint)
+
+    def tokens(self, service: str, **counts: int) -> None:
+        """
+        counts: kind -> 토큰 수 (input / output / cache_read / cache_creation), 0 이나 None 은 건너뜀
+        """
+        for kind, n in counts.items():
+            if n:
+                self.incr("tokens", n, service=service, kind=kind)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {name: {**s, "total_sec": round(s["total_sec"], 4), "max_sec": round(s["max_sec"], 4)}
+                          for name, s in self.spans.items()},
+                "counters": {name: [{"labels": dict(k), "value": v} for k, v in series.items()]
+                             for name, series in self.counters.items()},
+            }
+
+    # ---------- 내보내기 ----------
+    def write_jsonl(self, summary: Dict[str, Any] = None, path: str = METRICS_PATH) -> None:
+        """
+        실행 요약 + 지표를 JSON 한 줄로 이어 씀
+        """
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "wall_sec": round(time.time() - self.started, 3),
+            "summary": summary or {},
+            **self.snapshot(),
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "ab") as f:
+            f.write(orjson.dumps(record) + b"\n")
+
+    def write_prometheus(self, path: str = METRICS_PROM_PATH, summary: Dict[str, Any] = None) -> None:
+        """
+        Prometheus textfile 형식으로 마지막 실행 값을 덮어씀 (tmp 파일 후 rename)
+        """
+        if not path:
+            return
+        snap = self.snapshot()
+        lines = []
+
+        def emit(metric: str, kind: str, samples):
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+                lines.append(f"{metric}{{{label_str}}} {value}" if label_str else f"{metric} {value}")
+
+        emit("insty_stage_seconds", "gauge", [({"stage": n}, s["total_sec"]) for n, s in snap["spans"].items()])
+        emit("insty_stage_calls", "gauge", [({"stage": n}, s["count"]) for n, s in snap["spans"].items()])
+        for name, series in snap["counters"].items():
+            emit(f"insty_{name}", "gauge", [(s["labels"], s["value"]) for s in series])
+        numeric = {k: v for k, v in (summary or {}).items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+        emit("insty_run", "gauge", [({"key": k}, v) for k, v in numeric.items()])
+        emit("insty_run_timestamp_seconds", "gauge", [({}, round(time.time(), 3))])
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+
+
+# 프로세스 전역 집계기 (logger 처럼 모듈마다 import 해서 사용)
+metrics = Metrics()
@@ -1,19 +1,69 @@
-from typing import List, Dict, Any
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Mapping, Optional
+
 from dateutil import parser as dateparser
-from datetime import datetime
-from .config import TZ
+
+from .logger import get_logger
+from .utils import normalize_task_name
+
+logger = get_logger("insty")
 
 VALID_AREA = {"개발","디자인","기획","마케팅","운영","기타","AI","BE","FE"}
 VALID_STATUS = {"계획","진행중","완료","보류","취소"}
 VALID_TYPE = {"신규개발","버그수정","개선","유지보수","분석","기타"}
 VALID_PRIORITY = {"높음","보통","낮음"}
 
-def _as_date_str(s: str, fallback: datetime) -> str:
+# task key -> (기본 허용값, 기본값). DB 스키마의 select 옵션이 있으면 허용값은 그걸로 대체
+SELECT_FIELDS = {
+    "field": (VALID_AREA, "기타"),
+    "process": (VALID_STATUS, "계획"),
+    "function": (VALID_TYPE, "기타"),
+    "priority": (VALID_PRIORITY, "보통"),
+}
+
+# 간단 매핑 (유사어)
+_SELECT_SYNONYMS = {
+    "진행중입니다": "진행중",
+    "planning": "계획",
+    "done": "완료",
+    "bugfix": "버그수정",
+    "improve": "개선",
+    "analysis": "분석",
+    "high": "높음",
+    "medium": "보통",
+    "low": "낮음",
+}
+
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+# "9월 30일", "2025년 9월 30일" (연도가 없으면 회의 날짜의 연도)
+_KO_DATE_RE = re.compile(r"(?:(\d{4})\s*년\s*)?(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+
+# Notion title / select 이름 길이 제한
+MAX_NAME_LEN = 2000
+
+
+def _as_date_str(s: str, fallback: str) -> str:
+    # 대부분 YYYY-MM-DD(T...) 로 오므로 dateutil 전에 바로 처리
+    if _ISO_DATE_RE.match(s):
+        try:
+            return date.fromisoformat(s[:10]).isoformat()
+        except ValueError:
+            pass
+    return _parse_date(s, fallback)
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(s: str, fallback: str) -> str:
+    m = _KO_DATE_RE.search(s)
     try:
-        dt = dateparser.parse(s)
-        return dt.date().isoformat()
+        if m:
+            return date(int(m.group(1) or fallback[:4]), int(m.group(2)), int(m.group(3))).isoformat()
+        return dateparser.parse(s).date().isoformat()
     except Exception:
-        return fallback.date().isoformat()
+        return fallback
+
 
 def _as_int_progress(v) -> int:
     # "69.3%" or "9/13" or number
@@ -30,53 +80,68 @@ def _as_int_progress(v) -> int:
     except Exception:
         return 0
 
-def _coerce_select(value: str, valid: set, default: str) -> str:
+
+@lru_cache(maxsize=4096)
+def _coerce_select(value: str, valid: frozenset, default: str) -> Optional[str]:
+    """
+    허용값 그대로 -> 대소문자/띄어쓰기만 다른 허용값 -> 유사어 -> 기본값 순.
+    기본값도 DB 에 없으면 None (select 비움, 없는 옵션을 새로 만들지 않도록)
+    """
     if value in valid:
         return value
-    # 간단 매핑 (유사어)
-    mapping = {
-        "진행중입니다": "진행중",
-        "planning": "계획",
-        "done": "완료",
-        "bugfix": "버그수정",
-        "improve": "개선",
-        "analysis": "분석",
-        "high": "높음",
-        "medium": "보통",
-        "low": "낮음",
+    norm = normalize_task_name(value)
+    for option in valid:
+        if normalize_task_name(option) == norm:
+            return option
+    v = _SELECT_SYNONYMS.get(value.lower(), default)
+    if v in valid:
+        return v
+    return default if default in valid else None
+
+
+def normalize_tasks(tasks: List[Dict[str, Any]], meeting_date: datetime,
+                    select_options: Optional[Mapping[str, Iterable[str]]] = None) -> List[Dict[str, Any]]:
+    """
+    LLM 결과를 Notion 에 보낼 수 있는 값으로 정리 (이름 없는 task 는 버림)
+    select_options: task key -> DB 의 실제 select 옵션 이름 (NotionClientWrap.get_db_schema 의 "options")
+    """
+    select_options = select_options or {}
+    valid = {
+        key: frozenset(select_options.get(key) or defaults)
+        for key, (defaults, _) in SELECT_FIELDS.items()
     }
-    v = mapping.get(str(value).lower(), default)
-    return v if v in valid else default
+    meeting_iso = meeting_date.date().isoformat()
 
-def normalize_tasks(tasks: List[Dict[str, Any]], meeting_date: datetime) -> List[Dict[str, Any]]:
     normed = []
+    fixed = 0
     for t in tasks:
-        name = str(t.get("name", "")).strip()
+        name = str(t.get("name", "")).strip()[:MAX_NAME_LEN]
         if not name:
             continue
 
-        area = _coerce_select(str(t.get("field", "기타")).strip(), VALID_AREA, "기타")
-        status = _coerce_select(str(t.get("process", "계획")).strip(), VALID_STATUS, "계획")
-        ftype = _coerce_select(str(t.get("function", "기타")).strip(), VALID_TYPE, "기타")
-        priority = _coerce_select(str(t.get("priority", "보통")).strip(), VALID_PRIORITY, "보통")
-
-        start_raw = t.get("start") or meeting_date.date().isoformat()
-        due_raw = t.get("end") or meeting_date.date().isoformat()
+        selects = {}
+        for key, (_, default) in SELECT_FIELDS.items():
+            raw = str(t.get(key) or default).strip()
+            selects[key] = _coerce_select(raw, valid[key], default)
+            fixed += selects[key] != raw
 
-        start = _as_date_str(str(start_raw), meeting_date)
-        due = _as_date_str(str(due_raw), meeting_date)
+        start = _as_date_str(str(t.get("start") or meeting_iso), meeting_iso)
+        due = _as_date_str(str(t.get("end") or meeting_iso), meeting_iso)
+        fixed += (start != t.get("start")) + (due != t.get("end"))
         desc = str(t.get("description", "")).strip()
         progress = _as_int_progress(t.get("progress", 0))
 
         normed.append({
             "name": name,
-            "field": area,
-            "process": status,
-            "function": ftype,
+            "field": selects["field"],
+            "process": selects["process"],
+            "function": selects["function"],
             "start": start,
             "end": due,
             "description": desc,
-            "priority": priority,
+            "priority": selects["priority"],
             "progress": progress,
         })
+    if fixed or len(normed) != len(tasks):
+        logger.info(f"Normalized tasks: kept={len(normed)} rejected={len(tasks) - len(normed)} fixed_values={fixed}")
     return normed
@@ -1,113 +1,584 @@
 import os
-from typing import Dict, Any, List, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import cached_property
+from typing import Dict, Any, List, Optional, Set, Tuple
 from notion_client import Client
 from .logger import get_logger
-import numpy as np
-from openai import OpenAI
+from .metrics import metrics
+from .embedding_cache import EmbeddingCache, title_hash
+from .embedding_backend import EmbeddingBackend, make_embedding_backend, openai_api_key
+from .notion_mirror import NotionTaskMirror, created_floor, page_title
+from .lexical_matcher import LexicalMatcher, Match
+from .notion_retry import call_with_retry
+from .rate_limiter import RateLimiter
+from .run_journal import PageJournal
+from .utils import normalize_task_name
+from .write_executor import NotionWriteExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = get_logger("insty")
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("OPENAI_API_KEY must be set in .env")
+# 블록 트리 조회 동시 요청 수 (전체 속도는 rate_limiter 가 제한)
+NOTION_FETCH_CONCURRENCY = int(os.getenv("NOTION_FETCH_CONCURRENCY", "4"))
+# 같은 프로세스에서 다시 쓰는 task 이름 임베딩 (병합 단계 -> 업서트, --watch 반복) 메모리 보관 개수
+EMBED_MEMO_MAX_ITEMS = int(os.getenv("EMBED_MEMO_MAX_ITEMS", "10000"))
+# DB 스키마(속성 / select 옵션) 메모리 캐시 유지 시간
+NOTION_SCHEMA_TTL_SEC = float(os.getenv("NOTION_SCHEMA_TTL_SEC", "600"))
+# 벡터 저장소에 없는 기존 페이지 제목을 한 번에 채우는 개수 (float list 로 풀리는 양을 제한, EMBED_BATCH_MAX_ITEMS 와 맞춤)
+VECTOR_FILL_CHUNK = int(os.getenv("VECTOR_FILL_CHUNK", "2048"))
 
 
 class NotionClientWrap:
-    def __init__(self, token: str):
-        self.client = Client(auth=token)
-        self.oai_client = OpenAI(api_key=api_key)
+    # sync / async 버전이 다른 부분 (AsyncNotionClientWrap 이 바꿔 끼움)
+    rate_limiter_cls = RateLimiter
+    write_executor_cls = NotionWriteExecutor
+    upsert_lock_cls = threading.Lock
 
+    # numpy / openai 와 로컬 캐시(SQLite, 벡터 저장소)는 처음 쓸 때 로드 (create_note.py 처럼 조회만 하는 CLI 는 필요 없음)
+    # client / oai_client / embedder 를 넘기면 그대로 사용 (로컬 대역 서버, 벤치마크용)
+    def __init__(self, token: str, embedding_cache: EmbeddingCache = None, mirror: NotionTaskMirror = None,
+                 client: Client = None, oai_client=None, embedder: EmbeddingBackend = None,
+                 vector_store_path: str = None):
+        self.client = client or Client(auth=token)
+        if oai_client is not None:
+            self.oai_client = oai_client
+        if embedder is not None:
+            self.embedder = embedder
+        if embedding_cache is not None:
+            self.embedding_cache = embedding_cache
+        if mirror is not None:
+            self.mirror = mirror
+        self.rate_limiter = self.rate_limiter_cls()
+        self.write_executor = self.write_executor_cls(self.client, self.rate_limiter)
+        self._synced_dbs = set()
+        self._schemas: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._embedding_memo: Dict[str, List[float]] = {}
+        self._vector_store_path = vector_store_path
+        self._vector_stores = {}
+        # 같은 DB 에 대한 upsert 는 한 번에 하나만 (동시 실행 시 같은 task 중복 생성 방지)
+        self._upsert_lock = self.upsert_lock_cls()
+
+    @cached_property
+    def oai_client(self):
+        from openai import OpenAI
+        return OpenAI(api_key=openai_api_key())
+
+    @cached_property
+    def embedder(self) -> EmbeddingBackend:
+        # EMBEDDING_BACKEND 로 선택, hashing 이면 oai_client 는 만들지 않음
+        return make_embedding_backend(lambda: self.oai_client)
+
+    @cached_property
+    def embedding_cache(self) -> EmbeddingCache:
+        return EmbeddingCache()
+
+    @cached_property
+    def mirror(self) -> NotionTaskMirror:
+        return NotionTaskMirror()
 
     def get_embedding(self, text: str) -> list[float]:
-        if not text:
-            return []
-        resp = self.oai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        return resp.data[0].embedding
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: List[str], memo: bool = True) -> List[List[float]]:
+        """
+        여러 문자열을 묶어서 임베딩 (입력 순서 유지, 중복 문자열은 한 번만 요청)
+        빈 문자열은 [] 로 반환
+        memo=False: 다시 쓰지 않을 문자열 (기존 페이지 제목은 벡터 저장소에 들어감)
+        """
+        unique = list(dict.fromkeys(t for t in texts if t))
+        vectors, missing = self._memo_lookup(unique)
+        if missing:
+            with metrics.span("embedding"):
+                vectors.update(zip(missing, self.embedder.embed(missing)))
+            if memo:
+                self._memo_store(vectors, missing)
+            logger.info(f"Embedded {len(missing)} unique texts with {self.embedder.name} (requested={len(texts)})")
+        return [vectors[t] if t else [] for t in texts]
+
+    def _memo_lookup(self, unique: List[str]) -> Tuple[Dict[str, List[float]], List[str]]:
+        vectors = {t: self._embedding_memo[t] for t in unique if t in self._embedding_memo}
+        return vectors, [t for t in unique if t not in vectors]
+
+    def _memo_store(self, vectors: Dict[str, List[float]], fresh: List[str]) -> None:
+        if len(self._embedding_memo) + len(fresh) > EMBED_MEMO_MAX_ITEMS:
+            self._embedding_memo.clear()
+        self._embedding_memo.update((t, vectors[t]) for t in fresh[:EMBED_MEMO_MAX_ITEMS])
 
     @staticmethod
     def cosine_similarity(a: List[float], b: List[float]) -> float:
+        import numpy as np
         a, b = np.array(a), np.array(b)
         return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 
-    def upsert_tasks(self, database_id: str, tasks: List[Dict[str, Any]]) -> Dict[str, int]:
+    def upsert_tasks(self, database_id: str, tasks: List[Dict[str, Any]], threshold: Optional[float] = None,
+                     journal: PageJournal = None) -> Dict[str, Any]:
+        """
+        journal 을 넘기면 보내기 전에 계획한 mutation 을 기록하고 끝날 때마다 done 표시.
+        이미 계획이 기록된 페이지(중단된 실행)는 매칭을 다시 하지 않고 남은 mutation 만 보냄
+        """
+        with self._upsert_lock:
+            if journal is not None and journal.planned() is not None:
+                return self._replay_journal(database_id, journal)
+            return self._upsert_tasks(database_id, tasks, threshold, journal)
+
+    def _upsert_tasks(self, database_id: str, tasks: List[Dict[str, Any]], threshold: Optional[float],
+                      journal: PageJournal = None) -> Dict[str, Any]:
         title_prop_name, name_to_id = self._get_db_schema(database_id)
-        created, updated = 0, 0
 
+        self.sync_mirror(database_id, title_prop_name)
+        existing_pages = self.mirror.pages(database_id)
 
-        existing_pages = self.client.databases.query(database_id=database_id).get("results", [])
-        existing_tasks = []
-        for page in existing_pages:
-            props = page["properties"]
-            title_val = props[title_prop_name]["title"][0]["plain_text"] if props[title_prop_name]["title"] else ""
-            embedding = self.get_embedding(title_val)
-            existing_tasks.append({
-                "page_id": page["id"],
-                "name": title_val,
-                "embedding": embedding
-            })
-
-        for task in tasks:
+        #  제목(정확/ n-gram)으로 먼저 매칭하고, 남은 task 만 임베딩
+        matches, remaining = self._lexical_matches(existing_pages, title_prop_name, tasks)
+        if remaining:
+            store, titles = self._index_existing_pages(database_id, existing_pages, title_prop_name)
+            new_embs = self.get_embeddings([tasks[i].get("name") for i in remaining])
+            self._embedding_matches(matches, remaining, new_embs, store, titles, self._match_threshold(threshold))
+
+        mutations, unchanged = self._plan_mutations(database_id, tasks, matches, name_to_id, existing_pages)
+        tiers = self._tier_counts(tasks, matches)
+        if journal is not None:
+            journal.plan(mutations, unchanged, tiers)
+        # 쓰기 전 미러에 있던 페이지는 애매하게 실패한 create 의 결과로 보지 않음
+        find_existing = self._created_page_lookup(database_id, title_prop_name, created_floor(time.time()),
+                                                  {page["id"] for page in existing_pages})
+        results = self.write_executor.run(mutations, on_result=journal.mark if journal is not None else None,
+                                          find_existing=find_existing)
+        self.mirror.upsert_pages(database_id, [r["page"] for r in results if r["ok"]], title_prop_name)
+        return self._summarize_writes(results, unchanged, tiers)
+
+    def _replay_journal(self, database_id: str, journal: PageJournal) -> Dict[str, Any]:
+        title_prop_name, _ = self._get_db_schema(database_id)
+        pending = journal.pending()
+        # 중단 직전에 보낸 create 가 실제로 반영됐을 수 있으니 미러를 최신으로 맞춘 뒤,
+        # 계획 이후 생성됐고 이 실행의 다른 mutation 결과가 아닌 같은 제목 페이지만 반영된 것으로 봄
+        since, exclude = created_floor(journal.planned().get("planned_at", 0)), journal.done_page_ids()
+        existing = self._landed_creates(database_id, title_prop_name, self._creates(pending), since, exclude)
+        mutations = self._pending_mutations(pending, existing, journal)
+        results = self.write_executor.run(mutations, on_result=journal.mark,
+                                          find_existing=self._created_page_lookup(database_id, title_prop_name,
+                                                                                  since, exclude))
+        self.mirror.upsert_pages(database_id, [r["page"] for r in results if r["ok"]], title_prop_name)
+        return self._replay_summary(results, journal)
+
+    @staticmethod
+    def _creates(pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [m for m in pending if m["op"] == "create"]
+
+    @staticmethod
+    def _pending_mutations(pending: List[Dict[str, Any]], existing: List[Optional[Dict[str, Any]]],
+                           journal: PageJournal) -> List[Dict[str, Any]]:
+        """
+        journal 에서 done 이 아닌 mutation 중 다시 보낼 것
+        existing: create 순서대로 같은 제목의 기존 페이지 (있으면 보내지 않고 done 처리)
+        """
+        found = iter(existing)
+        mutations = []
+        for m in pending:
+            page = next(found) if m["op"] == "create" else None
+            if page is not None:
+                logger.info(f"Already created before interruption: {m['task'].get('name')}")
+                journal.mark({**m, "ok": True, "page": page})
+                continue
+            mutations.append(m)
+        logger.info(f"Journal replay: {len(mutations)} pending mutations ({len(pending) - len(mutations)} already applied)")
+        return mutations
+
+    def _replay_summary(self, results: List[Dict[str, Any]], journal: PageJournal) -> Dict[str, Any]:
+        plan = journal.planned()
+        summary = self._summarize_writes(results, plan["unchanged"], plan["tiers"])
+        # created / updated 는 이전 실행에서 끝난 것까지 합친 페이지 전체 기준
+        summary.update(journal.done_counts())
+        return summary
+
+    @staticmethod
+    def _lexical_matches(existing_pages: List[Dict[str, Any]], title_prop_name: str,
+                         tasks: List[Dict[str, Any]]) -> Tuple[List[Optional[Match]], List[int]]:
+        """
+        returns: (task 별 매칭 또는 None, 임베딩으로 다시 볼 task index 목록)
+        """
+        with metrics.span("matching"):
+            matcher = LexicalMatcher([{"page_id": page["id"], "name": page_title(page, title_prop_name)}
+                                      for page in existing_pages])
+            matches = matcher.match([task.get("name") or "" for task in tasks])
+        remaining = [i for i, (task, match) in enumerate(zip(tasks, matches)) if match is None and task.get("name")]
+        return matches, remaining
+
+    def _match_threshold(self, threshold: Optional[float]) -> Optional[float]:
+        # 지정하지 않으면 backend 기준 (hashing 은 HASH_EMBED_MATCH_THRESHOLD, OpenAI 는 TASK_MATCH_THRESHOLD)
+        return threshold if threshold is not None else self.embedder.match_threshold
+
+    @staticmethod
+    def _embedding_matches(matches: List[Optional[Match]], remaining: List[int], new_embs: List[List[float]],
+                           store, titles: Dict[str, Dict[str, str]], threshold: Optional[float]) -> None:
+        """
+        제목으로 못 정한 task 를 임베딩 유사도로 매칭해서 matches 에 채움
+        store / titles: _index_existing_pages 결과 (store 가 None 이면 기존 페이지 없음)
+        """
+        from .task_matcher import assign_matches, TASK_MATCH_THRESHOLD, TASK_MATCH_TOP_K
+        if threshold is None:
+            threshold = TASK_MATCH_THRESHOLD
+        if store is None or not len(store):
+            return
+
+        #  가장 유사한 기존 task 찾기 (저장소 top-k 검색, 제목으로 이미 정해진 페이지는 제외, 기존 페이지당 최대 1개 task 배정)
+        taken = {m[0]["page_id"] for m in matches if m}
+        with metrics.span("matching"):
+            hits = store.search(new_embs, k=TASK_MATCH_TOP_K + len(taken))
+            candidates = []
+            for qi, found in enumerate(hits):
+                found = [(key, score) for key, score in found
+                         if key in titles and titles[key]["page_id"] not in taken][:TASK_MATCH_TOP_K]
+                candidates.extend((score, qi, key) for key, score in found if score >= threshold)
+            assigned, conflicts = assign_matches(candidates)
+            for qi, (key, score) in assigned.items():
+                matches[remaining[qi]] = (titles[key], score, "embedding")
+        if conflicts:
+            logger.warning(f"{conflicts} tasks lost a match to a closer task for the same page")
+
+    @staticmethod
+    def _tier_counts(tasks: List[Dict[str, Any]], matches: List[Optional[Match]]) -> Dict[str, int]:
+        tiers = {"exact": 0, "ngram": 0, "embedding": 0, "new": 0}
+        for task, match in zip(tasks, matches):
+            if task.get("name"):
+                tiers[match[2] if match else "new"] += 1
+        return tiers
+
+    def _plan_mutations(self, database_id: str, tasks: List[Dict[str, Any]], matches: List[Optional[Match]],
+                        name_to_id: Dict[str, str], existing_pages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        매칭 결과로 보낼 create/update 목록을 만듦 (I/O 없음)
+        returns: (mutations, 변경 없어서 건너뛴 task 수)
+        """
+        pages_by_id = {page["id"]: page for page in existing_pages}
+
+        mutations = []
+        unchanged = 0
+        for task, match in zip(tasks, matches):
+            normalized_name = task.get("name")
+            if not normalized_name:
+                logger.warning("Skip a task without 'name'")
+                continue
             try:
-                normalized_name = task.get("name")
-                if not normalized_name:
-                    logger.warning("Skip a task without 'name'")
+                props = self._build_properties(name_to_id, task)
+            except Exception as e:
+                logger.error(f"Failed upsert '{normalized_name}': {e}")
+                continue
+
+            #기준치 이상 업데이트 아니면 신규 생성
+            if match:
+                best_match, best_score, tier = match
+                # 실제로 바뀐 속성만 보냄 (변경 없으면 호출 생략)
+                patch = self._diff_properties(props, pages_by_id[best_match["page_id"]])
+                if not patch:
+                    unchanged += 1
+                    logger.info(f"Unchanged ({tier} {best_score:.2f}): {normalized_name} ≈ {best_match['name']}")
                     continue
+                mutations.append({"op": "update", "page_id": best_match["page_id"], "properties": patch, "task": task,
+                                  "matched_name": best_match["name"], "score": best_score, "tier": tier})
+            else:
+                mutations.append({"op": "create", "database_id": database_id, "properties": props, "task": task})
+        return mutations, unchanged
 
-                #  신규 task name 임베딩
-                new_emb = self.get_embedding(normalized_name)
-
-                #  가장 유사한 기존 task 찾기
-                best_match, best_score = None, 0
-                for et in existing_tasks:
-                    if not et["embedding"]:
-                        continue
-                    sim = self.cosine_similarity(new_emb, et["embedding"])
-                    if sim > best_score:
-                        best_match, best_score = et, sim
-
-                #기준치 이상 업데이트 아니면 신규 생성
-                if best_match and best_score >= 0.9:
-                    props = self._build_properties(name_to_id, task)
-                    self.client.pages.update(page_id=best_match["page_id"], properties=props)
-                    updated += 1
-                    logger.info(f"Updated (similarity={best_score:.2f}): {normalized_name} ≈ {best_match['name']}")
-                else:
-                    props = self._build_properties(name_to_id, task)
-                    self.client.pages.create(parent={"database_id": database_id}, properties=props)
-                    created += 1
-                    logger.info(f"Created new task: {normalized_name}")
+    @staticmethod
+    def _summarize_writes(results: List[Dict[str, Any]], unchanged: int, tiers: Dict[str, int]) -> Dict[str, Any]:
+        created, updated, failed = 0, 0, 0
+        for r in results:
+            name = r["task"].get("name")
+            if not r["ok"]:
+                failed += 1
+                logger.error(f"Failed upsert '{name}' after {r['attempts']} attempts: {r['error']}")
+            elif r["op"] == "update":
+                updated += 1
+                logger.info(f"Updated ({r['tier']} {r['score']:.2f}): {name} ≈ {r['matched_name']}")
+            else:
+                created += 1
+                logger.info(f"Created new task: {name}")
 
-            except Exception as e:
-                logger.error(f"Failed upsert '{task.get('name', '(no-name)')}': {e}")
+        logger.info(f"Match tiers: exact={tiers['exact']} ngram={tiers['ngram']} "
+                    f"embedding={tiers['embedding']} new={tiers['new']}")
+        return {"created": created, "updated": updated, "unchanged": unchanged, "failed": failed,
+                "tiers": tiers, "results": results}
+
+
+    def _index_existing_pages(self, database_id: str, existing_pages: List[Dict[str, Any]], title_prop_name: str):
+        """
+        기존 페이지 제목 임베딩을 벡터 저장소(.cache/vectors, int8 memmap)에 미러와 같게 맞춤
+        - 임베딩 캐시에도 없는(새로 생겼거나 제목이 바뀐) 페이지만 embedder 로 계산
+        returns: (VectorStore 또는 None, 저장소 key -> {"page_id", "name"})
+        """
+        store, titles, missing = self._reconcile_vectors(database_id, existing_pages, title_prop_name)
+        for start in range(0, len(missing), VECTOR_FILL_CHUNK):
+            entries, cached, misses = self._lookup_existing_embeddings(missing[start:start + VECTOR_FILL_CHUNK], titles)
+            miss_embs = self.get_embeddings([title_val for _, _, title_val in misses], memo=False)
+            store = self._store_vectors(database_id, store, entries, cached, misses, miss_embs)
+        return self._finish_index(store, titles, missing)
+
+    def _vector_store(self, database_id: str, dim: int = None):
+        """
+        (DB, embedder) 별 벡터 저장소. 아직 없으면 dim 을 알 때(처음 add 할 때) 만듦
+        """
+        from .vector_store import VectorStore, VECTOR_STORE_PATH
+
+        path = os.path.join(self._vector_store_path or VECTOR_STORE_PATH, f"{database_id}-{self.embedder.name}")
+        store = self._vector_stores.get(path)
+        if store is None and (dim is not None or VectorStore.exists(path)):
+            store = self._vector_stores[path] = VectorStore(path, dim=dim)
+        return store
+
+    def _reconcile_vectors(self, database_id: str, existing_pages: List[Dict[str, Any]], title_prop_name: str):
+        """
+        key 는 page_id:제목 해시라서 제목이 바뀌거나 미러에서 빠진 페이지의 벡터는 여기서 지움
+        returns: (store, key -> {"page_id", "name", "last_edited_time"}, 새로 채울 key 목록)
+        """
+        titles = {}
+        for page in existing_pages:
+            name = page_title(page, title_prop_name)
+            if name:
+                titles[f"{page['id']}:{title_hash(name)}"] = {
+                    "page_id": page["id"], "name": name, "last_edited_time": page.get("last_edited_time", ""),
+                }
+        store = self._vector_store(database_id)
+        if store is not None:
+            store.delete([key for key in store.keys if key not in titles])
+        missing = [key for key in titles if store is None or key not in store]
+        return store, titles, missing
+
+    def _lookup_existing_embeddings(self, keys: List[str], titles: Dict[str, Dict[str, str]]):
+        """
+        returns: (entries [(page_id, last_edited_time, title)], 캐시 hit page_id -> embedding, 캐시 miss entries)
+        """
+        entries = [(titles[key]["page_id"], titles[key]["last_edited_time"], titles[key]["name"]) for key in keys]
+        cached = self.embedding_cache.get_many(entries, self.embedder.name)
+        misses = [e for e in entries if e[0] not in cached]
+        return entries, cached, misses
+
+    def _store_vectors(self, database_id: str, store, entries, cached, misses, miss_embs):
+        fresh = [(page_id, edited, title_val, emb) for (page_id, edited, title_val), emb in zip(misses, miss_embs)]
+        cached.update({page_id: emb for page_id, _, _, emb in fresh})
+        self.embedding_cache.put_many(fresh, self.embedder.name)
 
-        return {"created": created, "updated": updated}
+        vectors = [cached[page_id] for page_id, _, _ in entries]
+        if store is None:
+            store = self._vector_store(database_id, dim=len(vectors[0]))
+        store.add([f"{page_id}:{title_hash(title_val)}" for page_id, _, title_val in entries], vectors)
+        return store
 
+    def _finish_index(self, store, titles: Dict[str, Dict[str, str]], missing: List[str]):
+        if store is not None:
+            store.flush()
+        stats = self.embedding_cache.stats()
+        logger.info(f"Vector store: pages={len(titles)} added={len(missing)} "
+                    f"(embedding cache hits={stats['hits']} misses={stats['misses']})")
+        return store, titles
+
+    # ---------- DB 미러 ----------
+    def _query_all(self, database_id: str, **kwargs) -> List[Dict[str, Any]]:
+        """
+        databases.query 를 start_cursor 로 끝까지 따라가며 전체 결과 수집
+        """
+        results, cursor = [], None
+        while True:
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            resp = call_with_retry(self.rate_limiter, "notion.databases.query", self.client.databases.query,
+                                   database_id=database_id, page_size=100, **kwargs)
+            results.extend(resp.get("results", []))
+            if not resp.get("has_more"):
+                return results
+            cursor = resp.get("next_cursor")
+
+    def sync_mirror(self, database_id: str, title_prop_name: str = None) -> None:
+        """
+        로컬 미러 동기화: 처음(또는 전체 스캔 주기 경과)엔 전체 스캔, 이후엔 last_edited_time 이후 변경분만
+        """
+        if title_prop_name is None:
+            title_prop_name, _ = self._get_db_schema(database_id)
+        cursor = self.mirror.sync_cursor(database_id)
+        pages = self._query_all(database_id, **self._sync_query(cursor))
+        self._apply_sync(database_id, title_prop_name, cursor, pages)
+
+    @staticmethod
+    def _sync_query(cursor: str) -> Dict[str, Any]:
+        if cursor is None:
+            return {}
+        return {"filter": {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}}}
+
+    def _apply_sync(self, database_id: str, title_prop_name: str, cursor: str, pages: List[Dict[str, Any]]) -> None:
+        if cursor is None:
+            self.mirror.replace_all(database_id, pages, title_prop_name)
+            logger.info(f"Mirror full sync: {len(pages)} pages")
+        else:
+            self.mirror.upsert_pages(database_id, pages, title_prop_name, advance_cursor=True)
+            logger.info(f"Mirror delta sync: {len(pages)} pages edited since {cursor}")
+        self._synced_dbs.add(database_id)
+
+    def query_database(self, database_id: str, field: str = None, properties: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        DB task 를 {"page_id", "name", "field", ...} 형태로 반환 (서버에서 직접 조회, pagination 포함)
+        - field: 업무영역(select) 값으로 서버 쪽 필터
+        - properties: 받을 속성 이름 목록 (filter_properties 로 나머지 속성은 응답에서 빠짐)
+        """
+        kwargs = self._query_kwargs(field, properties, self._get_db_schema(database_id)[1] if properties else {})
+        return [self._page_to_task(page) for page in self._query_all(database_id, **kwargs)]
+
+    @staticmethod
+    def _query_kwargs(field: Optional[str], properties: Optional[List[str]], name_to_id: Dict[str, str]) -> Dict[str, Any]:
+        kwargs = {}
+        if field is not None:
+            kwargs["filter"] = {"property": "field", "select": {"equals": field}}
+        if properties:
+            kwargs["filter_properties"] = [name_to_id[name] for name in properties if name in name_to_id]
+        return kwargs
+
+    @staticmethod
+    def _property_value(prop: Dict[str, Any]):
+        t = prop.get("type")
+        if t in ("title", "rich_text"):
+            return "".join(rt.get("plain_text", "") for rt in prop.get(t) or [])
+        if t == "select":
+            return (prop.get("select") or {}).get("name")
+        if t == "date":
+            return (prop.get("date") or {}).get("start")
+        if t == "number":
+            return prop.get("number")
+        return None
+
+    @staticmethod
+    def _payload_value(payload: Dict[str, Any]):
+        """
+        _build_properties 가 만든 속성 payload 를 _property_value 와 같은 비교용 값으로 변환
+        """
+        for t in ("title", "rich_text"):
+            if t in payload:
+                return "".join((rt.get("text") or {}).get("content", "") for rt in payload[t] or [])
+        if "select" in payload:
+            return (payload["select"] or {}).get("name")
+        if "date" in payload:
+            return (payload["date"] or {}).get("start")
+        if "number" in payload:
+            return payload["number"]
+        return None
+
+    def _diff_properties(self, props: Dict[str, Any], page: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        props(속성 id -> payload) 중 기존 페이지 값과 다른 것만 남긴 patch
+        """
+        current = {p.get("id"): p for p in page["properties"].values()}
+        patch = {}
+        for prop_id, payload in props.items():
+            existing = current.get(prop_id)
+            if existing is None or self._payload_value(payload) != self._property_value(existing):
+                patch[prop_id] = payload
+        return patch
+
+    def _page_to_task(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        task = {"page_id": page["id"]}
+        for key, prop in page["properties"].items():
+            task[key] = self._property_value(prop)
+        return task
+
+    def search_pages_edited_since(self, since: str) -> List[Dict[str, Any]]:
+        """
+        search API 로 since(ISO 시각) 이후 편집된 페이지를 최근 편집 순으로 조회
+        (결과가 편집 시각 내림차순이라 since 보다 오래된 페이지가 나오면 더 넘기지 않음)
+        """
+        results, cursor = [], None
+        while True:
+            resp = call_with_retry(self.rate_limiter, "notion.search", self.client.search, **self._search_kwargs(cursor))
+            if self._collect_edited_since(results, resp, since):
+                return results
+            cursor = resp.get("next_cursor")
+
+    @staticmethod
+    def _search_kwargs(cursor: Optional[str]) -> Dict[str, Any]:
+        kwargs = {
+            "filter": {"property": "object", "value": "page"},
+            "sort": {"direction": "descending", "timestamp": "last_edited_time"},
+            "page_size": 100,
+        }
+        if cursor:
+            kwargs["start_cursor"] = cursor
+        return kwargs
+
+    @staticmethod
+    def _collect_edited_since(results: List[Dict[str, Any]], resp: Dict[str, Any], since: str) -> bool:
+        """
+        search 응답에서 since 이후 페이지를 results 에 추가. returns: 더 넘길 필요가 없으면 True
+        """
+        for page in resp.get("results", []):
+            if page.get("last_edited_time", "") < since:
+                return True
+            results.append(page)
+        return not resp.get("has_more")
+
+    def get_page_last_edited(self, page_id: str) -> str:
+        """
+        페이지 메타데이터만 조회해서 last_edited_time 반환 (블록 트리 조회 없이 변경 여부 확인용)
+        """
+        page = call_with_retry(self.rate_limiter, "notion.pages.retrieve", self.client.pages.retrieve, page_id=page_id)
+        return page.get("last_edited_time", "")
 
     def fetch_page_plain_text(self, page_id: str) -> str:
         """
-        페이지 블록을 순회하면서 텍스트 추출
+        페이지 블록 트리를 받아서 문서 순서대로 텍스트 추출
         """
+        with metrics.span("block_fetch"):
+            return self._assemble_text(self._fetch_block_tree(page_id), page_id)
+
+    def _assemble_text(self, children: Dict[str, List[Dict[str, Any]]], root_id: str) -> str:
+        # 재귀 대신 명시적 스택으로 전위 순회 (깊은 트리에서도 스택 한도 문제 없음)
         texts = []
-        def walk(block_id: str):
-            children = self.client.blocks.children.list(block_id).get("results", [])
-            for b in children:
-                t = self._block_to_text(b)
-                if t:
-                    texts.append(t)
-                if b.get("has_children"):
-                    walk(b["id"])
-
-        # page_id는 블록 API에 그대로 사용 가능
-        walk(page_id)
+        stack = [iter(children.get(root_id, []))]
+        while stack:
+            b = next(stack[-1], None)
+            if b is None:
+                stack.pop()
+                continue
+            t = self._block_to_text(b)
+            if t:
+                texts.append(t)
+            if b.get("has_children"):
+                stack.append(iter(children.get(b["id"], [])))
         return "\n".join(texts)
 
+    def _fetch_block_tree(self, root_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        너비 우선으로 블록 트리 전체 조회 (동시 요청 수 제한, 레벨별 pagination 포함)
+        returns: parent block id -> 자식 블록 목록 (문서 순서)
+        """
+        children: Dict[str, List[Dict[str, Any]]] = {}
+        with ThreadPoolExecutor(max_workers=NOTION_FETCH_CONCURRENCY) as pool:
+            pending = {pool.submit(self._list_children, root_id): root_id}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    block_id = pending.pop(fut)
+                    blocks = fut.result()
+                    children[block_id] = blocks
+                    for b in blocks:
+                        if b.get("has_children"):
+                            pending[pool.submit(self._list_children, b["id"])] = b["id"]
+        return children
+
+    def _list_children(self, block_id: str) -> List[Dict[str, Any]]:
+        results, cursor = [], None
+        while True:
+            kwargs = {"page_size": 100}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            resp = call_with_retry(self.rate_limiter, "notion.blocks.children.list", self.client.blocks.children.list,
+                                   block_id, **kwargs)
+            results.extend(resp.get("results", []))
+            if not resp.get("has_more"):
+                return results
+            cursor = resp.get("next_cursor")
+
     def _block_to_text(self, block: Dict[str, Any]) -> str:
         t = block.get("type")
         data = block.get(t, {})
@@ -123,7 +594,43 @@ class NotionClientWrap:
         returns: (title_property_name_for_filter, name->id map)
         - Notion filter에는 'property'에 이름 문자열을 써야 함
         """
-        db = self.client.databases.retrieve(database_id=database_id)
+        schema = self.get_db_schema(database_id)
+        return schema["title"], schema["name_to_id"]
+
+    def get_db_schema(self, database_id: str) -> Dict[str, Any]:
+        """
+        returns: {"title": title 속성 이름, "name_to_id": 속성 이름 -> id, "options": select 속성 이름 -> 옵션 이름 set}
+        NOTION_SCHEMA_TTL_SEC 동안은 다시 조회하지 않음
+        """
+        schema = self._cached_schema(database_id)
+        if schema is None:
+            db = call_with_retry(self.rate_limiter, "notion.databases.retrieve", self.client.databases.retrieve,
+                                 database_id=database_id)
+            schema = self._store_schema(database_id, db)
+        return schema
+
+    def _cached_schema(self, database_id: str) -> Optional[Dict[str, Any]]:
+        cached = self._schemas.get(database_id)
+        if cached and time.monotonic() - cached[0] < NOTION_SCHEMA_TTL_SEC:
+            return cached[1]
+        return None
+
+    def _store_schema(self, database_id: str, db: Dict[str, Any]) -> Dict[str, Any]:
+        title_prop_name, name_to_id = self._parse_db_schema(db)
+        schema = {"title": title_prop_name, "name_to_id": name_to_id, "options": self._select_options(db)}
+        self._schemas[database_id] = (time.monotonic(), schema)
+        return schema
+
+    @staticmethod
+    def _select_options(db: Dict[str, Any]) -> Dict[str, frozenset]:
+        return {
+            name: frozenset(o["name"] for o in prop["select"].get("options", []))
+            for name, prop in db["properties"].items()
+            if prop.get("type") == "select" and prop.get("select")
+        }
+
+    @staticmethod
+    def _parse_db_schema(db: Dict[str, Any]) -> Tuple[str, Dict[str, str]]:
         props = db["properties"]
         name_to_id = {k: v["id"] for k, v in props.items()}
 
@@ -142,7 +649,9 @@ class NotionClientWrap:
         pid = name_to_id
 
         def safe_select(key: str, default: str = "기타"):
-            return {"select": {"name": task.get(key, default)}}
+            # normalize_tasks 가 DB 에 없는 값을 None 으로 비운 경우
+            value = task.get(key, default)
+            return {"select": {"name": value}} if value else {"select": None}
 
         def safe_date(key: str):
             val = task.get(key)
@@ -162,17 +671,38 @@ class NotionClientWrap:
             pid["progress"]: {"number": int(task.get("progress", 0))},
         }
 
-    def _find_existing_page(self, database_id: str, title_property_name: str, task_name: str):
+    def _landed_creates(self, database_id: str, title_property_name: str, creates: List[Dict[str, Any]],
+                        since: str, exclude: Set[str]) -> List[Optional[Dict[str, Any]]]:
         """
-        같은 제목(name)이 이미 있는지 검색 (정확 일치해야만,,)
+        create mutation 별로 실제로 반영된 페이지(미러 page dict) 또는 None (먼저 증분 동기화)
+        - since(created_time) 이후 생긴 같은 제목(정규화 기준) 페이지 중 exclude 에 없는 것만 인정
+        - 같은 이름의 기존 페이지가 이미 다른 task 에 배정돼서 create 로 넘어온 경우가 있어서 제목만으로는 판단하지 않음
+        - 인정한 page_id 는 exclude 에 추가 (같은 이름 create 두 개가 한 페이지를 나눠 갖지 않도록)
         """
-        q = self.client.databases.query(
-            database_id=database_id,
-            filter={
-                "property": title_property_name,
-                "title": {"equals": task_name}
-            },
-            page_size=1
-        )
-        results = q.get("results", [])
-        return results[0]["id"] if results else None
+        self.sync_mirror(database_id, title_property_name)
+        return self._match_landed(database_id, creates, since, exclude)
+
+    def _match_landed(self, database_id: str, creates: List[Dict[str, Any]], since: str,
+                      exclude: Set[str]) -> List[Optional[Dict[str, Any]]]:
+        if not creates:
+            return []
+        by_name: Dict[str, List[str]] = {}
+        for t in self.mirror.created_since(database_id, since):
+            by_name.setdefault(normalize_task_name(t["name"]), []).append(t["page_id"])
+        found = []
+        for m in creates:
+            candidates = by_name.get(normalize_task_name(m["task"].get("name") or ""), [])
+            page_id = next((pid for pid in candidates if pid not in exclude), None)
+            if page_id is not None:
+                exclude.add(page_id)
+            found.append(self.mirror.page(page_id) if page_id is not None else None)
+        return found
+
+    def _created_page_lookup(self, database_id: str, title_property_name: str, since: str, exclude: Set[str]):
+        """
+        write executor 의 find_existing: 애매하게 실패한 create 가 실제로 반영됐는지 미러를 다시 맞춰서 확인
+        - exclude: 쓰기 전부터 있던 / 이미 다른 mutation 결과인 page_id, claimed: 이번 run 에서 성공한 결과
+        """
+        def find(m: Dict[str, Any], claimed: Set[str]) -> Optional[Dict[str, Any]]:
+            return self._landed_creates(database_id, title_property_name, [m], since, exclude | claimed)[0]
+        return find
@@ -0,0 +1,180 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from .logger import get_logger
+
+logger = get_logger("insty")
+
+NOTION_MIRROR_PATH = os.getenv("NOTION_MIRROR_PATH", ".cache/notion_mirror.sqlite3")
+# 증분 동기화로는 삭제/보관된 페이지를 알 수 없어서 주기적으로 전체 스캔
+NOTION_MIRROR_FULL_SYNC_HOURS = float(os.getenv("NOTION_MIRROR_FULL_SYNC_HOURS", "24"))
+
+
+def page_title(page: Dict[str, Any], title_prop_name: str) -> str:
+    title = page["properties"].get(title_prop_name, {}).get("title") or []
+    return "".join(t.get("plain_text", "") for t in title)
+
+
+def created_floor(ts: float) -> str:
+    """
+    unix 시각 -> 그 분의 시작 (Notion created_time 은 분 단위로 내림된 값이라 이 이후로 비교해야 안 놓침)
+    """
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+class NotionTaskMirror:
+    """
+    Notion task DB 의 로컬 미러 (SQLite).
+    - pages: page_id, title, properties(JSON), last_edited_time, created_time
+    - sync_state: DB별 증분 동기화 커서(last_edited_time 최댓값)와 마지막 전체 스캔 시각
+    실제 Notion 조회는 NotionClientWrap.sync_mirror 가 담당하고, 여기서는 저장/조회만 함
+    """
+
+    def __init__(self, path: str = NOTION_MIRROR_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                page_id TEXT PRIMARY KEY,
+                database_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                properties BLOB NOT NULL,
+                last_edited_time TEXT NOT NULL,
+                created_time TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_db_title ON pages(database_id, title);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                database_id TEXT PRIMARY KEY,
+                cursor TEXT,
+                last_full_sync REAL
+            );
+            """
+        )
+        # created_time 컬럼 이전에 만든 미러 파일 (기존 행은 '' 라서 created_since 에 안 잡힘)
+        if "created_time" not in {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN created_time TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    # ---------- 동기화 상태 ----------
+    def sync_cursor(self, database_id: str) -> Optional[str]:
+        """
+        증분 동기화에 쓸 last_edited_time 커서. 전체 스캔이 필요하면 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cursor, last_full_sync FROM sync_state WHERE database_id = ?", (database_id,)
+            ).fetchone()
+        if not row or not row[0] or not row[1]:
+            return None
+        if time.time() - row[1] > NOTION_MIRROR_FULL_SYNC_HOURS * 3600:
+            return None
+        return row[0]
+
+    def replace_all(self, database_id: str, pages: List[Dict[str, Any]], title_prop_name: str) -> None:
+        """
+        전체 스캔 결과로 해당 DB 미러를 통째로 교체
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE database_id = ?", (database_id,))
+            self._write(database_id, pages, title_prop_name)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (database_id, cursor, last_full_sync) VALUES (?, ?, ?)",
+                (database_id, self._max_edited(database_id), time.time()),
+            )
+            self._conn.commit()
+
+    def upsert_pages(self, database_id: str, pages: List[Dict[str, Any]], title_prop_name: str,
+                     advance_cursor: bool = False) -> None:
+        """
+        증분 동기화 결과(advance_cursor=True)나 직접 생성/수정한 페이지 응답을 반영
+        - 직접 쓴 페이지로 커서를 올리면 그 사이 다른 사람이 고친 페이지를 놓치므로 커서는 동기화 결과로만 이동
+        """
+        if not pages:
+            return
+        with self._lock:
+            self._write(database_id, pages, title_prop_name)
+            if advance_cursor:
+                latest = max(p.get("last_edited_time", "") for p in pages)
+                self._conn.execute(
+                    "UPDATE sync_state SET cursor = MAX(COALESCE(cursor, ''), ?) WHERE database_id = ?",
+                    (latest, database_id),
+                )
+            self._conn.commit()
+
+    def _write(self, database_id: str, pages: List[Dict[str, Any]], title_prop_name: str) -> None:
+        archived = [(p["id"],) for p in pages if p.get("archived") or p.get("in_trash")]
+        live = [p for p in pages if not (p.get("archived") or p.get("in_trash"))]
+        self._conn.executemany("DELETE FROM pages WHERE page_id = ?", archived)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO pages (page_id, database_id, title, properties, last_edited_time, created_time) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (p["id"], database_id, page_title(p, title_prop_name), orjson.dumps(p["properties"]),
+                 p.get("last_edited_time", ""), p.get("created_time", ""))
+                for p in live
+            ],
+        )
+
+    def _max_edited(self, database_id: str) -> Optional[str]:
+        # ISO8601(UTC, 'Z') 문자열이라 사전순 비교 = 시간순 비교
+        return self._conn.execute(
+            "SELECT MAX(last_edited_time) FROM pages WHERE database_id = ?", (database_id,)
+        ).fetchone()[0]
+
+    # ---------- 조회 ----------
+    def pages(self, database_id: str) -> List[Dict[str, Any]]:
+        """
+        Notion query 결과와 같은 모양의 page dict 목록 (id, last_edited_time, properties)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id, properties, last_edited_time FROM pages WHERE database_id = ? ORDER BY rowid",
+                (database_id,),
+            ).fetchall()
+        return [
+            {"id": page_id, "properties": orjson.loads(props), "last_edited_time": edited}
+            for page_id, props, edited in rows
+        ]
+
+    def page(self, page_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT properties, last_edited_time FROM pages WHERE page_id = ?", (page_id,)
+            ).fetchone()
+        return {"id": page_id, "properties": orjson.loads(row[0]), "last_edited_time": row[1]} if row else None
+
+    def titles(self, database_id: str) -> List[Dict[str, str]]:
+        """
+        [{"page_id", "name"}] - 제목만 필요할 때 (properties JSON 파싱 없음)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id, title FROM pages WHERE database_id = ? ORDER BY rowid", (database_id,)
+            ).fetchall()
+        return [{"page_id": page_id, "name": title} for page_id, title in rows]
+
+    def created_since(self, database_id: str, since: str) -> List[Dict[str, str]]:
+        """
+        [{"page_id", "name"}] - created_time 이 since(ISO8601 UTC) 이후인 페이지
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_id, title FROM pages WHERE database_id = ? AND created_time >= ? ORDER BY rowid",
+                (database_id, since),
+            ).fetchall()
+        return [{"page_id": page_id, "name": title} for page_id, title in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
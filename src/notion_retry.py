@@ -0,0 +1,113 @@
+import asyncio
+import os
+import random
+import time
+from typing import Any, Callable, Optional
+
+import httpx
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from .logger import get_logger
+from .metrics import metrics
+
+logger = get_logger("insty")
+
+NOTION_READ_MAX_RETRIES = int(os.getenv("NOTION_READ_MAX_RETRIES", "5"))
+NOTION_READ_MAX_BACKOFF = float(os.getenv("NOTION_READ_MAX_BACKOFF", "30"))
+
+RETRYABLE_STATUS = {409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (HTTPResponseError, RequestTimeoutError, httpx.TransportError)
+# 요청이 서버에 닿기 전에 실패한 게 확실한 오류 (연결 단계)
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _retry_after(err: Exception) -> Optional[float]:
+    headers = getattr(err, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(err: Exception, attempt: int, max_retries: int, max_backoff: float) -> Optional[float]:
+    """
+    재시도할 거면 대기 시간(초), 아니면 None
+    - Retry-After 가 있으면 그대로(+약간의 지터), 없으면 지터 섞은 지수 백오프
+    """
+    status = getattr(err, "status", None)
+    if (status is not None and status not in RETRYABLE_STATUS) or attempt > max_retries:
+        return None
+    delay = _retry_after(err)
+    if delay is None:
+        return min(max_backoff, 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+    return delay + random.uniform(0, 0.5)
+
+
+def maybe_applied(err: Exception) -> bool:
+    """
+    서버가 요청을 이미 처리했을 수도 있는 실패인지 (응답 대기 중 timeout / 연결 끊김 / 5xx).
+    409 / 429 와 연결 단계 오류는 처리되지 않은 게 확실해서 False
+    """
+    status = getattr(err, "status", None)
+    if status is not None:
+        return status >= 500
+    if isinstance(err, RequestTimeoutError):
+        # notion_client 가 httpx timeout 을 감싸서 다시 던지므로 원래 예외로 단계 판단
+        return not isinstance(err.__context__, (httpx.ConnectTimeout, httpx.PoolTimeout))
+    return not isinstance(err, _NOT_SENT_ERRORS)
+
+
+def throttle(err: Exception, delay: float, attempt: int, rate_limiter, what: str) -> None:
+    """
+    재시도 전 공통 처리: 재시도 / 429 카운트, 429 면 limiter 전체를 멈춰서 다른 요청도 같이 쉼
+    """
+    status = getattr(err, "status", None)
+    metrics.incr("retries", service="notion")
+    if status == 429:
+        metrics.incr("rate_limited", service="notion")
+        rate_limiter.pause(delay)
+    logger.warning(f"Notion {what} throttled/failed (status={status}), retry {attempt} in {delay:.1f}s")
+
+
+def call_with_retry(rate_limiter, endpoint: str, fn: Callable[..., Any], *args,
+                    max_retries: int = NOTION_READ_MAX_RETRIES, max_backoff: float = NOTION_READ_MAX_BACKOFF,
+                    **kwargs) -> Any:
+    """
+    Notion 조회 요청 하나를 토큰 버킷 안에서 실행, 429/5xx/timeout 은 재시도 (endpoint: metrics 이름)
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        rate_limiter.acquire()
+        metrics.request(endpoint)
+        try:
+            return fn(*args, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            delay = retry_delay(e, attempt, max_retries, max_backoff)
+            if delay is None:
+                raise
+            throttle(e, delay, attempt, rate_limiter, endpoint)
+            time.sleep(delay)
+
+
+async def acall_with_retry(rate_limiter, endpoint: str, fn: Callable[..., Any], *args,
+                           max_retries: int = NOTION_READ_MAX_RETRIES, max_backoff: float = NOTION_READ_MAX_BACKOFF,
+                           **kwargs) -> Any:
+    """
+    call_with_retry 의 asyncio 버전 (fn 은 coroutine 을 반환)
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        await rate_limiter.acquire()
+        metrics.request(endpoint)
+        try:
+            return await fn(*args, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            delay = retry_delay(e, attempt, max_retries, max_backoff)
+            if delay is None:
+                raise
+            throttle(e, delay, attempt, rate_limiter, endpoint)
+            await asyncio.sleep(delay)
@@ -0,0 +1,167 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+
+from .logger import get_logger
+
+logger = get_logger("insty")
+
+WATCH_STATE_PATH = os.getenv("WATCH_STATE_PATH", ".cache/watch_state.json")
+WATCH_INTERVAL_MIN_SEC = float(os.getenv("WATCH_INTERVAL_MIN_SEC", "15"))
+WATCH_INTERVAL_MAX_SEC = float(os.getenv("WATCH_INTERVAL_MAX_SEC", "300"))
+# 회의 중 계속 편집되는 페이지는 마지막 편집 후 이만큼 지나야 처리 (Notion last_edited_time 은 분 단위)
+WATCH_SETTLE_SEC = float(os.getenv("WATCH_SETTLE_SEC", "60"))
+# 체크포인트가 없을 때(첫 실행) 거슬러 올라가 볼 시간
+WATCH_LOOKBACK_MIN = float(os.getenv("WATCH_LOOKBACK_MIN", "60"))
+# 같은 편집본이 이만큼 연속 실패하면 포기하고 cursor 를 더 붙잡지 않음 (다시 편집되면 새로 시도)
+WATCH_MAX_ATTEMPTS = max(1, int(os.getenv("WATCH_MAX_ATTEMPTS", "5")))
+
+
+def notion_time(dt: datetime) -> str:
+    # Notion last_edited_time 과 같은 형식이라 문자열 비교로 순서 비교 가능
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _plain_id(page_id: str) -> str:
+    return (page_id or "").replace("-", "").lower()
+
+
+def _title(page: Dict[str, Any]) -> str:
+    for prop in page.get("properties", {}).values():
+        if prop.get("type") == "title":
+            return "".join(t.get("plain_text", "") for t in prop.get("title") or [])
+    return ""
+
+
+class MeetingPageWatcher:
+    """
+    최근 편집된 회의록 페이지를 찾는 polling 체크포인트.
+    - search API 로 cursor 이후 편집된 페이지를 보고 parent 페이지 / 제목 패턴으로 거름 (task DB 행은 제외)
+    - 마지막 편집 후 settle 시간이 지난 페이지만 처리 대상, 처리한 (page_id, last_edited) 는 다시 내보내지 않음
+    - 실패했거나 아직 편집 중인 페이지보다 cursor 를 앞으로 보내지 않음 -> 다음 poll 에서 다시 봄
+    - 같은 (page_id, last_edited) 가 max_attempts 번 실패하면 로그를 남기고 처리한 것으로 봄 (cursor 를 계속 막지 않도록)
+    - cursor, 처리 기록, 페이지별 실패 횟수는 state 파일에 저장 (재시작해도 이어감)
+    - poll 간격: 처리할 페이지가 있거나 편집 중인 페이지가 있으면 최소, 없으면 1.5배씩 최대까지
+    """
+
+    def __init__(self, notion, parent_id: Optional[str] = None, title_pattern: Optional[str] = None,
+                 exclude_database_id: Optional[str] = None, state_path: str = WATCH_STATE_PATH,
+                 settle_sec: float = WATCH_SETTLE_SEC, min_interval: float = WATCH_INTERVAL_MIN_SEC,
+                 max_interval: float = WATCH_INTERVAL_MAX_SEC, max_attempts: int = WATCH_MAX_ATTEMPTS):
+        if not parent_id and not title_pattern:
+            raise ValueError("watch mode needs a parent page id or a title pattern")
+        self.notion = notion
+        self.parent_id = _plain_id(parent_id) if parent_id else None
+        self.title_re = re.compile(title_pattern) if title_pattern else None
+        self.exclude_database_id = _plain_id(exclude_database_id) if exclude_database_id else None
+        self.state_path = state_path
+        self.settle = timedelta(seconds=settle_sec)
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.interval = min_interval
+        self.max_attempts = max(1, max_attempts)
+        self.state = self._load_state()
+        self._scanned: List[Dict[str, Any]] = []
+        self._waiting: List[Dict[str, str]] = []
+
+    # ---------- state 파일 ----------
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "rb") as f:
+                state = orjson.loads(f.read())
+            logger.info(f"Watch checkpoint loaded: cursor={state['cursor']}")
+            # attempts 이전에 만든 state 파일
+            state.setdefault("attempts", {})
+            return state
+        except (FileNotFoundError, orjson.JSONDecodeError, KeyError):
+            cursor = notion_time(datetime.now(timezone.utc) - timedelta(minutes=WATCH_LOOKBACK_MIN))
+            return {"cursor": cursor, "done": {}, "attempts": {}}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(self.state, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, self.state_path)
+
+    # ---------- polling ----------
+    def _wanted(self, page: Dict[str, Any]) -> bool:
+        parent = page.get("parent") or {}
+        parent_id = _plain_id(parent.get("page_id") or parent.get("database_id"))
+        if self.exclude_database_id and parent_id == self.exclude_database_id:
+            return False
+        if page.get("archived") or page.get("in_trash"):
+            return False
+        if self.parent_id and parent_id != self.parent_id:
+            return False
+        return not self.title_re or bool(self.title_re.search(_title(page)))
+
+    def poll(self) -> List[Dict[str, str]]:
+        """
+        returns: 이번에 처리할 페이지 [{"page_id", "last_edited"}] (편집 시각 오래된 순)
+        """
+        settled_before = notion_time(datetime.now(timezone.utc) - self.settle)
+        self._scanned = self.notion.search_pages_edited_since(self.state["cursor"])
+        ready, self._waiting = [], []
+        for page in self._scanned:
+            if not self._wanted(page):
+                continue
+            entry = {"page_id": page["id"], "last_edited": page["last_edited_time"]}
+            if self.state["done"].get(entry["page_id"]) == entry["last_edited"]:
+                continue
+            (ready if entry["last_edited"] <= settled_before else self._waiting).append(entry)
+        if ready or self._waiting:
+            logger.info(f"Watch poll: {len(ready)} pages ready, {len(self._waiting)} still being edited "
+                        f"(scanned {len(self._scanned)} since {self.state['cursor']})")
+        return sorted(ready, key=lambda e: e["last_edited"])
+
+    def commit(self, ready: List[Dict[str, str]], failed: Set[str]) -> None:
+        """
+        poll 결과 처리 후 호출: 성공한 페이지 기록, 실패 횟수 갱신, cursor 전진, 다음 poll 간격 조정
+        """
+        done, attempts = self.state["done"], self.state["attempts"]
+        retry = []
+        for entry in ready:
+            page_id, edited = entry["page_id"], entry["last_edited"]
+            if page_id in failed and self._count_failure(page_id, edited) < self.max_attempts:
+                retry.append(edited)
+                continue
+            attempts.pop(page_id, None)
+            done[page_id] = edited
+
+        # 다시 봐야 하는 페이지(실패 / 편집 중)와 검색 색인 지연을 감안한 settle 구간 이전까지만 전진
+        held = retry + [e["last_edited"] for e in self._waiting]
+        newest = max([p["last_edited_time"] for p in self._scanned] + [self.state["cursor"]])
+        settled_before = notion_time(datetime.now(timezone.utc) - self.settle)
+        cursor = max(self.state["cursor"], min(held + [newest, settled_before]))
+        self.state = {
+            "cursor": cursor,
+            "done": {pid: edited for pid, edited in done.items() if edited >= cursor},
+            "attempts": {pid: a for pid, a in attempts.items() if a["last_edited"] >= cursor},
+        }
+        self._save_state()
+
+        if ready or self._waiting:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+
+    def _count_failure(self, page_id: str, edited: str) -> int:
+        """
+        같은 편집본의 연속 실패 횟수를 올려서 반환 (편집되면 1부터), max_attempts 에 닿으면 포기 로그
+        """
+        attempts = self.state["attempts"]
+        prev = attempts.get(page_id)
+        count = prev["count"] + 1 if prev and prev["last_edited"] == edited else 1
+        attempts[page_id] = {"last_edited": edited, "count": count}
+        if count >= self.max_attempts:
+            logger.error(f"Giving up on page {page_id} (edited {edited}) after {count} failed attempts; "
+                         f"no longer holding the watch cursor for it (edit the page to retry)")
+        return count
+
+    def backoff(self) -> None:
+        # poll 자체가 실패했을 때 (네트워크 등)
+        self.interval = min(self.max_interval, self.interval * 2)
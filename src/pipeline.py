@@ -0,0 +1,92 @@
+import asyncio
+import queue
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from .logger import get_logger
+
+logger = get_logger("insty")
+
+_DONE = object()
+
+Stage = Tuple[str, Callable[[Dict[str, Any]], None], int]
+AsyncStage = Tuple[str, Callable[[Dict[str, Any]], Awaitable[None]], int]
+
+
+def run_stages(items: List[Dict[str, Any]], stages: List[Stage]) -> List[Dict[str, Any]]:
+    """
+    item(dict) 들을 stage 순서대로 흘려보내는 스레드 파이프라인.
+    - stage: (이름, 처리 함수, worker 수). stage 사이는 queue 로 연결돼서 서로 다른 item 의 stage 가 겹쳐 실행됨
+    - 처리 함수는 item 을 직접 수정. 예외가 나면 item["error"] 에 기록하고 이후 stage 는 건너뜀
+    - item["done"] 이 True 가 되면 (예: 추출된 task 없음) 이후 stage 는 건너뜀
+    returns: 입력 순서대로 정렬된 item 목록
+    """
+    queues = [queue.Queue() for _ in range(len(stages) + 1)]
+
+    def worker(idx: int, name: str, fn: Callable[[Dict[str, Any]], None], remaining: List[int], lock: threading.Lock):
+        q_in, q_out = queues[idx], queues[idx + 1]
+        while True:
+            item = q_in.get()
+            if item is _DONE:
+                break
+            if not item.get("error") and not item.get("done"):
+                try:
+                    fn(item)
+                except Exception as e:
+                    item["error"] = f"{name}: {e}"
+                    logger.error(f"[{name}] page {item.get('page_id')} failed: {e}")
+            q_out.put(item)
+        # 마지막으로 끝나는 worker 가 다음 stage 에 종료 신호 전달
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                next_workers = stages[idx + 1][2] if idx + 1 < len(stages) else 1
+                for _ in range(next_workers):
+                    q_out.put(_DONE)
+
+    threads = []
+    for idx, (name, fn, workers) in enumerate(stages):
+        remaining, lock = [workers], threading.Lock()
+        for n in range(workers):
+            t = threading.Thread(target=worker, args=(idx, name, fn, remaining, lock), name=f"{name}-{n}", daemon=True)
+            t.start()
+            threads.append(t)
+
+    for i, item in enumerate(items):
+        item.setdefault("_order", i)
+        queues[0].put(item)
+    for _ in range(stages[0][2]):
+        queues[0].put(_DONE)
+
+    results = []
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        results.append(item)
+    for t in threads:
+        t.join()
+    return sorted(results, key=lambda it: it["_order"])
+
+
+async def arun_stages(items: List[Dict[str, Any]], stages: List[AsyncStage]) -> List[Dict[str, Any]]:
+    """
+    run_stages 의 asyncio 버전: item 별 코루틴이 stage 를 차례로 거치고, stage 별 동시 수는 세마포어로 제한
+    - 예외 / item["done"] 처리는 run_stages 와 같음
+    returns: 입력 순서대로의 item 목록
+    """
+    sems = [asyncio.Semaphore(max(1, workers)) for _, _, workers in stages]
+
+    async def flow(item: Dict[str, Any]) -> Dict[str, Any]:
+        for (name, fn, _), sem in zip(stages, sems):
+            if item.get("error") or item.get("done"):
+                break
+            try:
+                async with sem:
+                    await fn(item)
+            except Exception as e:
+                item["error"] = f"{name}: {e}"
+                logger.error(f"[{name}] page {item.get('page_id')} failed: {e}")
+        return item
+
+    return list(await asyncio.gather(*(flow(item) for item in items)))
@@ -1,13 +1,11 @@
 from datetime import datetime, timezone
 import os
 
-def build_user_prompt(meeting_text: str, meeting_date_str: str) -> str:
-    """
-    한국어 시스템 요구사항 기반 + Few-shot 3개 포함
-    결과는 JSON 배열로만 출력하도록 유도 (extractor에서 파싱)
-    """
-    today = meeting_date_str
-    return f"""
+# 프롬프트 내용이 바뀌면 올려서 추출 캐시를 무효화
+PROMPT_VERSION = "2"
+
+# 매 요청마다 같은 고정 지시문 + few-shot (날짜 등 가변값 없음 → prompt caching 대상)
+STATIC_INSTRUCTIONS = """
 당신은 회의록에서 업무 항목을 추출하고 분석하는 전문가입니다.
 
 # 역할
@@ -31,49 +29,72 @@ def build_user_prompt(meeting_text: str, meeting_date_str: str) -> str:
 - 명시되지 않은 정보는 업무의 성격과 문맥을 고려하여 추론
 - end이 없으면 업무 복잡도를 고려하여 합리적 기간 설정
 - priority는 중요도+긴급성 고려
-- start 기본값은 명시되지 않았으면 '{today}'
+- start 기본값은 명시되지 않았으면 회의 날짜 (사용자 메시지의 '# 회의 날짜')
+- end 를 추정할 때도 회의 날짜를 기준으로 계산
 
 # 출력 규칙 (매우 중요)
 - 반드시 **순수 JSON 배열**만 출력하세요.
 - JSON 외의 텍스트, bullet point, 설명 문구는 절대 쓰지 마세요.
 - 배열 바깥에 어떠한 주석, 설명, 서문도 쓰지 마세요.- 각 원소는 위 9개 키를 모두 포함.
 
-# Few-shot 예시 (정답 JSON 일부)
+# Few-shot 예시 (정답 JSON 일부, 회의 날짜가 2025-09-15 인 경우)
 [
-  {{
+  {
     "name": "태그 알림 기능 마무리",
     "field": "개발",
     "process": "진행중",
-    "end": "{today}",
+    "end": "2025-09-19",
     "priority": "높음",
     "function": "개선",
     "description": "태그 알림 기능 잔여 작업 마무리 및 QA.",
-    "start": "{today}",
+    "start": "2025-09-15",
     "progress": 50
-  }},
-  {{
+  },
+  {
     "name": "네이버 클라우드 제안서 완성",
     "field": "기획",
     "process": "진행중",
-    "end": "{today}",
+    "end": "2025-09-26",
     "priority": "보통",
     "function": "분석",
     "description": "스토리텔링 6개 완료, 정량 근거 7개 중 3개 작성. 마무리 및 컨택.",
-    "start": "{today}",
+    "start": "2025-09-15",
     "progress": 69
-  }},
-  {{
+  },
+  {
     "name": "크리에이터 컨택 200명 진행",
     "field": "마케팅",
     "process": "진행중",
-    "end": "{today}",
+    "end": "2025-10-10",
     "priority": "보통",
     "function": "운영",
     "description": "리스트업 200명, 메일 10명 발송, 커피챗 1건 예정. 목표 진척.",
-    "start": "{today}",
+    "start": "2025-09-15",
     "progress": 25
-  }}
+  }
 ]
+"""
+
+
+def build_system_blocks(system_prompt: str) -> list[dict]:
+    """
+    시스템 프롬프트 + 고정 지시문/Few-shot 을 하나의 system 블록으로 묶고 cache_control 로 캐시 지점 표시
+    (모델별 최소 캐시 길이보다 짧으면 캐시되지 않고 일반 입력으로 처리됨)
+    """
+    return [{
+        "type": "text",
+        "text": f"{system_prompt}\n{STATIC_INSTRUCTIONS}",
+        "cache_control": {"type": "ephemeral"},
+    }]
+
+
+def build_user_prompt(meeting_text: str, meeting_date_str: str) -> str:
+    """
+    요청마다 달라지는 부분만 (회의 날짜 + 회의록 본문)
+    결과는 JSON 배열로만 출력하도록 유도 (extractor에서 파싱)
+    """
+    return f"""# 회의 날짜
+{meeting_date_str}
 
 # 실제 회의록
 {meeting_text}
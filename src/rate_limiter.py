@@ -0,0 +1,80 @@
+import asyncio
+import os
+import threading
+import time
+
+# Notion API 평균 허용량 ≈ 초당 3회
+NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+NOTION_RATE_BURST = int(os.getenv("NOTION_RATE_BURST", "3"))
+
+
+class RateLimiter:
+    """
+    스레드 안전 토큰 버킷. acquire() 는 토큰이 생길 때까지 대기
+    - rate: 초당 토큰 수 (0 이하면 제한 없음)
+    - burst: 버킷 최대 크기
+    """
+
+    def __init__(self, rate: float = NOTION_RATE_LIMIT, burst: int = NOTION_RATE_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """
+        429 Retry-After 등으로 서버가 쉬라고 할 때 모든 acquire() 를 seconds 동안 멈춤
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AsyncRateLimiter:
+    """
+    RateLimiter 의 asyncio 버전 (같은 이벤트 루프 안에서만 사용)
+    """
+
+    def __init__(self, rate: float = NOTION_RATE_LIMIT, burst: int = NOTION_RATE_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                wait = self._blocked_until - now
+            elif self.rate <= 0:
+                return
+            else:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            await asyncio.sleep(wait)
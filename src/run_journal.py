@@ -0,0 +1,268 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+
+from .logger import get_logger
+
+logger = get_logger("insty")
+
+RUN_JOURNAL_PATH = os.getenv("RUN_JOURNAL_PATH", ".cache/run_journal.sqlite3")
+# 이보다 오래된 미완료 실행은 이어가지 않음 (그 사이 회의록이 바뀌었을 수 있음)
+RUN_JOURNAL_RESUME_HOURS = float(os.getenv("RUN_JOURNAL_RESUME_HOURS", "24"))
+RUN_JOURNAL_KEEP_DAYS = float(os.getenv("RUN_JOURNAL_KEEP_DAYS", "7"))
+
+
+def run_key(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def payload_hash(properties: Dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(properties, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class RunJournal:
+    """
+    파이프라인 실행 단위 write-ahead journal (SQLite).
+    - 페이지별 추출 결과와, 보내기 전에 계획한 create/update 를 기록하고 끝나면 done 으로 표시
+    - 같은 입력(key)으로 다시 실행했을 때 끝나지 않은 실행이 있으면 그 run 을 이어감:
+      기록된 추출 결과를 재사용하고 (블록 조회 / Claude 호출 생략) done 이 아닌 mutation 만 다시 보냄
+    - 추출 결과는 페이지 last_edited_time 과 함께 기록, 그 사이 페이지가 편집됐으면 추출 / 계획을 버리고 새로 함
+    - 실패 없이 끝난 run 만 done 처리 (실패가 남으면 다음 실행에서 이어감)
+    - 이어가기는 run 이 처음 시작된 뒤 resume_hours 안에서만 (계속 실패하는 write 때문에 run 이 무한히 열려 있지 않도록)
+    """
+
+    def __init__(self, path: str = RUN_JOURNAL_PATH, resume_hours: float = RUN_JOURNAL_RESUME_HOURS,
+                 keep_days: float = RUN_JOURNAL_KEEP_DAYS):
+        self.path = path
+        self.resume_window = resume_hours * 3600
+        self.keep = keep_days * 86400
+        self.run_id: Optional[str] = None
+        self.resumed = False
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_key ON runs (key, status);
+            CREATE TABLE IF NOT EXISTS pages (
+                run_id TEXT NOT NULL,
+                page_id TEXT NOT NULL,
+                tasks BLOB,
+                last_edited TEXT,
+                plan BLOB,
+                PRIMARY KEY (run_id, page_id)
+            );
+            CREATE TABLE IF NOT EXISTS mutations (
+                run_id TEXT NOT NULL,
+                page_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                op TEXT NOT NULL,
+                target TEXT NOT NULL,
+                payload_hash TEXT NOT NULL,
+                mutation BLOB NOT NULL,
+                status TEXT NOT NULL,
+                notion_page_id TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, page_id, seq)
+            );
+            """
+        )
+        # last_edited 컬럼 이전에 만든 journal 파일
+        if "last_edited" not in {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN last_edited TEXT")
+        self._conn.commit()
+
+    # ---------- run ----------
+    def start(self, key: str, resume: bool = True) -> bool:
+        """
+        returns: 이전 미완료 run 을 이어가면 True
+        """
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            row = None
+            if resume:
+                row = self._conn.execute(
+                    "SELECT run_id FROM runs WHERE key = ? AND status = 'running' AND started_at >= ? "
+                    "ORDER BY started_at DESC LIMIT 1",
+                    (key, now - self.resume_window),
+                ).fetchone()
+            # 이어가지 않는 예전 run 은 버림 (다음에 잘못 이어붙지 않도록)
+            self._conn.execute(
+                "UPDATE runs SET status = 'abandoned' WHERE key = ? AND status = 'running' AND run_id != ?",
+                (key, row[0] if row else ""),
+            )
+            if row:
+                self.run_id, self.resumed = row[0], True
+            else:
+                self.run_id, self.resumed = uuid.uuid4().hex, False
+                self._conn.execute(
+                    "INSERT INTO runs (run_id, key, status, started_at, updated_at) VALUES (?, ?, 'running', ?, ?)",
+                    (self.run_id, key, now, now),
+                )
+            self._conn.commit()
+        if self.resumed:
+            logger.info(f"Resuming interrupted run {self.run_id[:8]} from journal")
+        return self.resumed
+
+    def finish(self, ok: bool) -> None:
+        """
+        ok=False 면 run 을 열어둬서 다음 실행이 남은 mutation 부터 이어가게 함
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                ("done" if ok else "running", time.time(), self.run_id),
+            )
+            self._conn.commit()
+        if not ok:
+            logger.warning(f"Run {self.run_id[:8]} left open in journal; rerun with the same input to resume")
+
+    def _prune(self, now: float) -> None:
+        old = [r[0] for r in self._conn.execute(
+            "SELECT run_id FROM runs WHERE updated_at < ?", (now - self.keep,)
+        ).fetchall()]
+        for table in ("mutations", "pages", "runs"):
+            self._conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(r,) for r in old])
+
+    # ---------- 추출 결과 ----------
+    def extraction(self, page_id: str, last_edited: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        기록된 추출 결과. 기록 후 페이지가 편집됐으면(last_edited 가 다르면) 그 페이지의 추출 / 계획을 버리고 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tasks, last_edited FROM pages WHERE run_id = ? AND page_id = ? AND tasks IS NOT NULL",
+                (self.run_id, page_id),
+            ).fetchone()
+            if row and row[1] != last_edited:
+                for table in ("mutations", "pages"):
+                    self._conn.execute(f"DELETE FROM {table} WHERE run_id = ? AND page_id = ?", (self.run_id, page_id))
+                self._conn.commit()
+                logger.info(f"[{page_id}] Page edited since the interrupted run; discarding its journal entries")
+                return None
+        return orjson.loads(row[0]) if row else None
+
+    def record_extraction(self, page_id: str, tasks: List[Dict[str, Any]], last_edited: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pages (run_id, page_id, tasks, last_edited) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (run_id, page_id) DO UPDATE SET tasks = excluded.tasks, last_edited = excluded.last_edited",
+                (self.run_id, page_id, orjson.dumps(tasks), last_edited),
+            )
+            self._conn.commit()
+
+    def page(self, page_id: str) -> "PageJournal":
+        return PageJournal(self, page_id)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PageJournal:
+    """
+    회의록 페이지 하나의 upsert 계획 / 진행 상태 (RunJournal 의 연결과 lock 을 공유)
+    """
+
+    def __init__(self, journal: RunJournal, page_id: str):
+        self.journal = journal
+        self.page_id = page_id
+
+    @property
+    def _key(self) -> tuple:
+        return self.journal.run_id, self.page_id
+
+    def planned(self) -> Optional[Dict[str, Any]]:
+        """
+        이미 계획이 기록돼 있으면 {"unchanged", "tiers", "planned_at"}, 없으면 None
+        """
+        with self.journal._lock:
+            row = self.journal._conn.execute(
+                "SELECT plan FROM pages WHERE run_id = ? AND page_id = ? AND plan IS NOT NULL", self._key
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def plan(self, mutations: List[Dict[str, Any]], unchanged: int, tiers: Dict[str, int]) -> None:
+        """
+        보내기 전에 전부 기록 (mutation 에 journal_seq 를 붙임)
+        """
+        now = time.time()
+        rows = []
+        for seq, m in enumerate(mutations):
+            m["journal_seq"] = seq
+            target = m["page_id"] if m["op"] == "update" else m["database_id"]
+            rows.append((*self._key, seq, m["op"], target, payload_hash(m["properties"]), orjson.dumps(m), now))
+        with self.journal._lock:
+            conn = self.journal._conn
+            conn.execute("DELETE FROM mutations WHERE run_id = ? AND page_id = ?", self._key)
+            conn.executemany(
+                "INSERT INTO mutations (run_id, page_id, seq, op, target, payload_hash, mutation, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 'planned', ?)",
+                rows,
+            )
+            conn.execute(
+                "INSERT INTO pages (run_id, page_id, plan) VALUES (?, ?, ?) "
+                "ON CONFLICT (run_id, page_id) DO UPDATE SET plan = excluded.plan",
+                (*self._key, orjson.dumps({"unchanged": unchanged, "tiers": tiers, "planned_at": now})),
+            )
+            conn.commit()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self.journal._lock:
+            rows = self.journal._conn.execute(
+                "SELECT mutation FROM mutations WHERE run_id = ? AND page_id = ? AND status != 'done' ORDER BY seq",
+                self._key,
+            ).fetchall()
+        return [orjson.loads(r[0]) for r in rows]
+
+    def done_counts(self) -> Dict[str, int]:
+        with self.journal._lock:
+            rows = self.journal._conn.execute(
+                "SELECT op, COUNT(*) FROM mutations WHERE run_id = ? AND page_id = ? AND status = 'done' GROUP BY op",
+                self._key,
+            ).fetchall()
+        counts = {"create": 0, "update": 0, **dict(rows)}
+        return {"created": counts["create"], "updated": counts["update"]}
+
+    def done_page_ids(self) -> Set[str]:
+        """
+        이미 끝난 mutation 이 만들거나 고친 Notion page_id (남은 create 의 결과로 다시 쓰지 않도록)
+        """
+        with self.journal._lock:
+            rows = self.journal._conn.execute(
+                "SELECT notion_page_id FROM mutations WHERE run_id = ? AND page_id = ? AND status = 'done' "
+                "AND notion_page_id IS NOT NULL",
+                self._key,
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def mark(self, result: Dict[str, Any]) -> None:
+        """
+        write executor 의 mutation 별 결과 콜백 (worker 스레드에서 호출)
+        """
+        page = result.get("page") or {}
+        with self.journal._lock:
+            self.journal._conn.execute(
+                "UPDATE mutations SET status = ?, notion_page_id = ?, updated_at = ? "
+                "WHERE run_id = ? AND page_id = ? AND seq = ?",
+                ("done" if result["ok"] else "failed", page.get("id") or result.get("page_id"), time.time(),
+                 *self._key, result["journal_seq"]),
+            )
+            self.journal._conn.commit()
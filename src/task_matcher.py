@@ -0,0 +1,35 @@
+import os
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+TASK_MATCH_THRESHOLD = float(os.getenv("TASK_MATCH_THRESHOLD", "0.9"))
+TASK_MATCH_TOP_K = int(os.getenv("TASK_MATCH_TOP_K", "5"))
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """
+    (n, d) 행렬을 float32 로 바꾸고 각 행을 L2 정규화 (영벡터는 그대로 0)
+    """
+    mat = np.asarray(vectors, dtype=np.float32)
+    if mat.ndim == 1:
+        mat = mat.reshape(1, -1)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+
+def assign_matches(candidates: List[Tuple[float, int, Any]]) -> Tuple[Dict[int, Tuple[Any, float]], int]:
+    """
+    기준치 이상 후보 [(유사도, 신규 index, 기존 key)] 를 점수 높은 순으로 보면서, 아직 안 쓰인 (신규, 기존) 쌍만 배정
+    returns: (신규 index -> (기존 key, 유사도), 후보가 있었지만 모두 다른 task 에 배정된 건수)
+    """
+    assigned: Dict[int, Tuple[Any, float]] = {}
+    taken = set()
+    for score, qi, key in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        if qi in assigned or key in taken:
+            continue
+        assigned[qi] = (key, score)
+        taken.add(key)
+    return assigned, len({qi for _, qi, _ in candidates} - assigned.keys())
+
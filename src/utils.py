@@ -5,6 +5,20 @@ def read_file(path: str) -> str:
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 쓰는 보수적인 토큰 수 추정 (한글 1자 ≈ 1.5토큰, 영문 4자 ≈ 1토큰보다 크게 잡음)
+    """
+    return (len(text.encode("utf-8")) + 1) // 2
+
+_NAME_STRIP_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+def normalize_task_name(name: str) -> str:
+    """
+    task 이름 비교용 정규화 (대소문자, 공백, 문장부호 무시)
+    """
+    return _NAME_STRIP_RE.sub("", str(name or "")).lower()
+
 UUID_RE = re.compile(r"[0-9a-fA-F]{32}|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
 
 def extract_notion_page_id(text: str) -> str:
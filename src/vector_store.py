@@ -0,0 +1,267 @@
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+from .logger import get_logger
+from .task_matcher import normalize_rows
+
+logger = get_logger("insty")
+
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", ".cache/vectors")
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "int8")
+# IVF 검색 시 훑는 군집 수 (클수록 recall ↑, 속도 ↓)
+VECTOR_STORE_PROBES = int(os.getenv("VECTOR_STORE_PROBES", "8"))
+
+_DTYPES = {"float16": np.float16, "int8": np.int8}
+_SCAN_BLOCK = 8192
+
+
+class VectorStore:
+    """
+    정규화된 임베딩을 float16 / int8 로 줄여서 memmap 파일에 저장하는 벡터 저장소.
+    - key(page_id 등) -> row 매핑은 meta.json 에 저장, 삭제된 row 는 다음 add 에서 재사용
+    - int8 은 row 별 scale 로 대칭 양자화 (scale 은 float32 로 따로 보관)
+    - build_index() 로 k-means 군집(IVF)을 만들면 search 는 가까운 n_probe 개 군집의 row 만 스캔
+    - 파일: vectors.bin, scales.bin, lists.bin(row -> 군집), centroids.npy, meta.json
+    """
+
+    def __init__(self, path: str = VECTOR_STORE_PATH, dim: Optional[int] = None, dtype: str = VECTOR_STORE_DTYPE):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta = self._load_meta()
+        if meta:
+            self.dim, self.dtype = meta["dim"], meta["dtype"]
+            if dim is not None and dim != self.dim:
+                raise ValueError(f"VectorStore at {path} has dim={self.dim}, got dim={dim}")
+        else:
+            if dim is None:
+                raise ValueError("dim is required for a new VectorStore")
+            if dtype not in _DTYPES:
+                raise ValueError(f"Unsupported dtype '{dtype}' (float16 | int8)")
+            self.dim, self.dtype = dim, dtype
+            meta = {"count": 0, "capacity": 0, "keys": {}, "free": []}
+
+        self.count = meta["count"]
+        self.keys: Dict[str, int] = meta["keys"]
+        self._row_keys: Dict[int, str] = {row: key for key, row in self.keys.items()}
+        self.free: List[int] = meta["free"]
+        self.centroids: Optional[np.ndarray] = None
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids_path):
+            self.centroids = np.load(centroids_path)
+        self._open(max(meta["capacity"], 1024))
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        # dim 을 몰라도 열 수 있는지 (이미 만들어진 저장소인지)
+        return os.path.exists(os.path.join(path, "meta.json"))
+
+    # ---------- 파일 ----------
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load_meta(self) -> Optional[dict]:
+        try:
+            with open(self._file("meta.json"), "rb") as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
+
+    def _map(self, name: str, dtype, shape: Tuple[int, ...]) -> np.memmap:
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        path = self._file(name)
+        with open(path, "ab") as f:
+            if f.tell() < nbytes:
+                f.truncate(nbytes)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._vectors = self._map("vectors.bin", _DTYPES[self.dtype], (capacity, self.dim))
+        self._scales = self._map("scales.bin", np.float32, (capacity,))
+        self._lists = self._map("lists.bin", np.int32, (capacity,))
+        self._alive = np.zeros(capacity, dtype=bool)
+        if self.keys:
+            self._alive[list(self.keys.values())] = True
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        self.flush()
+        alive = self._alive
+        del self._vectors, self._scales, self._lists
+        self._open(capacity)
+        self._alive[:len(alive)] = alive
+
+    def flush(self) -> None:
+        for m in (self._vectors, self._scales, self._lists):
+            m.flush()
+        meta = {"dim": self.dim, "dtype": self.dtype, "count": self.count, "capacity": self.capacity,
+                "keys": self.keys, "free": self.free}
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(meta))
+        os.replace(tmp, self._file("meta.json"))
+
+    def close(self) -> None:
+        self.flush()
+
+    # ---------- 양자화 ----------
+    def _encode(self, mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.dtype == "int8":
+            scales = np.abs(mat).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            return np.round(mat / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return mat.astype(np.float16), np.ones(len(mat), dtype=np.float32)
+
+    def _decode(self, rows) -> np.ndarray:
+        return np.asarray(self._vectors)[rows].astype(np.float32) * np.asarray(self._scales)[rows, None]
+
+    def _score(self, queries: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        # scale 은 벡터 대신 점수에 곱함 (memmap 서브클래스 대신 ndarray view 로 읽어서 인덱싱 오버헤드 줄임)
+        vectors = np.asarray(self._vectors)[rows].astype(np.float32)
+        return (queries @ vectors.T) * np.asarray(self._scales)[rows]
+
+    # ---------- 추가 / 삭제 ----------
+    def add(self, keys: Sequence[str], vectors) -> None:
+        """
+        key 별 벡터 저장 (이미 있는 key 는 덮어씀). 인덱스가 있으면 가까운 군집에 바로 배정
+        """
+        if not keys:
+            return
+        mat = normalize_rows(vectors)
+        if mat.shape != (len(keys), self.dim):
+            raise ValueError(f"Expected {len(keys)} vectors of dim {self.dim}, got {mat.shape}")
+
+        rows = []
+        for key in keys:
+            row = self.keys.get(key)
+            if row is None:
+                row = self.free.pop() if self.free else self.count
+                if row == self.count:
+                    self.count += 1
+                self.keys[key] = row
+                self._row_keys[row] = key
+            rows.append(row)
+        if self.count > self.capacity:
+            self._grow(self.count)
+
+        rows = np.asarray(rows)
+        encoded, scales = self._encode(mat)
+        self._vectors[rows] = encoded
+        self._scales[rows] = scales
+        self._alive[rows] = True
+        self._lists[rows] = self._assign(mat) if self.centroids is not None else -1
+
+    def delete(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        for key in keys:
+            row = self.keys.pop(key, None)
+            if row is None:
+                continue
+            del self._row_keys[row]
+            self._alive[row] = False
+            self._lists[row] = -1
+            self.free.append(row)
+            deleted += 1
+        return deleted
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.keys.get(key)
+        return None if row is None else self._decode([row])[0]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def nbytes(self) -> int:
+        """
+        실제로 쓰는 row 기준 디스크/페이지 캐시 사용량
+        """
+        per_row = self.dim * np.dtype(_DTYPES[self.dtype]).itemsize + 4 + 4
+        return self.count * per_row + (self.centroids.nbytes if self.centroids is not None else 0)
+
+    # ---------- IVF 인덱스 ----------
+    def _assign(self, mat: np.ndarray) -> np.ndarray:
+        return np.argmax(mat @ self.centroids.T, axis=1).astype(np.int32)
+
+    def build_index(self, n_lists: Optional[int] = None, iters: int = 10, sample: int = 64, seed: int = 0) -> None:
+        """
+        살아있는 row 로 spherical k-means 를 돌려 군집 중심을 만들고 모든 row 를 다시 배정
+        - n_lists 기본값: sqrt(row 수)
+        - 학습은 군집당 최대 sample 개 row 만 사용
+        """
+        alive = np.flatnonzero(self._alive[:self.count])
+        if len(alive) == 0:
+            return
+        n_lists = max(1, min(n_lists or int(np.sqrt(len(alive))), len(alive)))
+        rng = np.random.default_rng(seed)
+        train_rows = np.sort(rng.choice(alive, size=min(len(alive), n_lists * sample), replace=False))
+        train = normalize_rows(self._decode(train_rows))
+
+        centroids = train[rng.choice(len(train), size=n_lists, replace=False)]
+        for _ in range(iters):
+            labels = np.argmax(train @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=n_lists)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            filled = counts > 0
+            sums = np.empty_like(centroids)
+            sums[filled] = np.add.reduceat(train[np.argsort(labels, kind="stable")], starts[filled], axis=0)
+            # 빈 군집은 임의의 학습 벡터로 다시 시작
+            sums[~filled] = train[rng.choice(len(train), size=int((~filled).sum()))]
+            centroids = normalize_rows(sums)
+        self.centroids = centroids
+
+        for start in range(0, len(alive), _SCAN_BLOCK):
+            rows = alive[start:start + _SCAN_BLOCK]
+            self._lists[rows] = self._assign(self._decode(rows))
+        np.save(self._file("centroids.npy"), centroids)
+        logger.info(f"VectorStore index built: {len(alive)} rows, {n_lists} lists")
+
+    def drop_index(self) -> None:
+        self.centroids = None
+        self._lists[:self.count] = -1
+        try:
+            os.remove(self._file("centroids.npy"))
+        except FileNotFoundError:
+            pass
+
+    # ---------- 검색 ----------
+    def _candidates(self, queries: np.ndarray, n_probe: int) -> np.ndarray:
+        if self.centroids is None or n_probe <= 0 or n_probe >= len(self.centroids):
+            return np.flatnonzero(self._alive[:self.count])
+        # 쿼리별로 가까운 군집을 고르고 합집합의 row 만 스캔
+        cscores = queries @ self.centroids.T
+        probes = np.argpartition(-cscores, n_probe - 1, axis=1)[:, :n_probe]
+        # lists 는 삭제된 row 가 -1 이라 +1 해서 lut[0](False) 로 보냄
+        lut = np.zeros(len(self.centroids) + 1, dtype=bool)
+        lut[probes.ravel() + 1] = True
+        return np.flatnonzero(lut[np.asarray(self._lists)[:self.count] + 1])
+
+    def search(self, queries, k: int = 5, n_probe: int = VECTOR_STORE_PROBES) -> List[List[Tuple[str, float]]]:
+        """
+        queries: (n, dim) 또는 (dim,) 벡터
+        returns: 쿼리별 [(key, cosine), ...] (점수 내림차순, 최대 k 개)
+        """
+        q = normalize_rows(queries)
+        rows = self._candidates(q, n_probe)
+        if len(rows) == 0:
+            return [[] for _ in range(len(q))]
+
+        scores = np.empty((len(q), len(rows)), dtype=np.float32)
+        for start in range(0, len(rows), _SCAN_BLOCK):
+            block = rows[start:start + _SCAN_BLOCK]
+            scores[:, start:start + len(block)] = self._score(q, block)
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for qi in range(len(q)):
+            order = top[qi][np.argsort(-scores[qi, top[qi]])]
+            results.append([(self._row_keys[int(rows[idx])], float(scores[qi, idx])) for idx in order])
+        return results
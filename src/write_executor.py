@@ -0,0 +1,191 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .logger import get_logger
+from .metrics import metrics
+from .notion_retry import RETRYABLE_ERRORS, maybe_applied, retry_delay, throttle
+from .rate_limiter import RateLimiter, AsyncRateLimiter
+
+logger = get_logger("insty")
+
+NOTION_WRITE_CONCURRENCY = int(os.getenv("NOTION_WRITE_CONCURRENCY", "3"))
+NOTION_WRITE_MAX_RETRIES = int(os.getenv("NOTION_WRITE_MAX_RETRIES", "5"))
+NOTION_WRITE_MAX_BACKOFF = float(os.getenv("NOTION_WRITE_MAX_BACKOFF", "30"))
+
+# create 가 반영됐을 수도 있는 실패 후 호출: (mutation, 이번 run 에서 이미 결과로 쓴 page_id) -> 새로 생긴 page 또는 None
+FindExisting = Callable[[Dict[str, Any], Set[str]], Optional[Dict[str, Any]]]
+
+
+def _result(m: Dict[str, Any], attempt: int, page: Dict[str, Any] = None, error: str = None) -> Dict[str, Any]:
+    return {**m, "ok": error is None, "page": page, "error": error, "attempts": attempt}
+
+
+def _ambiguous_create(m: Dict[str, Any], err: Exception) -> bool:
+    return m["op"] == "create" and maybe_applied(err)
+
+
+def _log_already_created(m: Dict[str, Any]) -> None:
+    logger.info(f"Create was applied before the failure, not resending: {(m.get('task') or {}).get('name')}")
+
+
+class NotionWriteExecutor:
+    """
+    pages.create / pages.update 를 토큰 버킷(RateLimiter) 안에서 동시에 실행.
+    - 429/5xx/timeout 은 Retry-After 를 우선 따르고, 없으면 지터를 섞은 지수 백오프로 재시도
+    - 429 를 받으면 limiter 전체를 멈춰서 다른 worker 도 같이 쉼
+    - create 는 서버가 이미 반영했을 수 있는 실패(timeout / 연결 끊김 / 5xx) 뒤에 바로 다시 보내지 않음:
+      find_existing 으로 같은 제목 page 가 새로 생겼는지 보고 없을 때만 재전송 (find_existing 이 없으면 실패 처리)
+    - 이번 run 의 다른 mutation 결과 page 는 find_existing 에 claimed 로 넘겨서 두 번 쓰지 않음
+    - mutation 별 결과를 입력 순서대로 반환
+    mutation: {"op": "create"|"update", "properties": ..., "database_id"(create) | "page_id"(update), ...}
+    """
+
+    def __init__(self, client, rate_limiter: RateLimiter, concurrency: int = NOTION_WRITE_CONCURRENCY,
+                 max_retries: int = NOTION_WRITE_MAX_RETRIES, max_backoff: float = NOTION_WRITE_MAX_BACKOFF):
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+
+    def run(self, mutations: List[Dict[str, Any]], on_result: Callable[[Dict[str, Any]], None] = None,
+            find_existing: FindExisting = None) -> List[Dict[str, Any]]:
+        """
+        on_result: mutation 하나가 끝날 때마다 (성공/최종 실패) 결과로 호출 (worker 스레드에서)
+        find_existing: 애매하게 실패한 create 를 다시 보내기 전에 호출 (worker 스레드에서)
+        returns: [{**mutation, "ok": bool, "page": 응답 page | None, "error": str | None, "attempts": int}, ...]
+        """
+        if not mutations:
+            return []
+        claimed: Set[str] = set()
+        lock = threading.Lock()
+
+        def find(m):
+            # 조회와 claimed 추가를 묶어서 같은 이름 create 두 개가 한 page 를 나눠 갖지 않도록
+            with lock:
+                page = find_existing(m, set(claimed))
+                if page is not None:
+                    claimed.add(page["id"])
+            return page
+
+        def execute(m):
+            result = self._execute(m, find if find_existing else None)
+            if result["ok"]:
+                with lock:
+                    claimed.add(result["page"]["id"])
+            if on_result:
+                on_result(result)
+            return result
+
+        with metrics.span("notion_write"), \
+                ThreadPoolExecutor(max_workers=min(self.concurrency, len(mutations))) as pool:
+            return list(pool.map(execute, mutations))
+
+    def _send(self, m: Dict[str, Any]) -> Dict[str, Any]:
+        metrics.request(f"notion.pages.{m['op']}")
+        if m["op"] == "create":
+            return self.client.pages.create(parent={"database_id": m["database_id"]}, properties=m["properties"])
+        return self.client.pages.update(page_id=m["page_id"], properties=m["properties"])
+
+    def _execute(self, m: Dict[str, Any], find_existing: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]] = None
+                 ) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            self.rate_limiter.acquire()
+            try:
+                return _result(m, attempt, page=self._send(m))
+            except RETRYABLE_ERRORS as e:
+                delay = retry_delay(e, attempt, self.max_retries, self.max_backoff)
+                ambiguous = _ambiguous_create(m, e)
+                if delay is None or (ambiguous and find_existing is None):
+                    return _result(m, attempt, error=str(e))
+                throttle(e, delay, attempt, self.rate_limiter, m["op"])
+                time.sleep(delay)
+            except Exception as e:
+                return _result(m, attempt, error=str(e))
+
+            if ambiguous:
+                try:
+                    page = find_existing(m)
+                except Exception as e:
+                    return _result(m, attempt, error=f"create outcome unknown: {e}")
+                if page is not None:
+                    _log_already_created(m)
+                    return _result(m, attempt, page=page)
+
+
+class AsyncNotionWriteExecutor:
+    """
+    NotionWriteExecutor 의 asyncio 버전 (notion_client.AsyncClient 사용, 동시성은 세마포어로 제한)
+    """
+
+    def __init__(self, client, rate_limiter: AsyncRateLimiter, concurrency: int = NOTION_WRITE_CONCURRENCY,
+                 max_retries: int = NOTION_WRITE_MAX_RETRIES, max_backoff: float = NOTION_WRITE_MAX_BACKOFF):
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+
+    async def run(self, mutations: List[Dict[str, Any]], on_result: Callable[[Dict[str, Any]], None] = None,
+                  find_existing: Callable[[Dict[str, Any], Set[str]], Awaitable[Optional[Dict[str, Any]]]] = None
+                  ) -> List[Dict[str, Any]]:
+        sem = asyncio.Semaphore(self.concurrency)
+        claimed: Set[str] = set()
+        lock = asyncio.Lock()
+
+        async def find(m):
+            async with lock:
+                page = await find_existing(m, set(claimed))
+                if page is not None:
+                    claimed.add(page["id"])
+            return page
+
+        async def guarded(m):
+            async with sem:
+                result = await self._execute(m, find if find_existing else None)
+            if result["ok"]:
+                claimed.add(result["page"]["id"])
+            if on_result:
+                on_result(result)
+            return result
+
+        with metrics.span("notion_write"):
+            return list(await asyncio.gather(*(guarded(m) for m in mutations)))
+
+    async def _send(self, m: Dict[str, Any]) -> Dict[str, Any]:
+        metrics.request(f"notion.pages.{m['op']}")
+        if m["op"] == "create":
+            return await self.client.pages.create(parent={"database_id": m["database_id"]}, properties=m["properties"])
+        return await self.client.pages.update(page_id=m["page_id"], properties=m["properties"])
+
+    async def _execute(self, m: Dict[str, Any], find_existing=None) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.rate_limiter.acquire()
+            try:
+                return _result(m, attempt, page=await self._send(m))
+            except RETRYABLE_ERRORS as e:
+                delay = retry_delay(e, attempt, self.max_retries, self.max_backoff)
+                ambiguous = _ambiguous_create(m, e)
+                if delay is None or (ambiguous and find_existing is None):
+                    return _result(m, attempt, error=str(e))
+                throttle(e, delay, attempt, self.rate_limiter, m["op"])
+                await asyncio.sleep(delay)
+            except Exception as e:
+                return _result(m, attempt, error=str(e))
+
+            if ambiguous:
+                try:
+                    page = await find_existing(m)
+                except Exception as e:
+                    return _result(m, attempt, error=f"create outcome unknown: {e}")
+                if page is not None:
+                    _log_already_created(m)
+                    return _result(m, attempt, page=page)